@@ -1,11 +1,12 @@
 """module that holds the Animation functionality"""
 
 from dataclasses import dataclass, field
-from typing import overload
+from typing import Optional, overload
 
 import pygame
 
 from graphics.textures import TVector2, get_surface_hotspot
+from utils.clock import AnimationClock, animation_clock
 
 
 class AnimationNotFound(KeyError):
@@ -17,7 +18,7 @@ class Animation:
     """Animation class."""
 
     frames: list = field(repr=False)
-    """ The list of frames to cycle through. """
+    """ The list of frames to cycle through. unused once `sheet` is set. """
     speed: int
     """ The speed at which to cycle through the frames. """
     repeat: int
@@ -28,27 +29,90 @@ class Animation:
     """ The current frame of the animation. """
     stop: bool = field(default=False, init=False, repr=False)
     """ Whether the animation should stop. """
+    start_time: int = field(default=0, init=False, repr=False)
+    """ The clock time (ms) the first frame of the current cycle started at. """
+    clock: AnimationClock = field(default=animation_clock, repr=False, kw_only=True)
+    """ The clock the animation reads the time from. """
+    sheet: Optional[pygame.Surface] = field(default=None, repr=False, kw_only=True)
+    """ A strip/sheet surface holding every frame, its hotspot is per frame. """
+    frame_rects: Optional[list[pygame.Rect]] = field(
+        default=None, repr=False, kw_only=True
+    )
+    """ The area of each frame on the sheet. """
 
     def _post_init_(self):
         self.loop = self.repeat == -1
 
+    @property
+    def frame_count(self) -> int:
+        """The amount of frames."""
+        if self.frame_rects is not None:
+            return len(self.frame_rects)
+        return len(self.frames)
+
     @property
     def static(self):
         """Whether the animation is static."""
-        return self.speed == 0 or len(self.frames) == 1
+        return self.speed == 0 or self.frame_count == 1
+
+    def frame_at(self, now: int) -> int:
+        """The frame showing at the clock time `now`, in constant time"""
+        if self.static:
+            return self.current_frame
+        return (now - self.start_time) // self.speed % self.frame_count
+
+    def update(self, now: int):
+        """Update the current frame to the clock time `now`"""
+        if self.static:
+            return
+        if self.stop:
+            self.hold(now)
+            return
+        self.current_frame = self.frame_at(now)
+
+    def hold(self, now: int):
+        """Hold the current frame at the clock time `now`, resuming continues from it"""
+        self.start_time = now - self.current_frame * self.speed
 
     def animate(self):
         """Go to the next frame"""
         if self.static:
             return
-        self.current_frame = (self.current_frame + 1) % len(self.frames)
+        self.set_current_frame(self.current_frame + 1)
 
     def set_current_frame(self, frame: int):
-        """Set the current frame"""
-        self.current_frame = frame % len(self.frames)
+        """Set the current frame, the animation continues from it"""
+        self.current_frame = frame % self.frame_count
+        self.start_time = self.clock.now - self.current_frame * self.speed
+
+    def set_streamed_frame(self, index: int, surface):
+        """
+        Set a frame that finished streaming in.
+        when the first frame arrives it also replaces the placeholder
+        of the frames that haven't been loaded yet
+        """
+        placeholder = self.frames[index]
+        self.frames[index] = surface
+        if index == 0:
+            self.frames = [
+                surface if frame is placeholder else frame for frame in self.frames
+            ]
+
+    def set_streamed_sheet(self, sheet: pygame.Surface):
+        """Set the sheet once it finished streaming in, it replaces `frames`"""
+        self.sheet = sheet
+        self.frames = []
 
     def draw(self, window, position):
         """Draw frame(s)"""
+        if self.sheet is not None:
+            hotspot = get_surface_hotspot(self.sheet) or TVector2((0, 0))
+            window.blit(
+                self.sheet,
+                (position[0] - hotspot.x, position[1] - hotspot.y),
+                self.frame_rects[self.current_frame],
+            )
+            return
         hotspot = get_surface_hotspot(self.frames[self.current_frame]) or TVector2(
             (0, 0)
         )
@@ -68,8 +132,8 @@ class AnimatatedObject:
 
     def __init__(self, animations: dict[str, Animation] = None):
         self.animations = {} if animations is None else animations
-        self.elapsed = 0
-        if list(self.animations):
+        self._names: list[str] = list(self.animations)
+        if self._names:
             self.change_animation(0)
 
     @overload
@@ -85,11 +149,19 @@ class AnimatatedObject:
         Change the animation.
         """
         if isinstance(name, int):
-            name = list(self.animations)[max(min(name, len(self.animations) - 1), 0)]
+            name = self.name_at(name)
         self._current_animation = name
         if reset:
             self.current_animation.set_current_frame(0)
 
+    def name_at(self, index: int) -> str:
+        """Get the name of an animation by index, the index is clamped."""
+        return self._names[max(min(index, len(self._names) - 1), 0)]
+
+    def animation_at(self, index: int) -> Animation:
+        """Get an animation by index, the index is clamped."""
+        return self.animations[self.name_at(index)]
+
     @property
     def empty(self) -> bool:
         """Check if the object is empty."""
@@ -111,21 +183,25 @@ class AnimatatedObject:
         """Add/Override an animation.
         if the animation already exists, it will be overridden
         """
+        if name not in self.animations:
+            self._names.append(name)
         self.animations[name] = animation
 
-    def draw(self, window, deltatime: int, position):
-        """Draw the current animation."""
+    def update(self):
+        """Update the current animation to the shared clock."""
         animation = self.current_animation
-        # TODO: move to an update function, update functions take responsibility of such
-        if animation.stop or self.stop or animation.static:
-            animation.draw(window, position)
-            return
-        self.elapsed += deltatime
-        frames_to_skip = self.elapsed // animation.speed
-        self.elapsed -= frames_to_skip * animation.speed
-        for _ in range(frames_to_skip):
-            animation.animate()
-        animation.draw(window, position)
+        if self.stop:
+            animation.hold(animation.clock.now)
+        else:
+            animation.update(animation.clock.now)
+
+    # pylint: disable=unused-argument
+    def draw(self, window, deltatime: int, position):
+        """
+        Draw the current frame of the animation, as of the last `update`.
+        `deltatime` is unused
+        """
+        self.current_animation.draw(window, position)
 
 
 if __name__ == "__main__":
@@ -161,6 +237,8 @@ if __name__ == "__main__":
             f"PFPS: {FPS}. FPS: {round(tclock.get_fps())}", True, (255, 255, 255)
         )
         twindow.blit(fps_text, (10, 10))
-        freddy.draw(twindow, tclock, (250, 250))
+        freddy.update()
+        freddy.draw(twindow, tclock.get_time(), (250, 250))
         pygame.display.flip()
         tclock.tick(FPS)
+        animation_clock.tick()
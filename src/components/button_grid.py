@@ -2,13 +2,27 @@
 
 # TODO: complete the class
 
+from functools import partial
+
 import pygame
 
+from utils.events import EventDispatcher, SpatialIndex
+
 
 class Button:
     """A simple button class for Pygame."""
 
-    __slots__ = ("rect", "text", "font", "color", "hover_color", "current_color")
+    __slots__ = (
+        "rect",
+        "text",
+        "font",
+        "color",
+        "hover_color",
+        "current_color",
+        "text_color",
+        "_variants",
+        "_variants_key",
+    )
 
     def __init__(
         self,
@@ -22,6 +36,10 @@ class Button:
         self.color = kwargs.get("color", (255, 255, 255))
         self.hover_color = kwargs.get("hover_color", (200, 200, 200))
         self.current_color = self.color
+        self.text_color = kwargs.get("text_color", (0, 0, 0))
+        self._variants: dict[tuple, pygame.Surface] = {}
+        """ the pre-rendered button for each background color """
+        self._variants_key = None
 
     @property
     def width(self):
@@ -43,12 +61,37 @@ class Button:
         """The y position of the button."""
         return self.rect.y
 
-    def draw(self, surface, daltetime: int):
-        """Draw the button on the screen."""
-        pygame.draw.rect(surface, self.current_color, self.rect)
-        text_surf = self.font.render(self.text, True, (0, 0, 0))
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+    def _render_variant(self, color, label: pygame.Surface) -> pygame.Surface:
+        variant = pygame.Surface(self.rect.size)
+        variant.fill(color)
+        variant.blit(label, label.get_rect(center=variant.get_rect().center))
+        return variant
+
+    def get_variant(self, color) -> pygame.Surface:
+        """
+        the button rendered with the background `color`. the label is
+        rendered once and the normal and hover variants are kept until
+        the text, font, text color or size change
+        """
+        key = (self.text, self.font, tuple(self.text_color), self.rect.size)
+        if key != self._variants_key:
+            self._variants_key = key
+            label = self.font.render(self.text, True, self.text_color)
+            self._variants = {
+                tuple(variant_color): self._render_variant(variant_color, label)
+                for variant_color in (self.color, self.hover_color)
+            }
+        color = tuple(color)
+        variant = self._variants.get(color)
+        if variant is None:
+            label = self.font.render(self.text, True, self.text_color)
+            variant = self._variants[color] = self._render_variant(color, label)
+        return variant
+
+    def draw(self, surface, daltetime: int, highlighted: bool = False):
+        """Draw the button on the screen, a highlighted button uses the hover color"""
+        color = self.hover_color if highlighted else self.current_color
+        surface.blit(self.get_variant(color), self.rect)
 
     def check_hover(self, mouse_pos):
         """Change color on hover."""
@@ -69,29 +112,107 @@ class Button:
 class ButtonsGrid(dict[str, Button]):
     """grid of buttons, holds the buttons and the current selected button"""
 
-    def __init__(self):
+    NAVIGATION_KEYS = {
+        pygame.K_LEFT: (-1, 0),
+        pygame.K_RIGHT: (1, 0),
+        pygame.K_UP: (0, -1),
+        pygame.K_DOWN: (0, 1),
+    }
+    ACTIVATE_KEYS = (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_SPACE)
+
+    def __init__(self, columns: int = 1):
         super().__init__()
         self.current_selected_button = 0
+        self.columns = columns
+        """ the buttons per row, the up and down keys move by a row """
+        self._names: list[str] = []
+        self._index: dict[str, int] = {}
+        self._spatial = SpatialIndex()
+        """ the names of the buttons by their rect, for `process_event` """
 
     def add(self, name, button: Button):
         """add a button to the grid"""
         if name in self:
             raise ValueError(f"Button with name {name} already exists")
         self[name] = button
+        self._index[name] = len(self._names)
+        self._names.append(name)
+        self._spatial.insert(name, button.rect)
+
+    def remove(self, name):
+        """remove a button from the grid"""
+        del self[name]
+        self._spatial.remove(name)
+        self._names.remove(name)
+        self._index = {name: index for index, name in enumerate(self._names)}
+        self.current_selected_button = min(
+            self.current_selected_button, max(len(self._names) - 1, 0)
+        )
+
+    def move(self, name: str):
+        """update the position of the button `name` after its rect changed"""
+        self._spatial.insert(name, self[name].rect)
+
+    def index_of(self, name: str) -> int:
+        """the position of the button `name`"""
+        return self._index[name]
+
+    @property
+    def selected_name(self) -> str:
+        """the name of the current selected button"""
+        return self._names[self.current_selected_button]
+
+    def select(self, index: int):
+        """select the button at `index`, clamped to the buttons"""
+        self.current_selected_button = min(max(index, 0), len(self._names) - 1)
+
+    def process_key(self, event: pygame.event.Event):
+        """move the selection with the arrow keys, enter or space clicks it"""
+        if event.type != pygame.KEYDOWN or not self._names:
+            return
+        if event.key in self.NAVIGATION_KEYS:
+            dx, dy = self.NAVIGATION_KEYS[event.key]
+            self.select(self.current_selected_button + dx + dy * self.columns)
+        elif event.key in self.ACTIVATE_KEYS:
+            name = self.selected_name
+            self.on_button_clicked(name, self[name])
 
     def process_event(self, event: pygame.event.Event):
-        """process button grid events"""
+        """process button grid events, clicks only reach the buttons under them"""
+        if event.type == pygame.KEYDOWN:
+            self.process_key(event)
+            return
+        if event.type != pygame.MOUSEBUTTONDOWN:
+            return
+        for name in self._spatial.at(event.pos):
+            self.process_button_event(name, event)
+
+    def register(self, dispatcher: EventDispatcher, keyboard: bool = False):
+        """
+        route each button's events through `dispatcher` instead of
+        `process_event`, a button then only sees the mouse events over it.
+        with `keyboard` the arrow keys move the selection too
+        """
         for name, button in self.items():
-            if button.is_clicked(event):
-                self.current_selected_button = list(self.keys()).index(name)
-                self.on_button_clicked(name, button)
+            dispatcher.add(button, handler=partial(self.process_button_event, name))
+        if keyboard:
+            dispatcher.on(pygame.KEYDOWN, self.process_key)
+
+    def process_button_event(self, name: str, event: pygame.event.Event):
+        """process an event routed to the button `name`"""
+        button = self[name]
+        if event.type == pygame.MOUSEMOTION:
+            button.check_hover(event.pos)
+        elif button.is_clicked(event):
+            self.current_selected_button = self._index[name]
+            self.on_button_clicked(name, button)
 
     def draw(self, surface: pygame.Surface, _: int):
         """draw the buttons"""
         if len(self) == 0:
             return
-        for button in self.values():
-            button.draw(surface)
+        for index, button in enumerate(self.values()):
+            button.draw(surface, _, highlighted=index == self.current_selected_button)
 
     def on_button_clicked(self, name, button: Button):
         """a handler for when a button is clicked"""
@@ -9,16 +9,22 @@ animation of the character.
 import glob
 import json
 from dataclasses import dataclass, field
+from functools import partial
 from os import path
+from typing import Callable, Optional
 
 import pygame
 
 from components.animate import AnimatatedObject, Animation
+from components.numericfield import NumericField
 from components.textbox import TextBox
+from core import Section
 from graphics import render_text_with_outline
-from graphics.textures import load_image
+from graphics.textures import load_image, placeholder_surface
+from utils.events import EventDispatcher
 from utils.helper import add_vectors, quick_load
-from utils.resources import CHARACTER_TEXTURES_PATH, FontBank
+from utils.resources import CHARACTER_TEXTURES_PATH, FontBank, load_font
+from utils.streaming import CRITICAL, HIGH, NORMAL, asset_streamer
 
 
 class StatusTextBox(TextBox):
@@ -28,6 +34,10 @@ class StatusTextBox(TextBox):
         return render_text_with_outline(text, self.font, self.font_color)
 
 
+class StatusNumericField(NumericField, StatusTextBox):
+    """a numeric field with the status font rendering"""
+
+
 @dataclass
 class Character:
     """A character class holds data like it's id and name"""
@@ -36,7 +46,15 @@ class Character:
     frames: list[str] = field(repr=False)
     id: int
     speed: int
-    icon: str = field(default="undefined.png")  # dummy data for now
+    icon: Optional[str] = None
+    """ the icon file, relative to the characters' textures folder """
+    sheet: Optional[dict] = field(default=None, repr=False)
+    """
+    optional sheet descriptor, when given `frames` is ignored and every
+    frame is played from one image: {"file": "name.png", "frame_size":
+    [w, h], "count": n, "columns": n} (columns defaults to count, a strip)
+    or {"file": "name.png", "rects": [[x, y, w, h], ...]}
+    """
 
     @staticmethod
     def from_json(data: str):
@@ -44,38 +62,66 @@ class Character:
         # TODO: ignore invalid arguments
         return Character(**json.loads(data))
 
+    def sheet_rects(self) -> list[pygame.Rect]:
+        """the area of each frame on the sheet"""
+        if "rects" in self.sheet:
+            return [pygame.Rect(rect) for rect in self.sheet["rects"]]
+        width, height = self.sheet["frame_size"]
+        count = self.sheet["count"]
+        columns = self.sheet.get("columns", count)
+        return [
+            pygame.Rect(
+                (index % columns) * width, (index // columns) * height, width, height
+            )
+            for index in range(count)
+        ]
+
 
 # pylint: disable=redefined-builtin
-def _create_textbox(rect, id: str):
-    return StatusTextBox(
+def _create_field(rect, id: str, value_range: tuple[int, int], on_commit=None):
+    return StatusNumericField(
         rect=rect,
-        font=pygame.font.Font("textures/fonts/ARIALNB.TTF", 30),
+        minimum=value_range[0],
+        maximum=value_range[1],
+        on_commit=on_commit,
+        font=load_font("textures/fonts/ARIALNB.TTF", 30, owner="characterbox"),
         transparent=True,
         font_color=pygame.Color("white"),
-        buffer=["0"],
         id=id,
     )
 
 
 class CharacterBox:
-    """the character box, here renders the character and the status of it"""
+    """
+    the character box, here renders the character and the status of it
+
+    :param on_commit: called with the key and the value of every edit
+        written to the save.
+    """
 
     box_color = (23, 23, 55, 128)
     textbox_width = 175
     size = (300, 380)
+    level_range = (1, 999)
+    next_range = (0, 9999999)
     current_selected_character: int
     last_selected_character: int
-    level_textbox: TextBox
-    next_textbox: TextBox
+    level_textbox: NumericField
+    next_textbox: NumericField
     characters: AnimatatedObject
+    character_data: list[Character]
+    section: Section = None
     force_update: bool
 
     def load_characters_animations(self):
-        """TODO: Insert docstring here"""
+        """
+        read the characters' json files and queue their frames for streaming,
+        the first frame of the selected character is loaded right away
+        """
         print("process of loading animations")
+        placeholder = placeholder_surface()
         for folder in glob.iglob(f"{CHARACTER_TEXTURES_PATH}\\*\\"):
             print("folder found", folder)
-            current_character_frames = []
             name = folder.split("\\")[1]
 
             data = quick_load(name, path.join(folder, f"{name}.json"))
@@ -83,33 +129,101 @@ class CharacterBox:
                 print("no json file found for character:", name)
                 continue
             character = Character.from_json(data)
+            selected = (
+                len(self.characters.animations) == self.current_selected_character
+            )
+            self.character_data.append(character)
+            if character.sheet is not None:
+                self.characters.add_animation(
+                    name, self.load_sheet_animation(folder, character, selected)
+                )
+                print(f"queued the sheet of {name!r}")
+                continue
 
-            # pylint: disable=cell-var-from-loop
-            for file in map(lambda f: path.join(folder, f), character.frames):
-                texture = load_image(file, hotspot=(125, 220))
-                current_character_frames.append(texture)
             animation = Animation(
-                frames=current_character_frames, speed=character.speed, repeat=-1
+                frames=[placeholder] * len(character.frames),
+                speed=character.speed,
+                repeat=-1,
             )
+            for index, frame in enumerate(character.frames):
+                if index == 0:
+                    priority = CRITICAL if selected else HIGH
+                else:
+                    priority = NORMAL
+                asset_streamer.request(
+                    partial(
+                        load_image,
+                        path.join(folder, frame),
+                        hotspot=(125, 220),
+                        owner="characters",
+                    ),
+                    partial(animation.set_streamed_frame, index),
+                    priority,
+                )
             self.characters.add_animation(name, animation)
-            print(f"loaded {len(current_character_frames)} frames for {name!r}")
+            print(f"queued {len(character.frames)} frames for {name!r}")
         self.characters.change_animation(0)
 
-    def __init__(self):
+    @staticmethod
+    def load_sheet_animation(folder: str, character: Character, selected: bool):
+        """create a character's animation from its sheet and queue the sheet"""
+        rects = character.sheet_rects()
+        animation = Animation(
+            frames=[placeholder_surface()] * len(rects),
+            speed=character.speed,
+            repeat=-1,
+            frame_rects=rects,
+        )
+        asset_streamer.request(
+            partial(
+                load_image,
+                path.join(folder, character.sheet["file"]),
+                hotspot=(125, 220),
+                owner="characters",
+            ),
+            animation.set_streamed_sheet,
+            CRITICAL if selected else HIGH,
+        )
+        return animation
+
+    def __init__(self, on_commit: Optional[Callable[[str, str], None]] = None):
         self.current_selected_character = 0
         self.last_selected_character = 0
         self.characters = AnimatatedObject()
+        self.character_data = []
         self.x = 115
         self.y = 20
-        self.next_textbox = _create_textbox(
-            self.calculate_rect_for_texbox(index=0), id="next"
+        self.next_textbox = _create_field(
+            self.calculate_rect_for_texbox(index=1), "next", self.next_range, on_commit
         )
-        self.level_textbox = _create_textbox(
-            self.calculate_rect_for_texbox(index=1), id="level"
+        self.level_textbox = _create_field(
+            self.calculate_rect_for_texbox(index=0),
+            "level",
+            self.level_range,
+            on_commit,
         )
         self.force_update = True
         self.load_characters_animations()
 
+    @property
+    def typing(self) -> bool:
+        """whether one of the text boxes is being typed into"""
+        return self.level_textbox.active or self.next_textbox.active
+
+    def bind_save(self, section: Section):
+        """bind the level and next fields to the selected character in `section`"""
+        self.section = section
+        if not self.character_data:
+            return
+        character_id = self.character_data[self.current_selected_character].id
+        self.level_textbox.bind(section, f"{character_id}lv")
+        self.next_textbox.bind(section, f"{character_id}next")
+
+    def commit(self):
+        """write the pending edits of the fields to the save"""
+        self.level_textbox.commit()
+        self.next_textbox.commit()
+
     @property
     def width(self):
         """The width of the character box."""
@@ -125,6 +239,7 @@ class CharacterBox:
         if self.last_selected_character != self.current_selected_character:
             self.last_selected_character = self.current_selected_character
             self.characters.change_animation(self.current_selected_character)
+            self.bind_save(self.section)
         # rect = surface.get_rect()
         height, width = self.size
         position = add_vectors(
@@ -156,6 +271,11 @@ class CharacterBox:
         self.level_textbox.get_event(event)
         self.next_textbox.get_event(event)
 
+    def register(self, dispatcher: EventDispatcher):
+        """route the text boxes' events through `dispatcher` instead of `process_event`"""
+        dispatcher.add(self.level_textbox, focusable=True)
+        dispatcher.add(self.next_textbox, focusable=True)
+
     def update(self):
         """update character box"""
         if self.force_update:
@@ -166,8 +286,11 @@ class CharacterBox:
         self.level_textbox.update()
         self.next_textbox.update()
 
-    def render(self, window: pygame.Surface, deltatime: int):
-        """draw character box"""
+    def render(self, window: pygame.Surface, deltatime: int, sprites=None):
+        """
+        draw character box, the character is drawn onto `sprites`
+        (e.g. a RenderQueue) if given, otherwise onto `window`
+        """
         # TODO: render background in it's own function, and also Input box should be in it's own function too
         # size = subtract_vectors((win_react.width, win_react.height), (self.height, self.width)) # (300, 380)
         size = self.size
@@ -182,9 +305,7 @@ class CharacterBox:
         )
         surf.blit(level_text, (20, height - level_text.get_height() - 20))
         surf.blit(level_next_text, (20, height - level_next_text.get_height() - 60))
-        self.next_textbox.rect = pygame.Rect(self.calculate_rect_for_texbox(index=0))
-        self.level_textbox.rect = pygame.Rect(self.calculate_rect_for_texbox(index=1))
         window.blit(surf, (self.x, self.y))
         self.level_textbox.draw(window)
         self.next_textbox.draw(window)
-        self.render_character(window, deltatime)
+        self.render_character(window if sprites is None else sprites, deltatime)
@@ -66,8 +66,12 @@ class Grid:
     """
     A grid component, holds other components and lays them out in a grid.
 
+    The layout is cached and only rebuilt on `add`, `remove` and `resize`,
+    the grid can be taller than its view and scrolled, only the cells
+    inside the visible clip rect are drawn.
+
     :param width: The width of the grid.
-    :param height: The height of the grid.
+    :param height: The height of the grid's view.
     :param border_width: The width of the border.
     :param border_height: The height of the border.
     :param cell_width_padding: The width of the padding between cells.
@@ -92,63 +96,131 @@ class Grid:
         self.cell_width_padding = cell_width_padding
         self.cell_height_padding = cell_height_padding
         self.components: list[Button] = components
+        self.scroll_y = 0
+        """ how far the grid is scrolled down in pixels """
+        self._layout: tuple[int, int, int] = None
+        """ the columns, width and height, None when it has to be rebuilt """
+
+    def invalidate(self):
+        """drop the cached layout, it's rebuilt on the next access"""
+        self._layout = None
+
+    @property
+    def layout(self) -> tuple[int, int, int]:
+        """the cached columns, width and height of the grid"""
+        if self._layout is None:
+            self._layout = self._build_layout()
+            self._place_components()
+        return self._layout
+
+    def _build_layout(self) -> tuple[int, int, int]:
+        if not self.components:
+            return 1, self.border_width * 2, self.border_height * 2
+        cell = self.components[0]
+        inner = self.grid_width - self.border_width * 2 - self.cell_width_padding
+        columns = max(1, inner // (cell.width + self.cell_width_padding))
+        used_columns = min(len(self.components), columns)
+        rows = (len(self.components) + columns - 1) // columns
+        # the cells are padded on both sides, the first one is inset from the border
+        width = self.border_width * 2 + (
+            cell.width * used_columns + self.cell_width_padding * (used_columns + 1)
+        )
+        height = self.border_height * 2 + (
+            cell.height * rows + self.cell_height_padding * (rows + 1)
+        )
+        return columns, width, height
+
+    def _place_components(self):
+        """move every component to its cell, only needed when the layout or scroll changes"""
+        if not self.components:
+            return
+        columns = self._layout[0]
+        cell = self.components[0]
+        step_x = cell.width + self.cell_width_padding
+        step_y = cell.height + self.cell_height_padding
+        left = self.x + self.border_width + self.cell_width_padding
+        top = self.y + self.border_height + self.cell_height_padding - self.scroll_y
+        for i, c in enumerate(self.components):
+            c.rect.topleft = (left + i % columns * step_x, top + i // columns * step_y)
+
+    @property
+    def max_scroll(self) -> int:
+        """how far the grid can be scrolled down"""
+        return max(0, self.height - self.grid_height)
+
+    def scroll_to(self, scroll_y: int):
+        """scroll the grid, clamped to its content"""
+        scroll_y = min(max(int(scroll_y), 0), self.max_scroll)
+        if scroll_y != self.scroll_y:
+            self.scroll_y = scroll_y
+            self._place_components()
+
+    def resize(self, width, height):
+        """change the size of the grid's view"""
+        self.grid_width, self.grid_height = width, height
+        self.invalidate()
+        self.scroll_to(self.scroll_y)
+
+    def process_event(self, event):
+        """scroll the grid with the mouse wheel while the cursor is over it"""
+        if event.type == pygame.MOUSEWHEEL and self.view.collidepoint(
+            pygame.mouse.get_pos()
+        ):
+            step = self.components[0].height if self.components else 0
+            self.scroll_to(self.scroll_y - event.y * step)
+
+    @property
+    def view(self) -> pygame.Rect:
+        """the visible part of the grid"""
+        return pygame.Rect(
+            self.x, self.y, self.width, min(self.height, self.grid_height)
+        )
+
+    def visible_range(self, clip: pygame.Rect) -> range:
+        """the indices of the components in the rows that `clip` crosses"""
+        columns = self.layout[0]
+        if not self.components or not clip:
+            return range(0)
+        step_y = self.components[0].height + self.cell_height_padding
+        top = self.y + self.border_height + self.cell_height_padding - self.scroll_y
+        first_row = max(0, (clip.top - top) // step_y)
+        last_row = (clip.bottom - 1 - top) // step_y
+        return range(
+            first_row * columns, min(len(self.components), (last_row + 1) * columns)
+        )
 
     def draw(self, surface, deltatime):
         """
-        Draw the grid onto the surface.
+        Draw the grid onto the surface, only the cells inside the visible
+        clip rect are drawn.
 
         :param surface: The surface to draw onto.
         :param deltatime: The time since the last frame.
         """
+        view = self.view
         # first draw the border
-        pygame.draw.rect(
-            surface, (0, 0, 0), (0, 0, self.width, self.height), self.border_width
-        )
-        pygame.draw.rect(
-            surface, (0, 0, 0), (0, 0, self.width, self.height), self.border_height
-        )
-
-        # then draw the cells
-        for i, c in enumerate(self.components):
-            # calculate the position of the component
-            x = (
-                (i % (self.width // (c.width + self.cell_width_padding)))
-                * (c.width + self.cell_width_padding)
-                + self.border_width
-                + self.cell_width_padding
-            )
-            y = (
-                (i // (self.width // (c.width + self.cell_width_padding)))
-                * (c.height + self.cell_height_padding)
-                + self.border_height
-                + self.cell_height_padding
-            )
-
-            # set the component's position
-            c.rect.topleft = (x, y)
-
-            # draw the component
-            c.draw(surface, deltatime)
+        pygame.draw.rect(surface, (0, 0, 0), view, self.border_width)
+        pygame.draw.rect(surface, (0, 0, 0), view, self.border_height)
+
+        # then draw the visible cells
+        clip = surface.get_clip().clip(view)
+        previous_clip = surface.get_clip()
+        surface.set_clip(clip)
+        for i in self.visible_range(clip):
+            c = self.components[i]
+            if c.rect.colliderect(clip):
+                c.draw(surface, deltatime)
+        surface.set_clip(previous_clip)
 
     @property
     def width(self):
         """The total width of the grid including borders."""
-        return self.border_width * 2 + (
-            self.grid_width * len(self.components)
-            + self.cell_width_padding * (len(self.components) - 1)
-        )
+        return self.layout[1]
 
     @property
     def height(self):
-        """The total height of the grid including borders."""
-        rows = (
-            len(self.components)
-            + (self.grid_width // (self.components[0].width + self.cell_width_padding))
-            - 1
-        ) // (self.grid_width // (self.components[0].width + self.cell_width_padding))
-        return self.border_height * 2 + (
-            self.components[0].height * rows + self.cell_height_padding * (rows - 1)
-        )
+        """The total height of the grid's content including borders."""
+        return self.layout[2]
 
     @property
     def x(self):
@@ -168,10 +240,12 @@ class Grid:
     def add(self, component):
         """Add a component to the grid."""
         self.components.append(component)
+        self.invalidate()
 
     def remove(self, component):
         """Remove a component from the grid."""
         self.components.remove(component)
+        self.invalidate()
 
 
 if __name__ == "__main__":
@@ -180,16 +254,14 @@ if __name__ == "__main__":
 
     grid = Grid(
         width=600,
-        height=900,
+        height=600,
         border_width=10,
         border_height=10,
         cell_width_padding=10,
         cell_height_padding=10,
         components=[
-            Button(position=(0, 0), size=(100, 100), text="Button 1"),
-            Button(position=(100, 100), size=(100, 100), text="Button 2"),
-            Button(position=(200, 200), size=(100, 100), text="Button 3"),
-            Button(position=(300, 300), size=(100, 100), text="Button 4"),
+            Button(position=(0, 0), size=(100, 100), text=f"Button {i + 1}")
+            for i in range(48)
         ],
     )
 
@@ -198,6 +270,7 @@ if __name__ == "__main__":
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
+            grid.process_event(event)
 
         window.fill((255, 255, 255))
         grid.draw(window, 0)
@@ -0,0 +1,186 @@
+"""NumericField component.
+
+A `TextBox` that holds an int instead of free text. Typed digits are
+checked against the field's range without a regex, the arrow keys and
+the scroll wheel step the value (holding an arrow key repeats the step)
+and the value is written straight through to a save section.
+
+Writes are coalesced: rapid adjustments only change the value and mark
+the text for relayout, which the text box does at most once per frame,
+the save is written once the value has settled for `COMMIT_DELAY`
+milliseconds, on enter, or when the field loses focus.
+
+"""
+
+from typing import Callable, Optional
+
+import pygame as pg
+
+from components.textbox import TextBox
+from core import Section
+from utils.clock import animation_clock
+
+COMMIT_DELAY = 300
+""" milliseconds the value has to stay unchanged before it's written """
+REPEAT_DELAY = 400
+REPEAT_INTERVAL = 50
+STEP_KEYS = {pg.K_UP: 1, pg.K_DOWN: -1}
+
+
+class NumericField(TextBox):
+    """
+    an int field bound to a key of a save section
+
+    :param minimum: the smallest value allowed.
+    :param maximum: the largest value allowed.
+    :param on_commit: called with the key and the value written after each write.
+    the other arguments are passed to `TextBox`
+    """
+
+    def __init__(
+        self,
+        rect,
+        minimum: int = 0,
+        maximum: int = 999,
+        on_commit: Optional[Callable[[str, str], None]] = None,
+        **kwargs,
+    ):
+        super().__init__(rect, buffer=list(str(minimum)), **kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value = minimum
+        self.section: Optional[Section] = None
+        self.key: Optional[str] = None
+        self.on_commit = on_commit
+        self.writes = 0
+        """ the amount of times the save was written """
+        self._pending = False
+        self._changed_at = 0
+        self._repeat_step = 0
+        self._repeat_at = 0
+
+    def clamp(self, value: int) -> int:
+        """clamp `value` to the field's range"""
+        return min(max(value, self.minimum), self.maximum)
+
+    def bind(self, section: Optional[Section], key: str):
+        """
+        bind the field to `section[key]`, the pending value of the previous
+        binding is written first. a missing or invalid value reads as the minimum
+        """
+        self.commit()
+        self.section, self.key = section, key
+        stored = section.get(key, "") if section is not None else ""
+        value = int(stored) if stored.isdecimal() else self.minimum
+        self.value = self.clamp(value)
+        self.buffer = list(str(self.value))
+        self.dirty = True
+
+    def set_value(self, value: int):
+        """change the value, the save is written once the value settles"""
+        value = self.clamp(value)
+        if value == self.value and self.buffer == list(str(value)):
+            return
+        self.value = value
+        self.buffer = list(str(value))
+        self.dirty = True
+        self._pending = True
+        self._changed_at = animation_clock.now
+
+    def step(self, amount: int):
+        """add `amount` to the value"""
+        self.set_value(self.value + amount)
+
+    def commit(self):
+        """write the value to the save if it changed"""
+        if not self._pending:
+            return
+        if not self.buffer or self.clamp(self.value) != self.value:
+            # emptied or typed out of range
+            self.set_value(self.value if self.buffer else self.minimum)
+        self._pending = False
+        if self.section is None or self.key is None:
+            return
+        if self.section.get(self.key) != str(self.value):
+            self.section[self.key] = str(self.value)
+            self.writes += 1
+            if self.on_commit is not None:
+                self.on_commit(self.key, str(self.value))
+
+    def vaildate(self, char: str):
+        """check that `char` is a digit and the value it makes is in range"""
+        if not char.isdecimal():
+            return False
+        digits = self.buffer if self.buffer != ["0"] else []
+        return int("".join(digits) + char) <= self.maximum
+
+    def _type(self, char: str):
+        if not self.vaildate(char):
+            self.invalid = True
+            return
+        self.invalid = False
+        if self.buffer == ["0"]:
+            self.buffer = []
+        self.buffer.append(char)
+        self.value = int("".join(self.buffer))
+        self.dirty = True
+        self._pending = True
+        self._changed_at = animation_clock.now
+
+    def _erase(self):
+        if not self.buffer:
+            return
+        self.buffer.pop()
+        self.value = int("".join(self.buffer)) if self.buffer else self.minimum
+        self.dirty = True
+        self._pending = True
+        self._changed_at = animation_clock.now
+
+    def _step_amount(self, direction: int) -> int:
+        return direction * (10 if pg.key.get_mods() & pg.KMOD_SHIFT else 1)
+
+    def get_event(self, event):
+        """get event and process it"""
+        if event.type == pg.KEYDOWN and self.active:
+            if event.key in STEP_KEYS:
+                self._repeat_step = STEP_KEYS[event.key]
+                self._repeat_at = animation_clock.now + REPEAT_DELAY
+                self.step(self._step_amount(self._repeat_step))
+            elif event.key in (pg.K_RETURN, pg.K_KP_ENTER):
+                self.execute()
+            elif event.key == pg.K_BACKSPACE:
+                self._erase()
+            elif event.unicode:
+                self._type(event.unicode)
+        elif event.type == pg.KEYUP and STEP_KEYS.get(event.key) == self._repeat_step:
+            self._repeat_step = 0
+        elif event.type == pg.MOUSEWHEEL and (
+            self.active or self.rect.collidepoint(pg.mouse.get_pos())
+        ):
+            self.step(self._step_amount(event.y))
+        elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
+            was_active = self.active
+            super().get_event(event)
+            if was_active and not self.active:
+                self.commit()
+
+    def execute(self):
+        """write the value and execute the command"""
+        self._repeat_step = 0
+        self.commit()
+        self.final = str(self.value)
+        super().execute()
+
+    def update(self):
+        """repeat held steps, relayout once per frame and write the settled value"""
+        now = animation_clock.now
+        if self._repeat_step and self.active:
+            while now >= self._repeat_at:
+                self.step(self._step_amount(self._repeat_step))
+                self._repeat_at += REPEAT_INTERVAL
+        if self.active:
+            self.update_blink()
+        if self._pending and now - self._changed_at >= COMMIT_DELAY:
+            self.commit()
+        if self.needs_layout():
+            self.relayout()
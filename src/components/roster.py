@@ -0,0 +1,195 @@
+"""A scrollable roster of character icons for the editor.
+
+Only the visible rows are drawn. The cells are rendered into a fixed
+pool of surfaces that's recycled as the roster scrolls: the character at
+index i always uses the pool slot i % pool size, a slot is only rendered
+again when the character it holds changes. Icons are loaded lazily
+through the asset streamer once their row comes into view and dropped
+once it's far out of view, so the frame time and the memory used don't
+depend on the size of the roster.
+
+"""
+
+from collections import OrderedDict
+from functools import partial
+from os import path
+from typing import Callable, Optional
+
+import pygame
+
+from graphics.textures import load_image, placeholder_surface
+from utils.resources import CHARACTER_TEXTURES_PATH
+from utils.streaming import HIGH, asset_streamer
+
+
+class CharacterRoster:
+    """
+    a virtualized grid of character icons
+
+    :param rect: the view of the roster on the window.
+    :param icons: the icon file of every character, relative to the
+        characters' textures folder, None for a character without one.
+    :param cell_size: the size of a cell, padding included.
+    :param on_select: called with the index of the character that got clicked.
+    """
+
+    background_color = (23, 23, 55, 128)
+    selected_color = (255, 220, 80)
+    padding = 4
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        rect,
+        icons: list[str],
+        cell_size: int = 64,
+        on_select: Optional[Callable[[int], None]] = None,
+    ):
+        self.rect = pygame.Rect(rect)
+        self.icons = icons
+        self.cell_size = cell_size
+        self.on_select = on_select
+        self.selected = 0
+        self.scroll_y = 0
+        self.visible = True
+        """ a hidden roster ignores its events """
+        self.columns = max(1, self.rect.width // cell_size)
+        self.pool = self._create_pool()
+        self._slot_owner: list[Optional[tuple]] = [None] * len(self.pool)
+        """ what each pool slot holds: (index, selected, icon loaded) """
+        self._icons: OrderedDict[int, pygame.Surface] = OrderedDict()
+        """ the scaled icons, at most two pools worth, least recently seen first """
+        self._requested: set[int] = set()
+        self.renders = 0
+        """ the amount of cells rendered into the pool """
+
+    def _create_pool(self) -> list[pygame.Surface]:
+        visible_rows = (
+            self.rect.height // self.cell_size + 2
+        )  # partial rows at both edges
+        return [
+            pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+            for _ in range(self.columns * visible_rows)
+        ]
+
+    def resize(self, rect):
+        """move the roster's view to `rect`, the pool is rebuilt for its size"""
+        self.rect = pygame.Rect(rect)
+        self.columns = max(1, self.rect.width // self.cell_size)
+        self.pool = self._create_pool()
+        self._slot_owner = [None] * len(self.pool)
+        self.scroll_to(self.scroll_y)
+
+    @property
+    def rows(self) -> int:
+        """the amount of rows of the whole roster"""
+        return (len(self.icons) + self.columns - 1) // self.columns
+
+    @property
+    def max_scroll(self) -> int:
+        """how far the roster can be scrolled down"""
+        return max(0, self.rows * self.cell_size - self.rect.height)
+
+    def scroll_to(self, scroll_y: int):
+        """scroll the roster, clamped to its content"""
+        self.scroll_y = min(max(int(scroll_y), 0), self.max_scroll)
+
+    def visible_range(self) -> range:
+        """the indices of the characters in the visible rows"""
+        first_row = self.scroll_y // self.cell_size
+        last_row = (self.scroll_y + self.rect.height - 1) // self.cell_size
+        return range(
+            first_row * self.columns,
+            min(len(self.icons), (last_row + 1) * self.columns),
+        )
+
+    def index_at(self, position) -> Optional[int]:
+        """the index of the character under `position`, if any"""
+        if not self.rect.collidepoint(position):
+            return None
+        column = (position[0] - self.rect.x) // self.cell_size
+        row = (position[1] - self.rect.y + self.scroll_y) // self.cell_size
+        index = row * self.columns + column
+        if column >= self.columns or index >= len(self.icons):
+            return None
+        return index
+
+    def get_event(self, event: pygame.event.Event):
+        """scroll with the mouse wheel and select with a click"""
+        if not self.visible:
+            return
+        if event.type == pygame.MOUSEWHEEL:
+            self.scroll_to(self.scroll_y - event.y * self.cell_size // 2)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            index = self.index_at(event.pos)
+            if index is not None:
+                self.selected = index
+                if self.on_select is not None:
+                    self.on_select(index)
+
+    def _set_icon(self, index: int, surface: pygame.Surface):
+        self._requested.discard(index)
+        if index not in self.visible_range():
+            return  # scrolled away before it finished loading
+        size = self.cell_size - self.padding * 2
+        self._icons[index] = pygame.transform.smoothscale(surface, (size, size))
+        while len(self._icons) > len(self.pool) * 2:
+            self._icons.popitem(last=False)
+
+    def _icon(self, index: int) -> Optional[pygame.Surface]:
+        """the icon of the character at `index`, queued to load if it isn't yet"""
+        icon = self._icons.get(index)
+        if icon is not None:
+            self._icons.move_to_end(index)
+            return icon
+        if self.icons[index] is not None and index not in self._requested:
+            self._requested.add(index)
+            asset_streamer.request(
+                partial(self._load_icon, self.icons[index]),
+                partial(self._set_icon, index),
+                HIGH,
+            )
+        return None
+
+    @staticmethod
+    def _load_icon(file: str) -> pygame.Surface:
+        try:
+            return load_image(path.join(CHARACTER_TEXTURES_PATH, file), owner="roster")
+        except (OSError, pygame.error) as error:
+            print(f"couldn't load the roster icon {file!r}: {error}")
+            return placeholder_surface()
+
+    def _render_cell(self, slot: int, index: int, icon: Optional[pygame.Surface]):
+        cell = self.pool[slot]
+        cell.fill((0, 0, 0, 0))
+        inner = cell.get_rect().inflate(-self.padding, -self.padding)
+        pygame.draw.rect(cell, self.background_color, inner, border_radius=4)
+        if icon is not None:
+            cell.blit(icon, icon.get_rect(center=inner.center))
+        if index == self.selected:
+            pygame.draw.rect(cell, self.selected_color, inner, 2, border_radius=4)
+        self.renders += 1
+
+    def draw(self, surface):
+        """draw the visible rows, `surface` can be a RenderQueue"""
+        for index in self.visible_range():
+            slot = index % len(self.pool)
+            icon = self._icon(index)
+            owner = (index, index == self.selected, icon is not None)
+            if self._slot_owner[slot] != owner:
+                self._render_cell(slot, index, icon)
+                self._slot_owner[slot] = owner
+            row, column = divmod(index, self.columns)
+            position = (
+                self.rect.x + column * self.cell_size,
+                self.rect.y + row * self.cell_size - self.scroll_y,
+            )
+            # only the part of the cell inside the view is drawn
+            area = pygame.Rect(position, (self.cell_size, self.cell_size)).clip(
+                self.rect
+            )
+            surface.blit(
+                self.pool[slot],
+                area.topleft,
+                area.move(-position[0], -position[1]),
+            )
@@ -0,0 +1,152 @@
+"""Previews of the save slots for the main menu.
+
+A worker thread checks the slot files' mtimes and parses the saves whose
+file changed into a `SaveSummary`, the menu never waits for it. The
+summaries are handed back through a queue and rendered on the main
+thread into small cached surfaces by `SlotPreviews.pump`, a preview is
+only parsed and rendered again once its file's mtime changes.
+
+"""
+
+import glob
+import json
+import os
+import queue
+from threading import Thread
+from typing import Optional
+
+import pygame
+
+from core import SaveSummary, read_save, summarize
+from graphics import render_text_with_outline
+from graphics.textures import load_image
+from utils.resources import CHARACTER_TEXTURES_PATH
+
+MISSING = object()
+""" the summary of a slot without a save file """
+
+
+def character_icons() -> dict[int, str]:
+    """the icon file of every character by id"""
+    icons = {}
+    for file in glob.glob(os.path.join(CHARACTER_TEXTURES_PATH, "*", "*.json")):
+        with open(file, encoding="utf-8") as data:
+            character = json.load(data)
+        if "icon" in character:
+            icons[character["id"]] = character["icon"]
+    return icons
+
+
+class SlotPreviews:
+    """
+    the previews of the save slots, built in the background
+
+    :param paths: the save file of every slot.
+    :param size: the size of a preview.
+    """
+
+    icon_size = 20
+    font_size = 22
+
+    def __init__(self, paths: list[str], size=(250, 22)):
+        self.paths = paths
+        self.size = size
+        self.previews: list[Optional[pygame.Surface]] = [None] * len(paths)
+        """ the rendered preview of every slot, None until it's ready """
+        self._mtimes: list[Optional[float]] = [None] * len(paths)
+        """ the mtime of the file each preview was built from """
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._worker: Optional[Thread] = None
+        self._icon_files: Optional[dict[int, str]] = None
+        self._icons: dict[int, pygame.Surface] = {}
+        self._font: Optional[pygame.font.Font] = None
+        self.renders = 0
+        """ the amount of previews rendered """
+
+    def refresh(self):
+        """check every slot in the background, changed ones are built again"""
+        if self._worker is None:
+            self._worker = Thread(target=self._work, daemon=True)
+            self._worker.start()
+        for slot in range(len(self.paths)):
+            self._jobs.put(slot)
+
+    def _work(self):
+        while True:
+            slot = self._jobs.get()
+            path = self.paths[slot]
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                mtime = -1.0
+            if mtime == self._mtimes[slot]:
+                continue
+            if mtime < 0:
+                summary = MISSING
+            else:
+                try:
+                    summary = summarize(read_save(path))
+                except (OSError, ValueError) as error:
+                    summary = error
+            self._results.put((slot, mtime, summary))
+
+    def pump(self) -> bool:
+        """render the previews the worker finished, returns whether any changed"""
+        changed = False
+        while True:
+            try:
+                slot, mtime, summary = self._results.get_nowait()
+            except queue.Empty:
+                return changed
+            self._mtimes[slot] = mtime
+            self.previews[slot] = self.render(summary)
+            changed = True
+
+    def icon(self, character: int) -> Optional[pygame.Surface]:
+        """the scaled icon of `character`, None if it has none"""
+        if character in self._icons:
+            return self._icons[character]
+        if self._icon_files is None:
+            self._icon_files = character_icons()
+        file = self._icon_files.get(character)
+        icon = None
+        if file is not None:
+            image = load_image(
+                os.path.join(CHARACTER_TEXTURES_PATH, file), owner="slot previews"
+            )
+            icon = pygame.transform.smoothscale(image, (self.icon_size, self.icon_size))
+        self._icons[character] = icon
+        return icon
+
+    def render(self, summary) -> pygame.Surface:
+        """render the preview of a slot, as wide as its content up to `size`"""
+        if self._font is None:
+            self._font = pygame.font.Font(None, self.font_size)
+        font = self._font
+        if not isinstance(summary, SaveSummary):
+            preview = pygame.Surface(self.size, pygame.SRCALPHA)
+            text = "empty" if summary is MISSING else "unreadable"
+            label = render_text_with_outline(text, font, (200, 200, 200))
+            preview.blit(label, label.get_rect(center=preview.get_rect().center))
+            self.renders += 1
+            return preview
+        icons = [self.icon(character) for character in summary.party]
+        icons = [icon for icon in icons if icon is not None]
+        label = render_text_with_outline(
+            f"lv {summary.total_level}  {summary.tokens} tokens"
+            f"  {summary.areas} areas",
+            font,
+            (255, 255, 255),
+        )
+        x = len(icons) * (self.icon_size + 2) + (6 if icons else 0)
+        width = min(self.size[0], x + label.get_width())
+        preview = pygame.Surface((width, self.size[1]), pygame.SRCALPHA)
+        for index, icon in enumerate(icons):
+            preview.blit(
+                icon,
+                (index * (self.icon_size + 2), (self.size[1] - self.icon_size) // 2),
+            )
+        preview.blit(label, (x, (self.size[1] - label.get_height()) // 2))
+        self.renders += 1
+        return preview
@@ -12,11 +12,137 @@ originally created by Mekire, improved version by iamme
 """
 
 import re
-from typing import Callable
+from typing import Callable, NamedTuple
 
 import pygame as pg
 
+from utils.clock import animation_clock
+
 ACCEPTED = r"[a-zA-Z0-9.\"#$%&'()*+,-./:;<=>?@\[\\\]\^_`{\|}~]*"
+BLINK_INTERVAL = 200
+
+
+class Segment(NamedTuple):
+    """a run of characters of a `TextLayout` rendered as one string"""
+
+    start: int
+    end: int
+    x: int
+    surface: pg.Surface
+    ink_left: int
+    ink_right: int
+    """ the columns of the line the segment's visible pixels are in """
+
+
+class TextLayout:
+    """
+    a single line of text laid out in segments.
+
+    every segment is a run of characters rendered as one string and blitted
+    where a render of the whole line draws it, from the font's prefix
+    widths. the line is only split where the ink of two characters doesn't
+    touch, glyphs that overlap (kerning pairs, outlined text) are rendered
+    together. editing the text only renders the segments from the edit on
+    again, the rest of the line is kept.
+
+    lines without kerning (numbers) look exactly like a full render.
+    SDL_ttf keeps the pen in fractions of a pixel after a kerning pair, so
+    a segment after one can land a pixel off
+
+    :param render: renders a string.
+    :param font: the font used to measure the offsets.
+    """
+
+    def __init__(self, render: Callable[[str], pg.Surface], font: pg.font.Font):
+        self.render = render
+        self.font = font
+        self.chars: list[str] = []
+        self.prefix_widths: list[int] = [0]
+        """ the width of the text up to every character, and of all of it """
+        self.segments: list[Segment] = []
+        self.surface: pg.Surface = None
+        self.renders = 0
+        """ the amount of strings rendered """
+
+    @property
+    def width(self) -> int:
+        """the width of the rendered line"""
+        if not self.segments:
+            return 0
+        last = self.segments[-1]
+        return last.x + last.surface.get_width()
+
+    @property
+    def height(self) -> int:
+        """the height of the line"""
+        return self._get_surface(0).get_height()
+
+    def offset(self, index: int) -> int:
+        """the x a render of the whole line draws the character at `index` at"""
+        return self.prefix_widths[index + 1] - self.font.size(self.chars[index])[0]
+
+    def _get_surface(self, width: int) -> pg.Surface:
+        """the line surface, grown to at least `width`"""
+        if self.surface is None:
+            height = self.render(" ").get_height()
+            self.surface = pg.Surface((max(width, 64), height), pg.SRCALPHA)
+        elif width > self.surface.get_width():
+            grown = pg.Surface(
+                (max(width, self.surface.get_width() * 2), self.surface.get_height()),
+                pg.SRCALPHA,
+            )
+            grown.blit(self.surface, (0, 0))
+            self.surface = grown
+        return self.surface
+
+    def _segment(self, start: int) -> Segment:
+        """render the characters from `start` on as one segment"""
+        x = self.offset(start)
+        surface = self.render("".join(self.chars[start:]))
+        self.renders += 1
+        ink = surface.get_bounding_rect()
+        if not ink.width:
+            return Segment(start, len(self.chars), x, surface, x, x)
+        return Segment(start, len(self.chars), x, surface, x + ink.left, x + ink.right)
+
+    def set_text(self, chars: list[str]):
+        """lay out `chars`, only the segments after the common prefix are redone"""
+        common = 0
+        for old, new in zip(self.chars, chars):
+            if old != new:
+                break
+            common += 1
+        if common == len(self.chars) == len(chars):
+            return
+        while self.segments and self.segments[-1].end > common:
+            self.segments.pop()
+        self.chars[common:] = chars[common:]
+        text = "".join(self.chars)
+        del self.prefix_widths[common + 1 :]
+        self.prefix_widths.extend(
+            self.font.size(text[:index])[0]
+            for index in range(common + 1, len(text) + 1)
+        )
+
+        tail = None
+        start = self.segments[-1].end if self.segments else 0
+        if start < len(self.chars):
+            tail = self._segment(start)
+            # characters whose ink touches the kept line are rendered with it
+            ink_left = tail.ink_left
+            while self.segments and self.segments[-1].ink_right > ink_left:
+                ink_left = min(ink_left, self.segments.pop().ink_left)
+            merged = self.segments[-1].end if self.segments else 0
+            if merged != start:
+                tail = self._segment(merged)
+        surface = self._get_surface(tail.x + tail.surface.get_width() if tail else 0)
+        left = self.segments[-1].ink_right if self.segments else 0
+        surface.fill(
+            (0, 0, 0, 0), (left, 0, surface.get_width() - left, surface.get_height())
+        )
+        if tail is not None:
+            surface.blit(tail.surface, (tail.x, 0))
+            self.segments.append(tail)
 
 
 # TODO: give better comments and change it to a dataclass, solve sensible pylint warnings
@@ -99,6 +225,12 @@ class TextBox:
         self.rendered = None
         self.render_rect = None
         self.render_area = None
+        self.layout = None
+        self.dirty = True
+        """
+        forces the next update to lay the text out again, edits of `buffer`
+        are noticed without it (see `needs_layout`)
+        """
 
     def vaildate(self, char: str):
         """check if char is valid according to regex"""
@@ -112,20 +244,27 @@ class TextBox:
             elif event.key == pg.K_BACKSPACE:
                 if self.buffer:
                     self.buffer.pop()
+                    self.dirty = True
             elif event.unicode:
                 if self.vaildate(event.unicode):
                     self.invalid = False
                     self.buffer.append(event.unicode)
+                    self.dirty = True
                 else:
                     self.invalid = True
         elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
             self.active = self.rect.collidepoint(event.pos)
+            self.blink_timer = animation_clock.now
             # TODO: remove
             # print(repr(self.id),
             # "RECT CLLIDE", self.rect.collidepoint(event.pos),
             # "RECT", self.rect,
             # "RENDER RECT CLLIDE", self.render_rect.collidepoint(event.pos))
 
+    def update_blink(self):
+        """blink the cursor in step with the shared animation clock"""
+        self.blink = (animation_clock.now - self.blink_timer) // BLINK_INTERVAL % 2 == 0
+
     def execute(self):
         """execute the command with the current self.final as argument"""
         if self.command:
@@ -133,52 +272,48 @@ class TextBox:
         self.active = not self.inactive_on_enter
         if self.clear_on_enter:
             self.buffer = []
+            self.dirty = True
 
     def render_font(self, text) -> pg.Surface:
         """render text in font and color"""
         return self.font.render(text, True, self.font_color)
 
-    def force_update(self):
-        """force an update of the text box without needing to be focused"""
+    def relayout(self):
+        """lay out the buffer, only the edited tail of the text is rendered again"""
+        if self.layout is None:
+            self.layout = TextLayout(self.render_font, self.font)
+        self.layout.set_text(self.buffer)
         self.final = "".join(self.buffer)
-        self.rendered = self.render_font(self.final)
-        self.render_rect = self.rendered.get_rect(
-            x=self.rect.x + 2, centery=self.rect.centery
+        self.dirty = False
+        width, height = self.layout.width, self.layout.height
+        self.rendered = self.layout.surface
+        self.render_rect = pg.Rect(0, 0, width, height)
+        self.render_rect.x, self.render_rect.centery = (
+            self.rect.x + 2,
+            self.rect.centery,
         )
-        if self.render_rect.width > self.rect.width - 6:
-            offset = self.render_rect.width - (self.rect.width - 6)
-            self.render_area = pg.Rect(
-                offset, 0, self.rect.width - 6, self.render_rect.height
-            )
+        if width > self.rect.width - 6:
+            offset = width - (self.rect.width - 6)
+            self.render_area = pg.Rect(offset, 0, self.rect.width - 6, height)
         else:
-            self.render_area = self.rendered.get_rect(topleft=(0, 0))
-        # TODO: change to use dalte time (check animate.py)
-        if pg.time.get_ticks() - self.blink_timer > 200:
-            self.blink = not self.blink
-            self.blink_timer = pg.time.get_ticks()
+            self.render_area = pg.Rect(0, 0, width, height)
+
+    def force_update(self):
+        """force an update of the text box without needing to be focused"""
+        self.relayout()
+        self.update_blink()
+
+    def needs_layout(self) -> bool:
+        """whether the buffer changed since it was last laid out"""
+        return self.dirty or self.layout is None or self.layout.chars != self.buffer
 
     def update(self):
-        """update the blink timer"""
+        """update the blink timer, and the layout if the buffer was edited"""
         if not self.active and self.final is not None:  # an update is not necessary
             return
-        # TODO: change to use dalte time (check animate.py)
-        if pg.time.get_ticks() - self.blink_timer > 200:
-            self.blink = not self.blink
-            self.blink_timer = pg.time.get_ticks()
-        new = "".join(self.buffer)
-        if new != self.final:
-            self.final = new
-            self.rendered = self.render_font(self.final)
-            self.render_rect = self.rendered.get_rect(
-                x=self.rect.x + 2, centery=self.rect.centery
-            )
-            if self.render_rect.width > self.rect.width - 6:
-                offset = self.render_rect.width - (self.rect.width - 6)
-                self.render_area = pg.Rect(
-                    offset, 0, self.rect.width - 6, self.render_rect.height
-                )
-            else:
-                self.render_area = self.rendered.get_rect(topleft=(0, 0))
+        self.update_blink()
+        if self.needs_layout():
+            self.relayout()
 
     def draw(self, surface):
         """draw the text box"""
@@ -0,0 +1,68 @@
+"""
+The save library of the editor, free of pygame.
+
+Reading, editing, validating and writing FNaF World saves only needs this
+package, so tools and services can use it without paying for pygame's
+import and SDL. The editor's GUI is built on top of it.
+
+    from core import SECTION, SaveFile, write_save
+
+    save = SaveFile.load(path)
+    save[SECTION]["tokens"] = "500"
+    write_save(save, path)
+
+The backup store (`core.backups`) and the corpus index (`core.index`)
+aren't imported with the package, sqlite3 would cost more than the rest
+of it. The columnar corpus (`core.columns`) isn't either, it needs numpy.
+"""
+
+from .model import SECTION, SaveFile, Section
+from .parser import ParseError, parse_save, read_save
+from .paths import SLOTS, find_saves, saves_directory, slot_name, slot_path
+from .schema import (
+    FNAFW_SCHEMA,
+    FlagField,
+    IntField,
+    Validator,
+    compile_schema,
+    fnafw_validator,
+)
+from .summary import (
+    LOCATIONS,
+    PARTY_KEYS,
+    SaveSummary,
+    summarize,
+    unlocked_locations,
+)
+from .validation import ValidationIssue, validate_structure
+from .writer import dump_save, replace_file, write_save
+
+__all__ = [
+    "SECTION",
+    "SaveFile",
+    "Section",
+    "SLOTS",
+    "find_saves",
+    "saves_directory",
+    "slot_name",
+    "slot_path",
+    "ParseError",
+    "parse_save",
+    "read_save",
+    "FNAFW_SCHEMA",
+    "FlagField",
+    "IntField",
+    "Validator",
+    "compile_schema",
+    "fnafw_validator",
+    "LOCATIONS",
+    "PARTY_KEYS",
+    "SaveSummary",
+    "summarize",
+    "unlocked_locations",
+    "ValidationIssue",
+    "validate_structure",
+    "dump_save",
+    "replace_file",
+    "write_save",
+]
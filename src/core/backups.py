@@ -0,0 +1,288 @@
+"""
+Content-addressed backups of the save files.
+
+`BackupStore.snapshot` records a save file before it's overwritten. The
+file is split into its lines, every `key=value` line (and section header)
+is a chunk stored once under the hash of its content, whatever snapshot
+or slot it came from. Chunks and manifests are zlib-compressed when that
+makes them smaller.
+
+A snapshot is the list of its chunks' ids, its manifest. Every
+`KEYFRAME_INTERVAL`th snapshot of a slot stores the whole manifest, the
+ones in between only store the positions that changed since the previous
+snapshot, so a snapshot that changed one key costs one chunk and a
+few bytes. Restoring applies at most `KEYFRAME_INTERVAL` of those deltas
+and joins the chunks back into the exact bytes of the file.
+
+    store = BackupStore()
+    store.snapshot("fnafwr1", path)
+    store.restore(store.snapshots("fnafwr1")[0].id, path)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+
+from .paths import saves_directory
+from .writer import replace_file
+
+KEYFRAME_INTERVAL = 32
+""" a snapshot stores its whole manifest once every this many snapshots of a slot """
+
+_RAW, _ZLIB = b"r", b"z"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    slot TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    base INTEGER REFERENCES snapshots (id),
+    manifest BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_slot ON snapshots (slot, id);
+"""
+
+
+def default_store_path() -> str:
+    """the backup store next to the game's saves"""
+    return os.path.join(saves_directory(), "fnafw-editor-backups.sqlite3")
+
+
+def _compress(data: bytes) -> bytes:
+    compressed = zlib.compress(data, 9)
+    if len(compressed) < len(data):
+        return _ZLIB + compressed
+    return _RAW + data
+
+
+def _decompress(data: bytes) -> bytes:
+    if data[:1] == _ZLIB:
+        return zlib.decompress(data[1:])
+    return data[1:]
+
+
+def _encode(numbers) -> bytes:
+    """pack non-negative ints as LEB128 varints"""
+    encoded = bytearray()
+    for number in numbers:
+        while number >= 0x80:
+            encoded.append(number & 0x7F | 0x80)
+            number >>= 7
+        encoded.append(number)
+    return bytes(encoded)
+
+
+def _decode(data: bytes) -> list[int]:
+    numbers, number, shift = [], 0, 0
+    for byte in data:
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        numbers.append(number)
+        number, shift = 0, 0
+    return numbers
+
+
+def _delta(base: list[int], manifest: list[int]) -> list[int]:
+    """the length of `manifest` followed by the (position, id) pairs that differ from `base`"""
+    delta = [len(manifest)]
+    for position, chunk in enumerate(manifest):
+        if position >= len(base) or base[position] != chunk:
+            delta += (position, chunk)
+    return delta
+
+
+def _apply(base: list[int], delta: list[int]) -> list[int]:
+    manifest = (base + [0] * delta[0])[: delta[0]]
+    for index in range(1, len(delta), 2):
+        manifest[delta[index]] = delta[index + 1]
+    return manifest
+
+
+class Snapshot:
+    """a recorded version of a save file"""
+
+    __slots__ = ("id", "slot", "taken_at", "size")
+
+    def __init__(self, id: int, slot: str, taken_at: float, size: int):
+        # pylint: disable=redefined-builtin
+        self.id = id
+        self.slot = slot
+        self.taken_at = taken_at
+        """ seconds since the epoch """
+        self.size = size
+        """ the size of the file in bytes """
+
+    def __repr__(self):
+        taken_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.taken_at))
+        return f"<Snapshot {self.id} of {self.slot} at {taken_at}, {self.size}B>"
+
+
+class BackupStore:
+    """
+    deduplicated, compressed snapshots of save files in an sqlite database,
+    the database is opened on first use
+
+    :param path: the database file, ":memory:" keeps it in memory. by
+        default the store next to the saves, found when it's opened.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._latest: dict[str, tuple[int, int, list[int]]] = {}
+        """ the latest snapshot of each slot: (id, deltas since its keyframe, manifest) """
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """the database, created if it doesn't exist"""
+        if self._connection is None:
+            if self.path is None:
+                self.path = default_store_path()
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def close(self):
+        """close the database, it's opened again when needed"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._latest.clear()
+
+    def _chunk_id(self, data: bytes) -> int:
+        """the id of the chunk holding `data`, stored if it's new"""
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        row = self.connection.execute(
+            "SELECT id FROM chunks WHERE digest = ?", (digest,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        return self.connection.execute(
+            "INSERT INTO chunks (digest, data) VALUES (?, ?)",
+            (digest, _compress(data)),
+        ).lastrowid
+
+    def _resolve(self, snapshot_id: int) -> tuple[list[int], int]:
+        """the manifest of a snapshot and the amount of deltas since its keyframe"""
+        chain = []
+        row_id = snapshot_id
+        while row_id is not None:
+            row = self.connection.execute(
+                "SELECT base, manifest FROM snapshots WHERE id = ?", (row_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"no snapshot {row_id}")
+            row_id = row[0]
+            chain.append(_decode(_decompress(row[1])))
+        manifest = chain.pop()
+        depth = len(chain)
+        while chain:
+            manifest = _apply(manifest, chain.pop())
+        return manifest, depth
+
+    def _latest_of(self, slot: str) -> tuple[int, int, list[int]] | None:
+        if slot not in self._latest:
+            row = self.connection.execute(
+                "SELECT id FROM snapshots WHERE slot = ? ORDER BY id DESC LIMIT 1",
+                (slot,),
+            ).fetchone()
+            if row is None:
+                return None
+            manifest, depth = self._resolve(row[0])
+            self._latest[slot] = (row[0], depth, manifest)
+        return self._latest[slot]
+
+    def snapshot_bytes(self, slot: str, content: bytes) -> int:
+        """
+        record `content` as a version of `slot`, returns the snapshot's id.
+        content identical to the slot's latest snapshot isn't recorded again
+        """
+        with self.connection:
+            manifest = [
+                self._chunk_id(line) for line in content.splitlines(keepends=True)
+            ]
+            latest = self._latest_of(slot)
+            if latest is not None and latest[2] == manifest:
+                return latest[0]
+            if latest is None or latest[1] + 1 >= KEYFRAME_INTERVAL:
+                base, depth, stored = None, 0, manifest
+            else:
+                base, depth = latest[0], latest[1] + 1
+                stored = _delta(latest[2], manifest)
+            snapshot_id = self.connection.execute(
+                "INSERT INTO snapshots (slot, taken_at, size, base, manifest)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    slot,
+                    time.time(),
+                    len(content),
+                    base,
+                    _compress(_encode(stored)),
+                ),
+            ).lastrowid
+        self._latest[slot] = (snapshot_id, depth, manifest)
+        return snapshot_id
+
+    def snapshot(self, slot: str, path: str) -> int | None:
+        """record the file at `path` as a version of `slot`, None if it doesn't exist"""
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        return self.snapshot_bytes(slot, content)
+
+    def snapshots(self, slot: str) -> list[Snapshot]:
+        """the snapshots of `slot`, newest first"""
+        return [
+            Snapshot(*row)
+            for row in self.connection.execute(
+                "SELECT id, slot, taken_at, size FROM snapshots WHERE slot = ?"
+                " ORDER BY id DESC",
+                (slot,),
+            )
+        ]
+
+    def content(self, snapshot_id: int) -> bytes:
+        """the bytes of the file recorded by the snapshot `snapshot_id`"""
+        manifest, _ = self._resolve(snapshot_id)
+        unique = list(set(manifest))
+        chunks = {}
+        # sqlite limits the amount of parameters of a query
+        for start in range(0, len(unique), 500):
+            part = unique[start : start + 500]
+            marks = ",".join("?" * len(part))
+            for chunk_id, data in self.connection.execute(
+                f"SELECT id, data FROM chunks WHERE id IN ({marks})", part
+            ):
+                chunks[chunk_id] = _decompress(data)
+        return b"".join(chunks[chunk_id] for chunk_id in manifest)
+
+    def restore(self, snapshot_id: int, path: str):
+        """replace the file at `path` with the snapshot `snapshot_id`"""
+        replace_file(path, self.content(snapshot_id))
+
+    def stats(self) -> dict[str, int]:
+        """the amount of snapshots and chunks and the size of the database"""
+        count = {}
+        for table in ("snapshots", "chunks"):
+            query = f"SELECT COUNT(*) FROM {table}"
+            count[table] = self.connection.execute(query).fetchone()[0]
+        page_count = self.connection.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.connection.execute("PRAGMA page_size").fetchone()[0]
+        count["bytes"] = page_count * page_size
+        return count
@@ -0,0 +1,453 @@
+"""
+Columnar storage of a corpus of saves, for statistics and bulk edits.
+
+`SaveColumns.load` parses many saves and stores every key the schema
+knows as a column, a row per save: the numeric keys as NumPy int arrays
+of the smallest type holding the field's range, the flags bit-packed 8 to
+a byte. Whether a save has a key at all is bit-packed the same way, a
+missing cell reads as 0. Values the schema can't type ("abc" for a level)
+aren't stored, they're counted in `skipped`, and saves that can't be read
+are left out and listed in `failures`.
+
+Queries and statistics are array operations over the columns:
+
+    columns = SaveColumns.load(["saves/"])
+    rich = columns.values("tokens") > 1000
+    columns.paths_where(rich & columns.flag("sw3"))
+    columns.percentiles("tokens", [50, 90, 99])
+    columns.funnel(["sw1", "sw2", "sw3"])
+
+Patches change columns in place and `write` puts the changed keys back
+into the saves through the core writer, every other line is kept:
+
+    columns.patch("1lv", np.minimum(columns.values("1lv") + 10, 999))
+    columns.write()
+
+`save` stores the columns as .npy files in a directory, `open` memory-maps
+them again so a large corpus loads without reading it.
+
+NumPy isn't a dependency of the editor, this module needs it installed
+and isn't imported with the package.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover
+    raise ImportError("core.columns needs numpy, pip install numpy") from error
+
+from .parser import ParseError, read_save
+from .paths import find_saves
+from .schema import FlagField, IntField, Validator, fnafw_validator
+from .writer import write_save
+
+INT, FLAG = "int", "flag"
+
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+_INT64 = np.iinfo(np.int64)
+_INDEX = "columns.json"
+
+
+def _int_type(minimum: int, maximum: int):
+    """the smallest int type holding every number in [minimum, maximum]"""
+    for dtype in _INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= minimum and maximum <= info.max:
+            return dtype
+    return np.int64
+
+
+def _pack(bits) -> np.ndarray:
+    return np.packbits(bits, axis=-1, bitorder="little")
+
+
+def _unpack(packed: np.ndarray, count: int) -> np.ndarray:
+    return np.unpackbits(packed, axis=-1, count=count, bitorder="little").view(bool)
+
+
+def _save_array(path: str, array: np.ndarray):
+    """
+    write `array` to the .npy file `path` by replacing it, a file that's
+    still memory-mapped keeps its content
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        np.save(file, array)
+    os.replace(temporary, path)
+
+
+def _cell(field, value: str) -> int | None:
+    """the number stored for `value`, None if the column can't hold it"""
+    if isinstance(field, FlagField):
+        return {"0": 0, "1": 1}.get(value)
+    digits = value[1:] if value[:1] == "-" else value
+    if not digits.isdecimal() or not digits.isascii():
+        return None
+    number = int(value)
+    if not _INT64.min <= number <= _INT64.max:
+        return None
+    return number
+
+
+def _add_cells(cells: dict, row: int, section, validator: Validator) -> int:
+    """add the schema keys of `section` to `cells` as `row`, returns the skipped"""
+    skipped = 0
+    for key, value in section.items():
+        field = validator.field(key)
+        if field is None:
+            continue
+        number = _cell(field, value)
+        if number is None:
+            skipped += 1
+            continue
+        if key not in cells:
+            cells[key] = ([], [])
+        cells[key][0].append(row)
+        cells[key][1].append(number)
+    return skipped
+
+
+def _collect_cells(paths: list[str], validator: Validator):
+    """
+    read the saves in `paths`, returns their files and mtimes, the rows and
+    numbers of every schema key, the amount of values that were skipped and
+    the files that couldn't be read with the reason
+    """
+    files, mtimes, cells, skipped, failures = [], [], {}, 0, []
+    for path in find_saves(paths):
+        try:
+            mtime = os.stat(path).st_mtime
+            save = read_save(path)
+        except (OSError, ParseError) as error:
+            failures.append((path, str(error)))
+            continue
+        if validator.section in save:
+            skipped += _add_cells(cells, len(files), save[validator.section], validator)
+        files.append(path)
+        mtimes.append(mtime)
+    return files, mtimes, cells, skipped, failures
+
+
+def _column_type(field, numbers: list[int]) -> tuple[str, str, type]:
+    """the kind, group and dtype of the column of `field` holding `numbers`"""
+    if isinstance(field, FlagField):
+        return FLAG, "flags", bool
+    low, high = min(numbers), max(numbers)
+    if isinstance(field, IntField):
+        low, high = min(low, field.minimum), max(high, field.maximum)
+    dtype = _int_type(low, high)
+    return INT, np.dtype(dtype).name, dtype
+
+
+def _build_columns(cells: dict, count: int, validator: Validator):
+    """the columns and groups of `count` rows holding `cells`, see `SaveColumns`"""
+    columns, arrays, present = [], {}, []
+    for key in sorted(cells):
+        rows, numbers = cells[key]
+        kind, group, dtype = _column_type(validator.field(key), numbers)
+        column = np.zeros(count, dtype)
+        column[rows] = numbers
+        arrays.setdefault(group, []).append(column)
+        mask = np.zeros(count, bool)
+        mask[rows] = True
+        present.append(mask)
+        columns.append((key, kind, group))
+
+    groups = {
+        group: _pack(stacked) if group == "flags" else np.stack(stacked)
+        for group, stacked in arrays.items()
+    }
+    groups["present"] = _pack(present) if present else np.zeros((0, 0), np.uint8)
+    return columns, groups
+
+
+class SaveColumns:
+    """
+    the schema keys of many saves as columns, a row per save
+
+    :param paths: the save file of every row.
+    :param mtimes: the mtime of every file when it was loaded.
+    :param columns: every column's key, kind and group, in order.
+    :param groups: the 2d arrays holding the columns, a column per row:
+        one per int type, "flags" and "present" bit-packed.
+    :param validator: checks the values patched in.
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+    def __init__(
+        self,
+        paths: list[str],
+        mtimes: np.ndarray,
+        columns: list[tuple[str, str, str]],
+        groups: dict[str, np.ndarray],
+        validator: Validator = fnafw_validator,
+    ):
+        self.paths = paths
+        self.mtimes = mtimes
+        self.groups = groups
+        self.validator = validator
+        self._columns: dict[str, tuple[str, str, int, int]] = {}
+        """ the kind, group, row of the values and row of the presence bits, by key """
+        sizes: dict[str, int] = {}
+        for key, kind, group in columns:
+            sizes[group] = sizes.get(group, 0) + 1
+            self._add(key, kind, group, sizes[group] - 1)
+        self._dirty: dict[str, np.ndarray] = {}
+        """ the rows whose cell of the key was patched since the last write """
+        self.skipped = 0
+        """ the amount of values that couldn't be stored """
+        self.failures: list[tuple[str, str]] = []
+        """ the files `load` couldn't read, with the reason """
+
+    def _add(self, key: str, kind: str, group: str, index: int):
+        self._columns[key] = (kind, group, index, len(self._columns))
+
+    # loading and storing
+
+    @classmethod
+    def load(
+        cls, paths: list[str], validator: Validator = fnafw_validator
+    ) -> SaveColumns:
+        """parse the saves in `paths` (files or directories) into columns"""
+        files, mtimes, cells, skipped, failures = _collect_cells(paths, validator)
+        columns, groups = _build_columns(cells, len(files), validator)
+        columns = cls(files, np.array(mtimes), columns, groups, validator)
+        columns.skipped = skipped
+        columns.failures = failures
+        return columns
+
+    def save(self, directory: str):
+        """store the columns as .npy files in `directory`, see `open`"""
+        os.makedirs(directory, exist_ok=True)
+        for group, array in self.groups.items():
+            _save_array(os.path.join(directory, f"{group}.npy"), array)
+        _save_array(os.path.join(directory, "mtimes.npy"), self.mtimes)
+        index = {
+            "paths": self.paths,
+            "section": self.validator.section,
+            "columns": [
+                [key, kind, group] for key, (kind, group, *_) in self._columns.items()
+            ],
+            "groups": list(self.groups),
+        }
+        # written last, a directory without it was never completely saved
+        with open(os.path.join(directory, _INDEX), "w", encoding="utf-8") as file:
+            json.dump(index, file)
+
+    @classmethod
+    def open(
+        cls, directory: str, validator: Validator = fnafw_validator
+    ) -> SaveColumns:
+        """
+        the columns saved in `directory`, memory-mapped: nothing is read
+        until it's used, and patches stay in memory until `write`
+        """
+        with open(os.path.join(directory, _INDEX), encoding="utf-8") as file:
+            index = json.load(file)
+        if index["section"] != validator.section:
+            raise ValueError(f"the columns are of the section {index['section']!r}")
+        groups = {}
+        for group in index["groups"]:
+            path = os.path.join(directory, f"{group}.npy")
+            groups[group] = np.load(path, mmap_mode="c")
+        mtimes = np.load(os.path.join(directory, "mtimes.npy"))
+        columns = [tuple(column) for column in index["columns"]]
+        return cls(index["paths"], mtimes, columns, groups, validator)
+
+    def stale(self) -> list[str]:
+        """the files that changed or disappeared since they were loaded"""
+        stale = []
+        for path, mtime in zip(self.paths, self.mtimes.tolist()):
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    stale.append(path)
+            except OSError:
+                stale.append(path)
+        return stale
+
+    # reading
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._columns
+
+    def keys(self) -> list[str]:
+        """the keys that have a column, sorted"""
+        return sorted(self._columns)
+
+    def kind(self, key: str) -> str:
+        """INT or FLAG"""
+        return self._column(key)[0]
+
+    def _column(self, key: str) -> tuple[str, str, int, int]:
+        try:
+            return self._columns[key]
+        except KeyError:
+            raise KeyError(f"no column {key!r}") from None
+
+    def present(self, key: str) -> np.ndarray:
+        """which saves have `key`, as bools"""
+        if key not in self._columns:
+            return np.zeros(len(self), bool)
+        return _unpack(self.groups["present"][self._columns[key][3]], len(self))
+
+    def values(self, key: str) -> np.ndarray:
+        """
+        the values of `key`, 0 where a save doesn't have it. int columns
+        are the stored array itself, patch them with `patch`
+        """
+        kind, group, index, _ = self._column(key)
+        if kind == FLAG:
+            return _unpack(self.groups[group][index], len(self)).astype(np.int8)
+        return self.groups[group][index]
+
+    def flag(self, key: str) -> np.ndarray:
+        """which saves have the flag `key` set, as bools"""
+        if key not in self._columns:
+            return np.zeros(len(self), bool)
+        kind, group, index, _ = self._columns[key]
+        if kind == FLAG:
+            return _unpack(self.groups[group][index], len(self))
+        return self.values(key) == 1
+
+    def paths_where(self, mask: np.ndarray) -> list[str]:
+        """the files of the rows selected by the bool array `mask`"""
+        return [self.paths[row] for row in np.flatnonzero(mask).tolist()]
+
+    # statistics
+
+    def distribution(self, key: str) -> dict[int, int]:
+        """how many saves have each value of `key`, saves without it aren't counted"""
+        values, counts = np.unique(
+            self.values(key)[self.present(key)], return_counts=True
+        )
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def percentiles(self, key: str, percents) -> list[float]:
+        """the `percents` percentiles of `key` over the saves that have it"""
+        values = self.values(key)[self.present(key)]
+        if not values.size:
+            return [float("nan")] * len(percents)
+        return np.percentile(values, percents).tolist()
+
+    def describe(self, key: str) -> dict[str, float]:
+        """the count, mean, minimum, median and maximum of `key`"""
+        values = self.values(key)[self.present(key)]
+        if not values.size:
+            return {"count": 0}
+        return {
+            "count": int(values.size),
+            "mean": float(values.mean()),
+            "min": int(values.min()),
+            "median": float(np.median(values)),
+            "max": int(values.max()),
+        }
+
+    def funnel(self, keys: list[str]) -> list[int]:
+        """how many saves have every flag of `keys` set up to each of them"""
+        reached = np.ones(len(self), bool)
+        counts = []
+        for key in keys:
+            reached &= self.flag(key)
+            counts.append(int(np.count_nonzero(reached)))
+        return counts
+
+    # patching
+
+    def _new_column(self, key: str):
+        """add an empty column for a key the schema knows"""
+        field = self.validator.field(key)
+        if field is None:
+            raise KeyError(f"{key!r} isn't in the schema")
+        if isinstance(field, FlagField):
+            kind, group = FLAG, "flags"
+            empty = np.zeros((1, (len(self) + 7) // 8), np.uint8)
+        else:
+            kind = INT
+            dtype = _int_type(field.minimum, field.maximum)
+            group = np.dtype(dtype).name
+            empty = np.zeros((1, len(self)), dtype)
+        self.groups[group] = (
+            np.concatenate([self.groups[group], empty])
+            if group in self.groups
+            else empty
+        )
+        packed = np.zeros((1, (len(self) + 7) // 8), np.uint8)
+        present = self.groups["present"]
+        self.groups["present"] = (
+            np.concatenate([present, packed]) if present.size else packed
+        )
+        self._add(key, kind, group, len(self.groups[group]) - 1)
+
+    def _check(self, key: str, values: np.ndarray):
+        """raise ValueError if one of `values` isn't an integer valid for `key`"""
+        for unique in np.unique(values).tolist():
+            # checked before the cast, int() would truncate 10.7 to a valid 10
+            if isinstance(unique, float) and not unique.is_integer():
+                raise ValueError(f"{key}: {unique!r} is not an integer")
+            if not isinstance(unique, (int, float)):
+                raise ValueError(f"{key}: {unique!r} is not a number")
+            issue = self.validator.check(key, str(int(unique)))
+            if issue is not None:
+                raise ValueError(str(issue))
+
+    def patch(self, key: str, value, where: np.ndarray | None = None) -> int:
+        """
+        set `key` to `value` (a number or an array of a value per save) in
+        the saves selected by the bool array `where`, every save by
+        default. saves without the key get it. the values are checked
+        against the schema first, raises ValueError if one is invalid.
+        returns the amount of saves that changed
+        """
+        if key not in self._columns:
+            self._new_column(key)
+        kind, group, index, order = self._columns[key]
+        rows = np.ones(len(self), bool) if where is None else np.asarray(where, bool)
+        new = np.broadcast_to(np.asarray(value), (len(self),))[rows]
+        self._check(key, new)
+
+        current, present = self.values(key), self.present(key)
+        changed = rows.copy()
+        changed[rows] = (current[rows] != new) | ~present[rows]
+        if not changed.any():
+            return 0
+        if kind == FLAG:
+            bits = current.astype(bool)
+            bits[rows] = new.astype(bool)
+            self.groups[group][index] = _pack(bits)
+        else:
+            self.groups[group][index][rows] = new
+        self.groups["present"][order] = _pack(present | rows)
+        dirty = self._dirty.setdefault(key, np.zeros(len(self), bool))
+        dirty |= changed
+        return int(np.count_nonzero(changed))
+
+    def write(self) -> int:
+        """
+        write the patched keys back into their saves, the rest of each
+        save is kept as it is. returns the amount of files written
+        """
+        if not self._dirty:
+            return 0
+        dirty = {key: rows for key, rows in self._dirty.items() if rows.any()}
+        columns = {key: self.values(key).tolist() for key in dirty}
+        touched = np.logical_or.reduce(list(dirty.values()))
+        written = 0
+        for row in np.flatnonzero(touched).tolist():
+            path = self.paths[row]
+            save = read_save(path)
+            section = save.section(self.validator.section)
+            for key, rows in dirty.items():
+                if rows[row]:
+                    section[key] = columns[key][row]
+            write_save(save, path)
+            self.mtimes[row] = os.stat(path).st_mtime
+            written += 1
+        self._dirty.clear()
+        return written
@@ -0,0 +1,389 @@
+"""
+A persistent index over a corpus of save files.
+
+`SaveIndex.update` parses the saves with the core parser and records, in
+one sqlite database, the sorted ids of the files holding each (key, value)
+pair, its posting list. Pairs whose value is a number are also indexed by
+(key, number), so a range query reads the posting lists of the values in
+range. A file is only parsed again once its mtime or size changed, only
+the posting lists of the pairs it gained or lost are rewritten, and files
+that disappeared are dropped from the index.
+
+`SaveIndex.query` answers a small query language from the index alone:
+
+    sw3=1 and sw2=0
+    1lv > 50 and not (tokens < 100 or sw1 != 1)
+    freddy.lv >= 50          # with aliases={"freddy": 1}
+    5next                    # the saves that have the key at all
+
+`=` and `!=` compare the stored text, `<`, `<=`, `>` and `>=` compare
+numbers: values outside of the 64-bit range are only indexed as text.
+`name.field` is the key `{aliases[name]}{field}`, e.g. a character's
+level. `and`, `or` and `not` are reserved, they can't be used as keys.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from array import array
+from collections import defaultdict
+
+from .model import SECTION
+from .parser import ParseError, read_save
+from .paths import find_saves
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    terms BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    number INTEGER,
+    files BLOB NOT NULL,
+    UNIQUE (key, value)
+);
+CREATE INDEX IF NOT EXISTS terms_by_number ON terms (key, number)
+    WHERE number IS NOT NULL;
+"""
+
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+""" the numbers sqlite can store and compare, larger ones are only text """
+
+_TOKENS = re.compile(
+    r"\s*(?:(?P<paren>[()])|(?P<op>!=|<=|>=|=|<|>)|(?P<word>[^\s()!=<>]+))"
+)
+_RESERVED = frozenset(("and", "or", "not"))
+
+
+class QueryError(ValueError):
+    """a query couldn't be parsed"""
+
+
+def _pack(ids) -> bytes:
+    return array("I", sorted(ids)).tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    ids = array("I")
+    ids.frombytes(data)
+    return ids
+
+
+def _number(value: str) -> int | None:
+    """`value` as a number sqlite can hold, None if it isn't one"""
+    digits = value[1:] if value[:1] == "-" else value
+    if not digits.isdecimal() or not digits.isascii():
+        return None
+    number = int(value)
+    if not INT64_MIN <= number <= INT64_MAX:
+        return None
+    return number
+
+
+class SaveIndex:
+    """
+    an inverted index of save files in an sqlite database
+
+    :param path: the database file, ":memory:" keeps it in memory.
+    :param aliases: names usable as `name.field` in queries, e.g. {"freddy": 1}.
+    """
+
+    def __init__(self, path: str, aliases: dict[str, object] | None = None):
+        self.path = path
+        self.aliases = dict(aliases or {})
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        self._terms: dict[tuple[str, str], int] | None = None
+        """ the id of the (key, value) pairs looked up so far """
+        self._created: dict[int, tuple[str, str]] = {}
+        """ the pairs first seen by the running update, inserted at its end """
+        self._next_term = 0
+        self.failures: list[tuple[str, str]] = []
+        """ the files the last update couldn't read, with the reason """
+
+    def close(self):
+        """close the database"""
+        self.connection.close()
+
+    # indexing
+
+    def _term(self, key: str, value: str) -> int:
+        """the id of the (key, value) pair, added if it's new"""
+        if self._terms is None:
+            self._terms = {}
+            (last,) = self.connection.execute("SELECT MAX(id) FROM terms").fetchone()
+            self._next_term = (last or 0) + 1
+        term = self._terms.get((key, value))
+        if term is not None:
+            return term
+        row = self.connection.execute(
+            "SELECT id FROM terms WHERE key = ? AND value = ?", (key, value)
+        ).fetchone()
+        if row is not None:
+            term = self._terms[key, value] = row[0]
+        else:
+            term = self._next_term
+            self._next_term += 1
+            self._terms[key, value] = term
+            self._created[term] = (key, value)
+        return term
+
+    def _read_terms(self, path: str) -> set[int]:
+        """the ids of the (key, value) pairs of the save at `path`"""
+        try:
+            save = read_save(path)
+        except (OSError, ParseError) as error:
+            self.failures.append((path, str(error)))
+            return set()
+        if SECTION not in save:
+            return set()
+        return {self._term(key, value) for key, value in save[SECTION].items()}
+
+    def _write_postings(self, changes: dict[int, list[set]]):
+        """apply the files added to and removed from each term's posting list"""
+        created, rows = [], []
+        for term, (added, removed) in changes.items():
+            if term in self._created:
+                key, value = self._created[term]
+                created.append((term, key, value, _number(value), _pack(added)))
+                continue
+            (stored,) = self.connection.execute(
+                "SELECT files FROM terms WHERE id = ?", (term,)
+            ).fetchone()
+            files = set(_unpack(stored))
+            files |= added
+            files -= removed
+            rows.append((_pack(files), term))
+        # inserted in index order, the unique index is appended to instead of split
+        created.sort(key=lambda row: (row[1], row[2]))
+        self.connection.executemany(
+            "INSERT INTO terms (id, key, value, number, files) VALUES (?, ?, ?, ?, ?)",
+            created,
+        )
+        self.connection.executemany("UPDATE terms SET files = ? WHERE id = ?", rows)
+
+    def update(self, paths: list[str]) -> dict[str, int]:
+        """
+        index the saves in `paths` (files or directories), only new and
+        changed files are parsed, indexed files under `paths` that no
+        longer exist are dropped. returns how many files were added,
+        updated, removed and left as they were, and how many of the added
+        and updated ones couldn't be read (see `failures`), they're indexed
+        without any pairs
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        self.failures = []
+        known = {
+            path: (file_id, mtime, size)
+            for file_id, path, mtime, size in self.connection.execute(
+                "SELECT id, path, mtime, size FROM files"
+            )
+        }
+        changes: dict[int, list[set]] = defaultdict(lambda: [set(), set()])
+        seen = set()
+        self._created.clear()
+        try:
+            self._update(paths, known, changes, seen, counts)
+        except BaseException:
+            # the pairs created by the failed update were rolled back
+            self._terms = None
+            raise
+        finally:
+            self._created.clear()
+        counts["failed"] = len(self.failures)
+        return counts
+
+    # pylint: disable=too-many-arguments
+    def _update(self, paths, known, changes, seen, counts):
+        with self.connection:
+            for path in find_saves(paths):
+                path = os.path.abspath(path)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                entry = known.get(path)
+                if entry is not None and entry[1:] == (stat.st_mtime, stat.st_size):
+                    counts["unchanged"] += 1
+                    continue
+                terms = self._read_terms(path)
+                if entry is None:
+                    file_id = self.connection.execute(
+                        "INSERT INTO files (path, mtime, size, terms)"
+                        " VALUES (?, ?, ?, ?)",
+                        (path, stat.st_mtime, stat.st_size, _pack(terms)),
+                    ).lastrowid
+                    old_terms = set()
+                    counts["added"] += 1
+                else:
+                    file_id = entry[0]
+                    old_terms = self._stored_terms(file_id)
+                    self.connection.execute(
+                        "UPDATE files SET mtime = ?, size = ?, terms = ? WHERE id = ?",
+                        (stat.st_mtime, stat.st_size, _pack(terms), file_id),
+                    )
+                    counts["updated"] += 1
+                for term in terms - old_terms:
+                    changes[term][0].add(file_id)
+                for term in old_terms - terms:
+                    changes[term][1].add(file_id)
+
+            roots = [os.path.abspath(path) for path in paths]
+            for path, (file_id, _, _) in known.items():
+                if path in seen or not any(
+                    path == root or path.startswith(root + os.sep) for root in roots
+                ):
+                    continue
+                for term in self._stored_terms(file_id):
+                    changes[term][1].add(file_id)
+                self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                counts["removed"] += 1
+            self._write_postings(changes)
+
+    def _stored_terms(self, file_id: int) -> set[int]:
+        (stored,) = self.connection.execute(
+            "SELECT terms FROM files WHERE id = ?", (file_id,)
+        ).fetchone()
+        return set(_unpack(stored))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    # querying
+
+    def _files(self, query: str, *parameters) -> set[int]:
+        """the union of the posting lists selected by `query`"""
+        files = set()
+        for (stored,) in self.connection.execute(query, parameters):
+            files.update(_unpack(stored))
+        return files
+
+    def _all_files(self) -> set[int]:
+        return {row[0] for row in self.connection.execute("SELECT id FROM files")}
+
+    def _key(self, word: str) -> str:
+        name, dot, field = word.partition(".")
+        if not dot:
+            return word
+        if name not in self.aliases:
+            raise QueryError(f"unknown name {name!r} in {word!r}")
+        return f"{self.aliases[name]}{field}"
+
+    def _condition(self, key: str, op: str | None, value: str | None) -> set[int]:
+        if op is None:
+            return self._files("SELECT files FROM terms WHERE key = ?", key)
+        if op == "=":
+            return self._files(
+                "SELECT files FROM terms WHERE key = ? AND value = ?", key, value
+            )
+        if op == "!=":
+            return self._files(
+                "SELECT files FROM terms WHERE key = ? AND value != ?", key, value
+            )
+        number = _number(value)
+        if number is None:
+            raise QueryError(f"{op} needs a 64-bit integer, got {value!r}")
+        # op is one of the comparisons the tokenizer accepts
+        return self._files(
+            f"SELECT files FROM terms WHERE key = ? AND number {op} ?", key, number
+        )
+
+    def _parse(self, text: str) -> list[tuple[str, str]]:
+        tokens, position = [], 0
+        text = text.strip()
+        while position < len(text):
+            match = _TOKENS.match(text, position)
+            if match is None or match.end() == position:
+                raise QueryError(f"unexpected {text[position:]!r}")
+            tokens.append((match.lastgroup, match.group(match.lastgroup)))
+            position = match.end()
+        return tokens
+
+    def match(self, text: str) -> set[int]:
+        """the ids of the files matching the query `text`"""
+        tokens = self._parse(text)
+        position = 0
+
+        def peek(kind=None, word=None):
+            if position >= len(tokens):
+                return False
+            token_kind, token = tokens[position]
+            if kind is not None and token_kind != kind:
+                return False
+            return word is None or token.lower() == word
+
+        def take():
+            nonlocal position
+            if position >= len(tokens):
+                raise QueryError(f"unexpected end of {text!r}")
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            files = parse_and()
+            while peek("word", "or"):
+                take()
+                files = files | parse_and()
+            return files
+
+        def parse_and():
+            files = parse_not()
+            while peek("word", "and"):
+                take()
+                files = files & parse_not()
+            return files
+
+        def parse_not():
+            if peek("word", "not"):
+                take()
+                return self._all_files() - parse_not()
+            if peek("paren", "("):
+                take()
+                files = parse_or()
+                if take() != ("paren", ")"):
+                    raise QueryError(f"unclosed parenthesis in {text!r}")
+                return files
+            kind, word = take()
+            if kind != "word" or word.lower() in _RESERVED:
+                raise QueryError(f"expected a key, got {word!r}")
+            key = self._key(word)
+            if not peek("op"):
+                return self._condition(key, None, None)
+            _, op = take()
+            kind, value = take()
+            if kind != "word":
+                raise QueryError(f"expected a value after {op!r}, got {value!r}")
+            return self._condition(key, op, value)
+
+        files = parse_or()
+        if position != len(tokens):
+            raise QueryError(f"unexpected {tokens[position][1]!r} in {text!r}")
+        return files
+
+    def query(self, text: str) -> list[str]:
+        """the paths of the files matching the query `text`, sorted"""
+        files = self.match(text)
+        if not files:
+            return []
+        paths = []
+        ids = list(files)
+        # sqlite limits the amount of parameters of a query
+        for start in range(0, len(ids), 500):
+            part = ids[start : start + 500]
+            marks = ",".join("?" * len(part))
+            paths += [
+                row[0]
+                for row in self.connection.execute(
+                    f"SELECT path FROM files WHERE id IN ({marks})", part
+                )
+            ]
+        return sorted(paths)
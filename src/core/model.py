@@ -0,0 +1,121 @@
+"""
+The in-memory model of a save.
+
+`SaveFile` holds the sections of a save in order, each `Section` maps
+keys to their string values the way the game stores them. The interface
+follows `configparser` where the editor used it: `save.read(path)`,
+`save[section]`, `section.get(key, fallback)`, so code written against
+a ConfigParser keeps working. Typed access is on top: `get_int`,
+`get_flag`.
+
+The package stays clear of `typing`, `dataclasses` and the like so that
+importing it costs next to nothing, see `tools/bench_import.py`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, MutableMapping
+
+SECTION = "fnafw"
+""" the section FNaF World keeps its data in """
+
+
+class Section(MutableMapping):
+    """the keys of a save section, in the order they were added"""
+
+    __slots__ = ("name", "_values")
+
+    def __init__(self, name: str, values: dict[str, str] | None = None):
+        self.name = name
+        self._values: dict[str, str] = dict(values or {})
+
+    def __getitem__(self, key: str) -> str:
+        return self._values[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        self._values[key] = str(value)
+
+    def __delitem__(self, key: str) -> None:
+        del self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self):
+        return f"<Section {self.name!r} ({len(self)} keys)>"
+
+    def get_int(self, key: str, fallback: int | None = None) -> int | None:
+        """the value of `key` as an int, `fallback` if it's missing or not a number"""
+        value = self._values.get(key)
+        if value is None:
+            return fallback
+        try:
+            return int(value)
+        except ValueError:
+            return fallback
+
+    def get_flag(self, key: str) -> bool:
+        """whether the flag `key` is set ("1")"""
+        return self._values.get(key) == "1"
+
+
+class SaveFile:
+    """the sections of a save file"""
+
+    def __init__(self):
+        self.sections: dict[str, Section] = {}
+        self.path: str | None = None
+        """ the file the save was read from, if any """
+
+    @classmethod
+    def load(cls, path: str) -> SaveFile:
+        """read the save file at `path`"""
+        from .parser import read_save  # pylint: disable=import-outside-toplevel
+
+        return read_save(path)
+
+    def read(self, path: str) -> list[str]:
+        """
+        replace the content with the save file at `path`, returns the
+        paths read like `ConfigParser.read` does: empty if the file is missing
+        """
+        try:
+            loaded = self.load(path)
+        except FileNotFoundError:
+            return []
+        self.sections = loaded.sections
+        self.path = path
+        return [path]
+
+    def __getitem__(self, name: str) -> Section:
+        return self.sections[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sections)
+
+    def section(self, name: str) -> Section:
+        """the section `name`, created if it doesn't exist"""
+        return self.sections.setdefault(name, Section(name))
+
+    def copy(self) -> SaveFile:
+        """a deep copy of the save"""
+        copy = SaveFile()
+        copy.path = self.path
+        copy.sections = {
+            name: Section(name, dict(section))
+            for name, section in self.sections.items()
+        }
+        return copy
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SaveFile):
+            return NotImplemented
+        return {name: dict(section) for name, section in self.sections.items()} == {
+            name: dict(section) for name, section in other.sections.items()
+        }
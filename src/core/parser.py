@@ -0,0 +1,60 @@
+"""
+Parser of the save files.
+
+FNaF World keeps its saves in a plain ini format: `[section]` headers
+followed by `key=value` lines. The parser keeps the order of the keys so
+a save can be written back the way it was read, lines that aren't a
+header or a key are reported with their line number instead of being
+dropped silently.
+"""
+
+from .model import SaveFile, Section
+
+
+class ParseError(ValueError):
+    """a line of a save file couldn't be parsed"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+def parse_save(text: str, *, strict: bool = True) -> SaveFile:
+    """
+    parse the text of a save file. a malformed line raises `ParseError`
+    when `strict` and is skipped otherwise
+    """
+    save = SaveFile()
+    section = None
+    for number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line[0] in ";#":
+            continue
+        if line[0] == "[":
+            if line[-1] != "]":
+                if strict:
+                    raise ParseError(f"unclosed section header {line!r}", number)
+                continue
+            name = line[1:-1].strip()
+            section = save.sections.setdefault(name, Section(name))
+            continue
+        key, separator, value = line.partition("=")
+        if not separator or not key.strip():
+            if strict:
+                raise ParseError(f"expected key=value, got {line!r}", number)
+            continue
+        if section is None:
+            if strict:
+                raise ParseError("key outside of a section", number)
+            continue
+        section[key.strip()] = value.strip()
+    return save
+
+
+def read_save(path: str, *, strict: bool = True) -> SaveFile:
+    """read and parse the save file at `path`"""
+    # the game writes its saves in the system's ansi code page
+    with open(path, "r", encoding="latin-1") as file:
+        save = parse_save(file.read(), strict=strict)
+    save.path = path
+    return save
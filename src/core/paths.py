@@ -0,0 +1,32 @@
+"""Where the game keeps its saves."""
+
+import os
+
+SLOTS = 3
+
+
+def saves_directory() -> str:
+    """the folder the game writes its saves to"""
+    return os.path.join(os.getenv("APPDATA", ""), "MMFApplications")
+
+
+def slot_name(slot: int) -> str:
+    """the file name of the save of `slot`, counted from 0"""
+    return f"fnafwr{slot + 1}"
+
+
+def slot_path(slot: int) -> str:
+    """the save file of `slot`, counted from 0"""
+    return os.path.join(saves_directory(), slot_name(slot))
+
+
+def find_saves(paths: list[str]):
+    """the save files in `paths`, directories are searched recursively for fnafwr*"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.startswith("fnafwr") and not name.endswith(".tmp"):
+                    yield os.path.join(directory, name)
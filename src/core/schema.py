@@ -0,0 +1,169 @@
+"""
+Declarative schema of the fnafw section, compiled into a validator.
+
+The schema maps key patterns to fields: a pattern is either a literal key
+("tokens") or a family with an `{n}` placeholder for a number ("sw{n}",
+"{n}lv"). `compile_schema` turns it into a `Validator`: the literal keys
+go into a dict and the families into a single regex whose matching group
+names the field, each key is resolved once and the result is cached, so
+validating a save is a dict lookup and a range check per key.
+
+    issues = fnafw_validator.validate(save)
+    issue = fnafw_validator.check("1lv", "1000")
+"""
+
+from __future__ import annotations
+
+import re
+
+from .model import SECTION, SaveFile
+from .validation import ValidationIssue, validate_structure
+
+INT32_MAX = 2**31 - 1
+
+
+class IntField:
+    """
+    a decimal int in [minimum, maximum]
+
+    :param required: whether a save without the key is invalid.
+    """
+
+    __slots__ = ("minimum", "maximum", "required")
+
+    def __init__(self, minimum: int = 0, maximum: int = INT32_MAX, required=False):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.required = required
+
+    def check(self, value: str) -> str | None:
+        """what's wrong with `value`, None if it's valid"""
+        digits = value[1:] if value[:1] == "-" else value
+        if not digits.isdecimal() or not digits.isascii():
+            return f"{value!r} is not a number"
+        number = int(value)
+        if not self.minimum <= number <= self.maximum:
+            return f"{number} is outside of {self.minimum}..{self.maximum}"
+        return None
+
+
+class FlagField:
+    """a flag, "0" or "1" """
+
+    __slots__ = ("required",)
+
+    def __init__(self, required=False):
+        self.required = required
+
+    def check(self, value: str) -> str | None:
+        """what's wrong with `value`, None if it's valid"""
+        if value not in ("0", "1"):
+            return f"{value!r} is not a flag (0 or 1)"
+        return None
+
+
+FNAFW_SCHEMA = {
+    "tokens": IntField(0, INT32_MAX),
+    "sw{n}": FlagField(),
+    "{n}lv": IntField(1, 999),
+    "{n}next": IntField(0, 9999999),
+}
+""" the known keys of the fnafw section, keys it doesn't list are allowed """
+
+
+class Validator:
+    """
+    validates a save section against a compiled schema
+
+    :param section: the section the schema is for.
+    :param exact: the fields of the literal keys.
+    :param families: the fields of the key families, by regex group name.
+    :param pattern: the regex matching every family, one group per family.
+    :param allow_unknown: whether keys the schema doesn't know are valid.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        section: str,
+        exact: dict,
+        families: dict,
+        pattern: re.Pattern | None,
+        allow_unknown: bool = True,
+    ):
+        self.section = section
+        self.allow_unknown = allow_unknown
+        self._exact = exact
+        self._families = families
+        self._pattern = pattern
+        self._fields: dict = {}
+        """ the field of every key resolved so far, None for unknown keys """
+
+    def field(self, key: str):
+        """the field `key` is checked with, None if the schema doesn't know it"""
+        try:
+            return self._fields[key]
+        except KeyError:
+            pass
+        field = self._exact.get(key)
+        if field is None and self._pattern is not None:
+            match = self._pattern.fullmatch(key)
+            if match is not None:
+                field = self._families[match.lastgroup]
+        self._fields[key] = field
+        return field
+
+    def check(self, key: str, value: str) -> ValidationIssue | None:
+        """the problem with `value` for `key`, None if it's valid"""
+        field = self.field(key)
+        if field is None:
+            if self.allow_unknown:
+                return None
+            return ValidationIssue(key, "unknown key")
+        message = field.check(value)
+        return None if message is None else ValidationIssue(key, message)
+
+    def validate(self, save: SaveFile) -> list[ValidationIssue]:
+        """every problem of `save`, empty when it's safe to write"""
+        return validate_structure(save, self.section) + self.validate_values(save)
+
+    def validate_values(self, save: SaveFile) -> list[ValidationIssue]:
+        """
+        the schema problems of the section's keys, at most one per key, so
+        they can be kept by key and checked again one key at a time
+        """
+        if self.section not in save:
+            return []
+        issues = []
+        section = save[self.section]
+        check = self.check
+        for key, value in section.items():
+            issue = check(key, value)
+            if issue is not None:
+                issues.append(issue)
+        for key, field in self._exact.items():
+            if field.required and key not in section:
+                issues.append(ValidationIssue(key, "missing"))
+        return issues
+
+
+def compile_schema(
+    schema: dict, section: str = SECTION, allow_unknown: bool = True
+) -> Validator:
+    """compile `schema` (key pattern -> field) into a `Validator`"""
+    exact, families, alternatives = {}, {}, []
+    for key, field in schema.items():
+        if "{n}" not in key:
+            exact[key] = field
+            continue
+        if field.required:
+            raise ValueError(f"a key family can't be required: {key!r}")
+        group = f"f{len(families)}"
+        families[group] = field
+        before, _, after = key.partition("{n}")
+        alternatives.append(f"(?P<{group}>{re.escape(before)}[0-9]+{re.escape(after)})")
+    pattern = re.compile("|".join(alternatives)) if alternatives else None
+    return Validator(section, exact, families, pattern, allow_unknown)
+
+
+fnafw_validator = compile_schema(FNAFW_SCHEMA)
@@ -0,0 +1,82 @@
+"""
+Summaries of saves, what the main menu previews of the slots show.
+
+The party is read from the `p1`..`p4` keys, each holding the id of the
+character in that party slot ("0" or missing for an empty slot), the
+unlocked areas from the `sw{n}` flags with `unlocked_locations`, the
+same helper the editor's location buttons use: the first area is always
+open and `sw{n}` unlocks area n+1.
+"""
+
+from __future__ import annotations
+
+from .model import SECTION, SaveFile, Section
+
+PARTY_KEYS = ("p1", "p2", "p3", "p4")
+LOCATIONS = 6
+""" the amount of areas, the editor has a location button for each """
+
+
+class SaveSummary:
+    """
+    what a slot's preview shows
+
+    :param party: the ids of the characters in the party, in order.
+    :param total_level: the sum of every character's level.
+    :param tokens: the amount of faz-tokens.
+    :param areas: the amount of unlocked areas.
+    """
+
+    __slots__ = ("party", "total_level", "tokens", "areas")
+
+    def __init__(self, party: tuple, total_level: int, tokens: int, areas: int):
+        self.party = party
+        self.total_level = total_level
+        self.tokens = tokens
+        self.areas = areas
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SaveSummary):
+            return NotImplemented
+        return (self.party, self.total_level, self.tokens, self.areas) == (
+            other.party,
+            other.total_level,
+            other.tokens,
+            other.areas,
+        )
+
+    def __repr__(self):
+        return (
+            f"SaveSummary(party={self.party}, total_level={self.total_level},"
+            f" tokens={self.tokens}, areas={self.areas})"
+        )
+
+
+def unlocked_locations(section: Section, locations: int = LOCATIONS) -> int:
+    """
+    bitmask of the unlocked areas, bit n is area n+1. `sw{n}` flags past the
+    last of the `locations` areas are ignored
+    """
+    mask = 1  # area 1 is always open
+    for index in range(1, locations):
+        if section.get_flag(f"sw{index}"):
+            mask |= 1 << index
+    return mask
+
+
+def summarize(save: SaveFile) -> SaveSummary:
+    """summarize the fnafw section of `save`, missing or invalid values count as 0"""
+    if SECTION not in save:
+        return SaveSummary((), 0, 0, 0)
+    section = save[SECTION]
+    party = tuple(
+        character
+        for character in (section.get_int(key, 0) for key in PARTY_KEYS)
+        if character > 0
+    )
+    total_level = 0
+    for key, value in section.items():
+        if key.endswith("lv") and key[:-2].isdecimal() and value.isdecimal():
+            total_level += int(value)
+    areas = unlocked_locations(section).bit_count()
+    return SaveSummary(party, total_level, section.get_int("tokens", 0), areas)
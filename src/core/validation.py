@@ -0,0 +1,52 @@
+"""
+Structural validation of saves.
+
+Checks what every save must have whatever its values: its section (fnafw
+unless the validator is for another one), and keys and values that can be written back without changing the file's
+meaning.
+"""
+
+from .model import SECTION, SaveFile
+
+
+class ValidationIssue:
+    """
+    a problem found in a save
+
+    :param key: the key the problem is about, "" for the whole save.
+    :param message: what's wrong with it.
+    """
+
+    __slots__ = ("key", "message")
+
+    def __init__(self, key: str, message: str):
+        self.key = key
+        self.message = message
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ValidationIssue):
+            return NotImplemented
+        return (self.key, self.message) == (other.key, other.message)
+
+    def __hash__(self):
+        return hash((self.key, self.message))
+
+    def __repr__(self):
+        return f"ValidationIssue({self.key!r}, {self.message!r})"
+
+    def __str__(self):
+        return f"{self.key}: {self.message}" if self.key else self.message
+
+
+def validate_structure(save: SaveFile, section: str = SECTION) -> list[ValidationIssue]:
+    """the structural problems of `save`, empty when it's fine"""
+    issues = []
+    if section not in save:
+        issues.append(ValidationIssue("", f"missing the [{section}] section"))
+    for entries in save.sections.values():
+        for key, value in entries.items():
+            if "=" in key or "[" in key or key != key.strip():
+                issues.append(ValidationIssue(key, "invalid key name"))
+            if "\n" in value or "\r" in value:
+                issues.append(ValidationIssue(key, "value spans several lines"))
+    return issues
@@ -0,0 +1,37 @@
+"""
+Writer of the save files.
+
+Saves are written in the game's own layout, `key=value` without spaces,
+the file is replaced atomically so a crash can't leave half a save.
+"""
+
+import os
+
+from .model import SaveFile
+
+
+def dump_save(save: SaveFile) -> str:
+    """the text of `save` as the game writes it"""
+    lines = []
+    for name, section in save.sections.items():
+        lines.append(f"[{name}]")
+        lines.extend(f"{key}={value}" for key, value in section.items())
+    return "\n".join(lines) + "\n"
+
+
+def replace_file(path: str, content: bytes):
+    """write `content` to `path`, the old file is only replaced once the new one is written"""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def write_save(save: SaveFile, path: str):
+    """write `save` to `path` with the game's line endings, atomically"""
+    replace_file(path, dump_save(save).replace("\n", "\r\n").encode("latin-1"))
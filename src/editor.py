@@ -3,26 +3,75 @@
 import glob
 import json
 import os
+from functools import partial
 
 import pygame
 
 from components.animate import AnimatatedObject, Animation
 from components.characterbox import CharacterBox
-from graphics import draw_background
-from graphics.textures import load_image
+from components.roster import CharacterRoster
+from core import (
+    ParseError,
+    ValidationIssue,
+    fnafw_validator,
+    parse_save,
+    unlocked_locations,
+    validate_structure,
+    write_save,
+)
+from graphics import draw_background, scaled_textures
+from graphics.compact import get_compact_stats
+from graphics.registry import format_bytes, resource_registry
+from graphics.render_queue import LAYER_HUD
+from graphics.textures import (
+    get_dedup_stats,
+    get_surface_hotspot,
+    load_image,
+    placeholder_surface,
+)
 from states import State
-from utils.constants import FPS, global_event_handler
+from utils.constants import (
+    COMPACT_UI_TEXTURES,
+    SUB_INTERFACE_MAX_WIDTH,
+    global_event_handler,
+)
+from utils.events import EventDispatcher
 from utils.helper import add_vectors, quick_load, subtract_vectors
 from utils.resources import FontBank, Textures
+from utils.streaming import HIGH, LOW, NORMAL, asset_streamer
+from utils.tracing import tracer
 
 
 def load_location_buttons():
-    """load the location buttons"""
+    """
+    load the location buttons, the locked texture is loaded right away
+    and shown in place of the other locations until they stream in
+    """
     locations_buttons = AnimatatedObject()
-    for file in glob.iglob("textures/locations/*.png"):
-        texture = load_image(file, hotspot="center")
+    locked = asset_streamer.load_now(
+        partial(
+            load_image,
+            "textures/locations/locked.png",
+            hotspot="center",
+            compact=COMPACT_UI_TEXTURES,
+            owner="locations",
+        )
+    )
+    for file in sorted(glob.glob("textures/locations/*.png")):
         name = os.path.basename(file).split(".")[0]
-        animation = Animation(frames=[texture], speed=0, repeat=-1)
+        animation = Animation(frames=[locked], speed=0, repeat=-1)
+        if name != "locked":
+            asset_streamer.request(
+                partial(
+                    load_image,
+                    file,
+                    hotspot="center",
+                    compact=COMPACT_UI_TEXTURES,
+                    owner="locations",
+                ),
+                partial(animation.set_streamed_frame, 0),
+                HIGH,
+            )
         locations_buttons.add_animation(name, animation)
     locations_buttons.change_animation(0)
     return locations_buttons
@@ -34,124 +83,428 @@ class Editor(State):
     go_back: bool = False
     current_selected_character = 0
     last_selected_character = 0
-    sub_interface: bool = (
-        True  # make this a property because it depends on the window size
-    )
-    locations_buttons = load_location_buttons()
+    locations_buttons: AnimatatedObject
     tokens = 0
     lcd_font_size = 20
     arialnb_font_size = 30
 
-    action_buttons = AnimatatedObject()
+    action_buttons: AnimatatedObject
     characterbox: CharacterBox
+    roster: CharacterRoster
+    events: EventDispatcher
+    structure_issues: list[ValidationIssue]
+    """ the structural problems of the save, checked when it's loaded or written """
+    save_issues: dict[str, ValidationIssue]
+    """ the schema problem of every invalid key, kept up to date on every edit """
+    restored_snapshot: int = None
+    """ the backup last restored, restoring again goes back from it """
+    show_resources: bool = False
+    _locations_sidebar: tuple[pygame.Surface, tuple] = None
+    _locations_sidebar_key: tuple = None
+    _resource_overlay: pygame.Surface = None
+    _resource_overlay_version: int = -1
+
+    @property
+    def sub_interface(self) -> bool:
+        """whether the window is too narrow for more than the sub interface"""
+        return self.window.get_width() < SUB_INTERFACE_MAX_WIDTH
+
+    @property
+    def roster_rect(self) -> pygame.Rect:
+        """the roster's view, right of the character box up to the window's edge"""
+        box = self.characterbox
+        left = box.x + box.width + 15
+        width = max(0, self.window.get_width() - left - 20)
+        return pygame.Rect(left, box.y, width, box.height)
 
     def load_action_buttons(self):
-        """TODO: Insert docstring here"""
+        """queue the action buttons' frames for streaming"""
         if not self.action_buttons.empty:
             return
         done_data = quick_load("done button", "textures/done button/done button.json")
         if done_data is None:
             print("no json file found for done button")
             return
-        done_frames = [
-            load_image(os.path.join("textures/done button/", frame), hotspot="topleft")
-            for frame in json.loads(done_data)["frames"]
-        ]
-        animation = Animation(frames=done_frames, speed=50, repeat=-1)
+        frames = json.loads(done_data)["frames"]
+        animation = Animation(
+            frames=[placeholder_surface()] * len(frames), speed=50, repeat=-1
+        )
+        for index, frame in enumerate(frames):
+            asset_streamer.request(
+                partial(
+                    load_image,
+                    os.path.join("textures/done button/", frame),
+                    hotspot="topleft",
+                    compact=COMPACT_UI_TEXTURES,
+                    owner="action buttons",
+                ),
+                partial(animation.set_streamed_frame, index),
+                NORMAL if index == 0 else LOW,
+            )
         self.action_buttons.add_animation("done button", animation)
         self.action_buttons.change_animation(0)
 
     def setup(self):
-        self.characterbox = CharacterBox()
-        # TODO: load in a separate thread
+        # critical assets, everything else streams in while the editor runs
+        _ = Textures.background, FontBank.lcd_font, FontBank.arialnb_font
+        self.locations_buttons = load_location_buttons()
+        self.characterbox = CharacterBox(on_commit=self.validate_edit)
+        self.action_buttons = AnimatatedObject()
         self.load_action_buttons()
+        self.events = EventDispatcher()
+        self.events.on(pygame.KEYDOWN, self.on_keydown)
+        self.events.on(pygame.MOUSEBUTTONDOWN, self.on_click)
+        self.characterbox.register(self.events)
+        self.roster = CharacterRoster(
+            self.roster_rect,
+            [character.icon for character in self.characterbox.character_data],
+            on_select=self.select_character,
+        )
+        self.events.add(self.roster)
+
+    def on_suspend(self):
+        # write the fields' pending edits before the save is swapped out
+        self.characterbox.commit()
+
+    def release(self):
+        del self.locations_buttons, self.characterbox, self.roster, self.events
+        del self.action_buttons
+        self._locations_sidebar = self._locations_sidebar_key = None
+        self._resource_overlay = None
+        self._resource_overlay_version = -1
+
+    def select_character(self, index: int):
+        """show the character at `index` of the roster in the character box"""
+        self.characterbox.current_selected_character = index
+
+    def on_keydown(self, event: pygame.event.Event):
+        """the editor's own keys, they work whatever is focused"""
+        if event.key == pygame.K_BACKQUOTE:
+            self.go_back = True
+        if event.key == pygame.K_F3:
+            self.show_resources = not self.show_resources
+        if event.key == pygame.K_F4:
+            tracer.export()
+        if event.key == pygame.K_F5:
+            print("tracing", "enabled" if tracer.toggle() else "disabled")
+        if event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL:
+            self.write_save()
+        if event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:
+            self.restore_previous_version()
 
-    def render_locations_buttons(self, deltatime: int):
-        """render locations buttons"""
-        # TODO: simplified, this is hard to read
-        # TODO: actually check if areas are opened or not
-        self.locations_buttons.change_animation(0)
-        self.locations_buttons.draw(
-            self.window,
-            deltatime,
-            add_vectors(self.window.get_rect().topleft, (30, 50)),
-        )  # draw location 1
-        # print(self.locations_buttons.animations.keys())
-        for index in range(1, len(self.locations_buttons.animations) - 1):
-            # 2 location is id 1, 3 location is id 2, etc
-            if self.save[self.sectionid].get(f"sw{index}") != "1":
-                self.locations_buttons.change_animation(
-                    len(self.locations_buttons.animations) - 1
-                )
-            else:
-                self.locations_buttons.change_animation(index)
-            self.locations_buttons.draw(
-                self.window,
-                deltatime,
-                add_vectors(self.window.get_rect().topleft, (30, (index + 1) * 50)),
+    def on_click(self, event: pygame.event.Event):
+        """write the save when the done button is clicked"""
+        if event.button == 1 and self.done_button_rect().collidepoint(event.pos):
+            self.write_save()
+
+    def validate_save(self) -> list[ValidationIssue]:
+        """check the whole save, its structure and its values"""
+        self.structure_issues = validate_structure(self.save, fnafw_validator.section)
+        issues = fnafw_validator.validate_values(self.save)
+        self.save_issues = {issue.key: issue for issue in issues}
+        return self.structure_issues + issues
+
+    def validate_edit(self, key: str, value: str):
+        """check an edit written to the save, only its value is checked again"""
+        issue = fnafw_validator.check(key, value)
+        if issue is None:
+            self.save_issues.pop(key, None)
+            return
+        self.save_issues[key] = issue
+        print("invalid edit:", issue)
+
+    def write_save(self) -> bool:
+        """write the save back to its file, refused while the save is invalid"""
+        self.characterbox.commit()
+        issues = self.validate_save()
+        if issues:
+            print(f"not writing the save, it has {len(issues)} problems:")
+            for issue in issues:
+                print(" ", issue)
+            return False
+        if self.save.path is None:
+            print("not writing the save, it wasn't read from a file")
+            return False
+        # the version being replaced can always be restored
+        self.backups.snapshot(os.path.basename(self.save.path), self.save.path)
+        write_save(self.save, self.save.path)
+        self.restored_snapshot = None
+        print("wrote the save to", self.save.path)
+        return True
+
+    def restore_previous_version(self) -> bool:
+        """
+        replace the save file with the latest backup that differs from it and
+        reload it, restoring again goes one version further back. unsaved
+        edits are dropped
+        """
+        path = self.save.path
+        if path is None:
+            return False
+        slot = os.path.basename(path)
+        current = self.backups.snapshot(slot, path)
+        current_content = None if current is None else self.backups.content(current)
+        for snapshot in self.backups.snapshots(slot):
+            if (
+                self.restored_snapshot is not None
+                and snapshot.id >= self.restored_snapshot
+            ):
+                continue
+            content = self.backups.content(snapshot.id)
+            if content == current_content:
+                continue
+            try:
+                parse_save(content.decode("latin-1"))
+            except ParseError as error:
+                print("skipping the unreadable", snapshot, error)
+                continue
+            self.backups.restore(snapshot.id, path)
+            self.restored_snapshot = snapshot.id
+            self.save.read(path)
+            self.bind_save()
+            self.validate_save()
+            print("restored", snapshot)
+            return True
+        print("no older version of", slot, "to restore")
+        return False
+
+    def report_texture_stats(self):
+        """print how much texture deduplication and compact textures saved"""
+        stats = get_dedup_stats()
+        print(
+            f"texture deduplication: {stats['hits']} shared loads,",
+            f"saved {stats['saved_bytes'] / 1024:.1f}KiB",
+        )
+        stats = get_compact_stats()
+        if stats["textures"]:
+            print(
+                f"compact textures: {stats['textures']} {stats['modes']},",
+                f"saved {stats['saved_bytes'] / 1024:.1f}KiB",
             )
-            # self.locations_buttons.change_animation(index)
+
+    def locations_unlocked_mask(self) -> int:
+        """bitmask of the unlocked locations, bit n is location n+1"""
+        # one animation per location and the locked one
+        locations = len(self.locations_buttons.animations) - 1
+        return unlocked_locations(self.save[self.sectionid], locations)
+
+    def build_locations_sidebar(self, mask: int) -> tuple[pygame.Surface, tuple]:
+        """render every location button into one surface, returns it and its offset"""
+        buttons = self.locations_buttons
+        locked = buttons.animation_at(len(buttons.animations) - 1)
+        placed = []
+        for index in range(len(buttons.animations) - 1):
+            animation = buttons.animation_at(index) if mask >> index & 1 else locked
+            frame = animation.frames[0]
+            hotspot = get_surface_hotspot(frame) or (0, 0)
+            placed.append((frame, (30 - hotspot[0], (index + 1) * 50 - hotspot[1])))
+        bounds = pygame.Rect(placed[0][1], placed[0][0].get_size()).unionall(
+            [pygame.Rect(position, frame.get_size()) for frame, position in placed]
+        )
+        sidebar = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        sidebar.blits(
+            [
+                (frame, (position[0] - bounds.x, position[1] - bounds.y))
+                for frame, position in placed
+            ],
+            doreturn=False,
+        )
+        resource_registry.register_surface("locations", "locations sidebar", sidebar)
+        return sidebar, bounds.topleft
+
+    def render_locations_buttons(self):
+        """
+        render locations buttons, they're cached as one surface that's
+        rebuilt when a location gets unlocked or a location texture streams in
+        """
+        key = (self.locations_unlocked_mask(), asset_streamer.loaded)
+        if key != self._locations_sidebar_key:
+            self._locations_sidebar = self.build_locations_sidebar(key[0])
+            self._locations_sidebar_key = key
+        sidebar, offset = self._locations_sidebar
+        self.render_queue.blit(
+            sidebar, add_vectors(self.window.get_rect().topleft, offset)
+        )
+
+    @property
+    def action_buttons_position(self) -> pygame.Vector2:
+        """the top left of the action buttons, under the character box"""
+        characterbox = self.characterbox
+        return (
+            pygame.Vector2(characterbox.x, characterbox.y)
+            + pygame.Vector2(0, characterbox.height)
+            + (-1, 10)
+        )
+
+    def done_button_rect(self) -> pygame.Rect:
+        """the area of the done button on the window"""
+        animation = self.action_buttons.current_animation
+        if animation.sheet is not None:
+            size = animation.frame_rects[animation.current_frame].size
+        else:
+            size = animation.frames[animation.current_frame].get_size()
+        return pygame.Rect(self.action_buttons_position, size)
 
     def render_action_buttons(self, deltatime):
         """render action buttons"""
         # win_react = self.window.get_rect()
-        characterbox = self.characterbox
         self.action_buttons.draw(
-            self.window,
-            deltatime,
-            pygame.Vector2(characterbox.x, characterbox.y)
-            + pygame.Vector2(0, characterbox.height)
-            + (-1, 10),
+            self.render_queue, deltatime, self.action_buttons_position
+        )
+
+    def fastest_animation_interval(self) -> int | None:
+        """milliseconds per frame of the fastest animation playing, if any"""
+        playing = [
+            animation.speed
+            for animation in (
+                self.characterbox.characters.current_animation,
+                self.action_buttons.current_animation,
+            )
+            if not animation.static and not animation.stop
+        ]
+        return min(playing, default=None)
+
+    def build_resource_overlay(self) -> pygame.Surface:
+        """build the resource inspector overlay: memory by subsystem and the largest assets"""
+        font = FontBank.lcd_font
+        white, warning = (255, 255, 255), (255, 80, 80)
+        over_budget = resource_registry.over_budget()
+        lines = [(f"memory: {format_bytes(resource_registry.total_bytes)}", white)]
+        for owner, nbytes in resource_registry.by_owner().items():
+            color = warning if owner in over_budget else white
+            lines.append((f" {owner}: {format_bytes(nbytes)}", color))
+        lines.append(("largest:", white))
+        for record in resource_registry.largest(3):
+            name = os.path.basename(record.name)
+            lines.append(
+                (f" {name} {format_bytes(record.total_bytes)}", (255, 220, 80))
+            )
+        rendered = [font.render(text, 1, color) for text, color in lines]
+        line_height = font.get_height()
+        overlay = pygame.Surface(
+            (max(text.get_width() for text in rendered), line_height * len(rendered)),
+            pygame.SRCALPHA,
         )
+        overlay.fill((0, 0, 0, 160))
+        for index, text in enumerate(rendered):
+            overlay.blit(text, (0, index * line_height))
+        return overlay
 
-    def run(self) -> None:
-        """Editor mainloop"""
+    def render_resource_overlay(self):
+        """render the resource inspector, rebuilt only when the registry changes"""
+        if self._resource_overlay_version != resource_registry.version:
+            self._resource_overlay = self.build_resource_overlay()
+            self._resource_overlay_version = resource_registry.version
+        self.render_queue.blit(
+            self._resource_overlay,
+            self._resource_overlay.get_rect(topright=self.window.get_rect().topright),
+            layer=LAYER_HUD,
+        )
+
+    def bind_save(self):
+        """bind the character box to the save's section, created if it's missing"""
+        if self.sectionid not in self.save:
+            print(f"the save has no [{self.sectionid}] section, starting an empty one")
+        self.characterbox.bind_save(self.save.section(self.sectionid))
+
+    def start(self):
         self.go_back = False
-        # font = pygame.font.Font(None, 30)
-        while True:
-            deltatime = self.clock.tick(
-                FPS
-            )  # make use of delta time for blinkers and animations
-
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_BACKQUOTE:
-                        self.go_back = True
-                    if event.key == pygame.VIDEORESIZE:
-                        # TODO: based on window size change, set self.sub_interface
-                        pass
-                self.characterbox.process_event(event)
-                global_event_handler(self, event)
-            if self.go_back:
-                self.jump_to_state("MainMenu")
-            self.characterbox.update()
-            draw_background(self.window, Textures.background)
-
-            # draw the current slot
-            # text = font.render(str(self.globals.slot), 1, (255, 255, 255))
-            # textpos = text.get_rect(centerx=10, centery=10)
-            # self.window.blit(text, textpos)
-
-            self.characterbox.render(self.window, deltatime)
-            self.render_locations_buttons(deltatime)
+        self.restored_snapshot = None
+        self.bind_save()
+        self.validate_save()
+
+    def handle_event(self, event):
+        self.events.dispatch(event)
+        global_event_handler(self, event)
+
+    def begin_frame(self):
+        if self.go_back:
+            self.jump_to_state("MainMenu")
+        if asset_streamer.pump() and asset_streamer.done:
+            self.report_texture_stats()
+        scaled_textures.update()
+
+    def fixed_update(self, step: float):
+        self.characterbox.update()
+        self.characterbox.characters.update()
+        self.action_buttons.update()
+
+    def render(self, deltatime: int):
+        draw_background(self.window, Textures.background)
+
+        # the background, the character box and its text boxes draw straight
+        # onto the window, the sprites and the HUD on top of them are batched
+        with tracer.span("characterbox"):
+            self.characterbox.render(self.window, deltatime, self.render_queue)
+        with tracer.span("locations"):
+            self.render_locations_buttons()
+        with tracer.span("action buttons"):
             self.render_action_buttons(deltatime)
+        self.roster.visible = not self.sub_interface
+        if self.roster.visible and self.roster.rect != self.roster_rect:
+            self.roster.resize(self.roster_rect)
+            self.events.move(self.roster)
+        if self.roster.visible:
+            with tracer.span("roster"):
+                self.roster.draw(self.render_queue)
 
-            lcd_font_size = FontBank.lcd_font.get_height()
-            text = FontBank.lcd_font.render(
-                f"tokens: {self.tokens}", 1, (255, 255, 255)
-            )
-            self.window.blit(
-                text,
-                subtract_vectors(self.window.get_rect().bottomleft, (0, lcd_font_size)),
-            )
+        lcd_font_size = FontBank.lcd_font.get_height()
+        text = FontBank.lcd_font.render(f"tokens: {self.tokens}", 1, (255, 255, 255))
+        self.render_queue.blit(
+            text,
+            subtract_vectors(self.window.get_rect().bottomleft, (0, lcd_font_size)),
+            layer=LAYER_HUD,
+        )
+        if self.structure_issues or self.save_issues:
+            self.render_save_issues()
 
-            text = FontBank.lcd_font.render(
-                f"fps: {int(self.clock.get_fps())}", 1, (255, 255, 255)
-            )
-            self.window.blit(
-                text,
-                subtract_vectors(
-                    self.window.get_rect().bottomleft, (0, lcd_font_size * 2)
+    def render_save_issues(self):
+        """show how many problems the save has and the first of them under the done button"""
+        issues = self.structure_issues + list(self.save_issues.values())
+        text = FontBank.lcd_font.render(
+            f"{len(issues)} invalid: {issues[0]}", 1, (255, 80, 80)
+        )
+        self.render_queue.blit(
+            text,
+            text.get_rect(topleft=self.done_button_rect().move(0, 4).bottomleft),
+            layer=LAYER_HUD,
+        )
+
+    def render_cosmetic(self):
+        lcd_font_size = FontBank.lcd_font.get_height()
+        text = FontBank.lcd_font.render(
+            f"fps: {int(self.clock.get_fps())} ({self.governor.tier})"
+            f" draws: {self.render_queue.draw_calls}",
+            1,
+            (255, 255, 255),
+        )
+        self.render_queue.blit(
+            text,
+            subtract_vectors(self.window.get_rect().bottomleft, (0, lcd_font_size * 2)),
+            layer=LAYER_HUD,
+        )
+        if self.show_resources:
+            self.render_resource_overlay()
+        if tracer.enabled:
+            graph = tracer.draw_graph()
+            self.render_queue.blit(
+                graph,
+                graph.get_rect(
+                    bottomleft=subtract_vectors(
+                        self.window.get_rect().bottomleft, (0, lcd_font_size * 2)
+                    )
                 ),
+                layer=LAYER_HUD,
             )
-            pygame.display.flip()
+
+    def presented(self):
+        asset_streamer.mark_interactive()
+
+    def frame_rate(self) -> int:
+        return self.governor.pick(
+            self.animation_clock.now,
+            focused=self.focused,
+            minimized=self.minimized,
+            typing=self.characterbox.typing,
+            animation_interval=self.fastest_animation_interval(),
+        )
@@ -5,7 +5,8 @@ outlines and drawing background images
 
 import pygame
 
-from .geometry import circlepoints
+from .geometry import TVector2, circlepoints
+from .scaling import scaled_textures
 from .textures import get_surface_hotspot
 
 
@@ -41,6 +42,9 @@ def draw_background(window, image):
     """
     Draws a background image with a hotspot.
     The image is placed such that the position is at (0, 0) in the window.
+    The image is stretched to fill the window, using the pre-scaled variant
+    for the window size once it's ready.
     """
-    hotspot = get_surface_hotspot(image)
+    image = scaled_textures.get(image, window.get_size())
+    hotspot = get_surface_hotspot(image) or TVector2((0, 0))
     window.blit(image, (-hotspot.x, -hotspot.y))
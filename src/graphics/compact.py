@@ -0,0 +1,163 @@
+"""
+Compact storage for flat coloured UI textures.
+
+`compact_surface` picks the smallest lossless representation for a
+texture on its own:
+
+- "palette": at most 256 colours and no partial transparency, stored as
+  an 8-bit palettized surface, transparent pixels use an RLE accelerated
+  colorkey.
+- "colorkey": no partial transparency, stored in the display format with
+  an RLE accelerated colorkey.
+- "rle": partial transparency, stored in the display format with RLE
+  accelerated per-pixel alpha, the fully transparent runs are skipped.
+
+The result is compared with the original, with the colour of fully
+transparent pixels ignored, and dropped if anything differs. RLE
+surfaces don't expose their encoded size, so the compact sizes are
+estimates from the amount of visible pixels. Blitting isn't timed while
+loading, `python -m tools.bench_compact` compares the blit times.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import pygame
+
+KEY_COLORS = ((255, 0, 255), (0, 255, 0), (1, 2, 3), (254, 1, 253))
+RLE_RUN_OVERHEAD = 4
+""" bytes of run headers estimated per row of an RLE surface """
+ALPHA_MASK = int.from_bytes(b"\0\0\0\xff", "little")
+
+
+@dataclass
+class CompactResult:
+    """the outcome of compacting a texture"""
+
+    name: str
+    mode: str
+    original_bytes: int
+    compact_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        """bytes saved by the compact representation"""
+        return self.original_bytes - self.compact_bytes
+
+
+_compact_results: list[CompactResult] = []
+
+
+def _normalized_pixels(surface: pygame.Surface) -> bytes:
+    """RGBA pixels with every fully transparent pixel zeroed"""
+    copy = pygame.image.frombytes(
+        pygame.image.tobytes(surface, "RGBA"), surface.get_size(), "RGBA"
+    )
+    # multiplying by 255 keeps a channel as it is, by 0 clears it
+    visible = pygame.mask.from_surface(copy, 0).to_surface(
+        setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0)
+    )
+    copy.blit(visible, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    return pygame.image.tobytes(copy, "RGBA")
+
+
+def _same_pixels(compact: pygame.Surface, surface: pygame.Surface) -> bool:
+    """whether both surfaces look the same, the colour of invisible pixels aside"""
+    if pygame.image.tobytes(compact, "RGBA") == pygame.image.tobytes(surface, "RGBA"):
+        return True
+    return _normalized_pixels(compact) == _normalized_pixels(surface)
+
+
+def _as_palette(
+    surface: pygame.Surface, visible_colors: list[int], transparent: bool
+) -> pygame.Surface:
+    offset = 1 if transparent else 0
+    index_of = {color: index + offset for index, color in enumerate(visible_colors)}
+    palette = [tuple(color.to_bytes(4, "little")[:3]) for color in visible_colors]
+    if transparent:
+        palette.insert(0, (0, 0, 0))
+    pixels = memoryview(pygame.image.tobytes(surface, "RGBA")).cast("I")
+    indices = bytes(index_of.get(pixel, 0) for pixel in pixels)
+    compact = pygame.image.frombytes(indices, surface.get_size(), "P")
+    compact.set_palette(palette + [(0, 0, 0)] * (256 - len(palette)))
+    if transparent:
+        compact.set_colorkey(0, pygame.RLEACCEL)
+    return compact
+
+
+def _as_colorkey(surface: pygame.Surface, colors: set[int]) -> Optional[pygame.Surface]:
+    for key in KEY_COLORS:
+        if int.from_bytes(bytes((*key, 255)), "little") not in colors:
+            break
+    else:
+        return None
+    compact = pygame.Surface(surface.get_size()).convert()
+    compact.fill(key)
+    compact.blit(surface, (0, 0))
+    compact.set_colorkey(key, pygame.RLEACCEL)
+    return compact
+
+
+def compact_surface(
+    surface: pygame.Surface, name: str = ""
+) -> tuple[pygame.Surface, Optional[CompactResult]]:
+    """
+    get the smallest lossless representation of `surface`. the surface is
+    returned as is when there's no display to convert to yet or when no
+    compact representation is lossless
+    """
+    if pygame.display.get_surface() is None:
+        return surface, None
+    pixels = pygame.image.tobytes(surface, "RGBA")
+    colors = set(memoryview(pixels).cast("I"))
+    alphas = set(pixels[3::4])
+    binary_alpha = alphas <= {0, 255}
+    transparent = 0 in alphas
+
+    compact, mode = None, None
+    visible_colors = sorted(color for color in colors if color & ALPHA_MASK)
+    if binary_alpha and len(visible_colors) <= 256 - transparent:
+        compact, mode = _as_palette(surface, visible_colors, transparent), "palette"
+    elif binary_alpha and transparent:
+        compact, mode = _as_colorkey(surface, colors), "colorkey"
+    if compact is None and transparent:
+        compact, mode = surface.convert_alpha(), "rle"
+        compact.set_alpha(255, pygame.RLEACCEL)
+    if compact is None:
+        return surface, None
+    if not _same_pixels(compact, surface):
+        return surface, None
+
+    width, height = surface.get_size()
+    if mode == "palette" and not transparent:
+        compact_bytes = compact.get_pitch() * height
+    else:
+        visible = width * height - pixels[3::4].count(0)
+        bytesize = 1 if mode == "palette" else compact.get_bytesize()
+        compact_bytes = visible * bytesize + height * RLE_RUN_OVERHEAD
+    if compact_bytes >= surface.get_pitch() * height:
+        return surface, None
+    result = CompactResult(
+        name=name,
+        mode=mode,
+        original_bytes=surface.get_pitch() * height,
+        compact_bytes=compact_bytes,
+    )
+    _compact_results.append(result)
+    return compact, result
+
+
+def get_compact_stats() -> dict:
+    """
+    get what the compact texture mode saved: the textures per mode and
+    the bytes saved
+    """
+    results = _compact_results
+    modes: dict[str, int] = {}
+    for result in results:
+        modes[result.mode] = modes.get(result.mode, 0) + 1
+    return {
+        "textures": len(results),
+        "modes": modes,
+        "saved_bytes": sum(result.saved_bytes for result in results),
+    }
@@ -0,0 +1,145 @@
+"""
+Keeps track of the memory used by loaded resources.
+
+Every loader reports the resources it creates into `resource_registry`
+with an owner (the subsystem that holds it, e.g. "characters"), so the
+memory can be inspected per subsystem, budgets can be set and leaks can
+be spotted. Surfaces are tracked with weak references, a surface that
+gets garbage collected drops out of the registry on its own.
+"""
+
+import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pygame
+
+
+@dataclass
+class ResourceRecord:
+    """memory information about a single resource"""
+
+    owner: str
+    name: str
+    size: tuple[int, int]
+    bytes_per_pixel: int
+    total_bytes: int
+    kind: str = "surface"
+    shared_by: list[str] = field(default_factory=list)
+    """ owners that got the same resource from a deduplicated load """
+
+
+class ResourceRegistry:
+    """registry of the resources loaded by the editor"""
+
+    def __init__(self):
+        self._records: dict[int | tuple, ResourceRecord] = {}
+        self._refs: dict[int, weakref.ref] = {}
+        self.budgets: dict[str, int] = {}
+        self.version = 0
+        """ incremented every time the registry changes """
+
+    def _forget(self, key: int):
+        self._records.pop(key, None)
+        self._refs.pop(key, None)
+        self.version += 1
+
+    def register_surface(
+        self,
+        owner: str,
+        name: str,
+        surface: pygame.Surface,
+        total_bytes: Optional[int] = None,
+    ) -> ResourceRecord:
+        """
+        record a surface, if the surface is already recorded the owner
+        is only added to the owners sharing it. `total_bytes` overrides the
+        size for surfaces that don't keep plain pixels (e.g. RLE encoded)
+        """
+        key = id(surface)
+        record = self._records.get(key)
+        if record is not None:
+            if owner != record.owner and owner not in record.shared_by:
+                record.shared_by.append(owner)
+                self.version += 1
+            return record
+        record = ResourceRecord(
+            owner=owner,
+            name=name,
+            size=surface.get_size(),
+            bytes_per_pixel=surface.get_bytesize(),
+            total_bytes=(
+                surface.get_pitch() * surface.get_height()
+                if total_bytes is None
+                else total_bytes
+            ),
+        )
+        self._records[key] = record
+        self._refs[key] = weakref.ref(surface, lambda _: self._forget(key))
+        self.version += 1
+        return record
+
+    def register_font(self, owner: str, name: str, path: Optional[str] = None):
+        """record a font, the font file size is used as an estimate"""
+        nbytes = os.path.getsize(path) if path and os.path.exists(path) else 0
+        key = ("font", owner, name)
+        record = ResourceRecord(
+            owner=owner,
+            name=name,
+            size=(0, 0),
+            bytes_per_pixel=0,
+            total_bytes=nbytes,
+            kind="font",
+        )
+        self._records[key] = record
+        self.version += 1
+        return record
+
+    def records(self) -> list[ResourceRecord]:
+        """get all the live records"""
+        return list(self._records.values())
+
+    @property
+    def total_bytes(self) -> int:
+        """total bytes used by all the recorded resources"""
+        return sum(record.total_bytes for record in self._records.values())
+
+    def by_owner(self) -> dict[str, int]:
+        """total bytes per owner, largest first"""
+        totals: dict[str, int] = {}
+        for record in self._records.values():
+            totals[record.owner] = totals.get(record.owner, 0) + record.total_bytes
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def largest(self, count: int = 5) -> list[ResourceRecord]:
+        """the `count` largest resources"""
+        return sorted(
+            self._records.values(), key=lambda record: record.total_bytes, reverse=True
+        )[:count]
+
+    def set_budget(self, owner: str, nbytes: int):
+        """set a memory budget for an owner"""
+        self.budgets[owner] = nbytes
+        self.version += 1
+
+    def over_budget(self) -> dict[str, int]:
+        """owners that use more than their budget, with the bytes they're over by"""
+        totals = self.by_owner()
+        return {
+            owner: totals.get(owner, 0) - budget
+            for owner, budget in self.budgets.items()
+            if totals.get(owner, 0) > budget
+        }
+
+
+resource_registry = ResourceRegistry()
+
+
+def format_bytes(nbytes: int) -> str:
+    """format an amount of bytes to a human readable string"""
+    for unit in ("B", "KiB", "MiB"):
+        if nbytes < 1024:
+            return f"{nbytes:.0f}{unit}" if unit == "B" else f"{nbytes:.1f}{unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f}GiB"
@@ -0,0 +1,59 @@
+"""
+Batched sprite submission.
+
+Components draw onto a `RenderQueue` the same way they draw onto a
+surface (it has a `blit` method), the queue collects the blits of a
+frame and `flush` submits them in a single `Surface.blits` call, sorted
+by layer. Blits on the same layer keep the order they were queued in.
+"""
+
+from typing import Optional
+
+import pygame
+
+LAYER_BACKGROUND = 0
+LAYER_UI = 1
+LAYER_SPRITES = 2
+LAYER_HUD = 3
+
+
+class RenderQueue:
+    """collects the blits of a frame and submits them at once"""
+
+    def __init__(self):
+        self._entries: list[
+            tuple[int, pygame.Surface, tuple, Optional[pygame.Rect]]
+        ] = []
+        self.layer = LAYER_SPRITES
+        """ the layer `blit` queues onto when no layer is given """
+        self.draw_calls = 0
+        """ the amount of blits submitted by the last flush """
+
+    def blit(
+        self,
+        source: pygame.Surface,
+        dest,
+        area: Optional[pygame.Rect] = None,
+        layer: Optional[int] = None,
+    ):
+        """queue a blit, takes the same arguments as `pygame.Surface.blit`"""
+        self._entries.append(
+            (self.layer if layer is None else layer, source, dest, area)
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def flush(self, target: pygame.Surface):
+        """submit the queued blits to `target` sorted by layer and clear the queue"""
+        entries = self._entries
+        entries.sort(key=lambda entry: entry[0])  # stable, keeps the queue order
+        target.blits(
+            [(source, dest, area) for _, source, dest, area in entries],
+            doreturn=False,
+        )
+        self.draw_calls = len(entries)
+        entries.clear()
+
+
+render_queue = RenderQueue()
@@ -0,0 +1,189 @@
+"""
+Pre-scaled variants of textures for a resizable window.
+
+`ScaledTextureCache` keeps `smoothscale`d copies of textures per window
+size bucket: the window size rounded up to a multiple of `bucket`, a
+tracked texture is stretched to fill it and the window clips what's
+left over. A texture that already fills the bucket with less than a
+bucket to spare is drawn as it is, so the 850x530 background is only
+scaled once the window is narrower than 833px.
+
+The variants are scaled on a worker thread once a resize has settled,
+from copies taken outside the draw path, and until they're ready the
+most recently used variant (or the original texture) is drawn. Only the
+last few buckets are kept, so dragging the window edge back and forth
+doesn't rescale every frame. Textures are held weakly, a texture that's
+dropped takes its variants with it.
+"""
+
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import pygame
+
+from .registry import resource_registry
+from .textures import get_surface_hotspot, set_surface_hotspot
+
+Size = tuple[int, int]
+
+
+def scale_surface(surface: pygame.Surface, size: Size) -> pygame.Surface:
+    """scale a surface to `size`, smoothly unless it's palettized"""
+    if surface.get_bitsize() in (24, 32):
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
+
+
+def _scale_hotspot(surface: pygame.Surface, variant: pygame.Surface):
+    """give `variant` the hotspot of `surface`, scaled with it"""
+    hotspot = get_surface_hotspot(surface)
+    if hotspot is None:
+        return
+    (width, height), (new_width, new_height) = surface.get_size(), variant.get_size()
+    set_surface_hotspot(
+        variant,
+        (round(hotspot.x * new_width / width), round(hotspot.y * new_height / height)),
+    )
+
+
+class ScaledTextureCache:
+    """
+    cache of scaled texture variants per window size bucket
+
+    :param bucket: window sizes are rounded up to a multiple of this.
+    :param max_buckets: how many recent buckets to keep variants for.
+    :param settle_time: milliseconds the window size must stay the same
+        before its variants are scaled.
+    """
+
+    def __init__(self, bucket: int = 32, max_buckets: int = 4, settle_time: int = 150):
+        self.bucket = bucket
+        self.max_buckets = max_buckets
+        self.settle_time = settle_time
+        self._variants: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        """ the variant of every tracked texture by bucket, None if it needs none """
+        self._recent: OrderedDict[Size, None] = OrderedDict()
+        """ the buckets that have variants, least recently used first """
+        self._pending: dict[Size, Future] = {}
+        self._bucket: Optional[Size] = None
+        """ the bucket of the window size the textures were last drawn at """
+        self._resized_at = 0.0
+        self._settled = True
+        """ whether the variants of `_bucket` were scheduled """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scaler")
+        self.scaled = 0
+        """ the amount of variants scaled """
+
+    def size_bucket(self, window_size: Size) -> Size:
+        """round a window size up to its bucket"""
+        return tuple(-(-length // self.bucket) * self.bucket for length in window_size)
+
+    def target_size(self, texture_size: Size, bucket: Size) -> Size:
+        """the size of the variant of a texture for `bucket`"""
+        return tuple(
+            length if bound - self.bucket < length <= bound else bound
+            for length, bound in zip(texture_size, bucket)
+        )
+
+    def on_resize(self, window_size: Size):
+        """note a window resize, the variants are scaled once the size settles"""
+        bucket = self.size_bucket(window_size)
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self._resized_at = time.perf_counter()
+            self._settled = False
+
+    def get(self, surface: pygame.Surface, window_size: Size) -> pygame.Surface:
+        """
+        the variant of `surface` for the window size, the most recently used
+        variant or the original while it isn't ready. the surface is tracked
+        from now on, only lookups happen here
+        """
+        self.on_resize(window_size)
+        variants = self._variants.get(surface)
+        if variants is None:
+            variants = self._variants[surface] = {}
+            self._settled = False
+        if self._bucket in variants:
+            self._recent.move_to_end(self._bucket)
+            return variants[self._bucket] or surface
+        for recent in reversed(self._recent):
+            if recent in variants:
+                return variants[recent] or surface
+        return surface
+
+    def _jobs(self, bucket: Size) -> list[tuple[weakref.ref, pygame.Surface, Size]]:
+        """the textures without a variant for `bucket`, copied for the worker"""
+        jobs = []
+        for surface, variants in list(self._variants.items()):
+            if bucket in variants:
+                continue
+            size = self.target_size(surface.get_size(), bucket)
+            copy = None if size == surface.get_size() else surface.copy()
+            jobs.append((weakref.ref(surface), copy, size))
+        return jobs
+
+    @staticmethod
+    def _scale(jobs: list[tuple[weakref.ref, pygame.Surface, Size]]):
+        return [
+            (ref, None if copy is None else scale_surface(copy, size))
+            for ref, copy, size in jobs
+        ]
+
+    def _collect(self) -> bool:
+        collected = False
+        for bucket, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[bucket]
+            if future.cancelled():
+                continue
+            for ref, variant in future.result():
+                surface = ref()
+                if surface is None:
+                    continue
+                self._variants.setdefault(surface, {})[bucket] = variant
+                if variant is not None:
+                    _scale_hotspot(surface, variant)
+                    resource_registry.register_surface(
+                        "scaled textures",
+                        "x".join(map(str, variant.get_size())),
+                        variant,
+                    )
+                    self.scaled += 1
+            self._recent[bucket] = None
+            self._recent.move_to_end(bucket)
+            collected = True
+        while len(self._recent) > self.max_buckets:
+            stale, _ = self._recent.popitem(last=False)
+            for variants in self._variants.values():
+                variants.pop(stale, None)
+        return collected
+
+    def update(self) -> bool:
+        """
+        schedule the scaling once the window size settled and collect the
+        finished variants, called once per frame before drawing. returns
+        True if new variants are ready to be drawn
+        """
+        if (
+            not self._settled
+            and self._bucket not in self._pending
+            and (time.perf_counter() - self._resized_at) * 1000 >= self.settle_time
+        ):
+            self._settled = True
+            jobs = self._jobs(self._bucket)
+            if jobs:
+                for stale, future in list(self._pending.items()):
+                    if future.cancel():
+                        del self._pending[stale]
+                self._pending[self._bucket] = self._executor.submit(self._scale, jobs)
+        if self._pending:
+            return self._collect()
+        return False
+
+
+scaled_textures = ScaledTextureCache()
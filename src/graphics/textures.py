@@ -1,12 +1,21 @@
 """Textures and helper functions for textures"""
 
+import hashlib
+import weakref
+from functools import lru_cache
 from typing import Optional, Union
 
 import pygame
 
+from .compact import compact_surface
 from .geometry import TVector2
+from .registry import resource_registry
 
-_textures_hotspot_table: dict[pygame.Surface, TVector2] = {}
+_textures_hotspot_table: dict[pygame.Surface, TVector2] = weakref.WeakKeyDictionary()
+_textures_content_table: dict[tuple, pygame.Surface] = weakref.WeakValueDictionary()
+_textures_size_table: dict[tuple, int] = {}
+""" the bytes the surface of each content key takes once compacted """
+_dedup_stats = {"hits": 0, "saved_bytes": 0}
 
 
 def get_hotspot_from_string(surface: pygame.Surface, hotspot: str) -> tuple[int, int]:
@@ -25,11 +34,44 @@ def get_hotspot_from_string(surface: pygame.Surface, hotspot: str) -> tuple[int,
         raise ValueError(f"Invalid hotspot: {hotspot}") from None
 
 
+def surface_size_in_bytes(surface: pygame.Surface) -> int:
+    """the amount of bytes the pixel data of a surface takes"""
+    return surface.get_pitch() * surface.get_height()
+
+
+def _content_key(surface: pygame.Surface, hotspot: TVector2) -> tuple:
+    """key identifying a surface by its decoded pixels, format and hotspot"""
+    digest = hashlib.blake2b(
+        pygame.image.tobytes(surface, "RGBA"), digest_size=16
+    ).digest()
+    return (
+        digest,
+        surface.get_size(),
+        surface.get_bitsize(),
+        surface.get_flags() & pygame.SRCALPHA,
+        hotspot,
+    )
+
+
 def load_image(
-    path: str, hotspot: Optional[Union[tuple[int, int], str]] = None, *, convert=False
+    path: str,
+    hotspot: Optional[Union[tuple[int, int], str]] = None,
+    *,
+    convert=False,
+    dedup=True,
+    compact=False,
+    owner: str = "untracked",
 ) -> pygame.Surface:
     """
-    Load an image with a hotspot
+    Load an image with a hotspot, the image is reported to the
+    resource registry under `owner`
+
+    if `compact` is set, the image is stored in the smallest lossless
+    representation `graphics.compact.compact_surface` finds for it
+
+    if `dedup` is set, images with the same pixels and hotspot as an
+    already loaded image return the already loaded surface instead,
+    so don't draw onto surfaces returned by this function.
     """
     image = pygame.image.load(path)
     if convert:
@@ -39,10 +81,51 @@ def load_image(
     if isinstance(hotspot, str):
         hotspot = get_hotspot_from_string(image, hotspot)
     # else it is a tuple
-    _textures_hotspot_table[image] = TVector2(hotspot)
+    hotspot = TVector2(hotspot)
+    if dedup:
+        key = (*_content_key(image, hotspot), compact)
+        shared = _textures_content_table.get(key)
+        if shared is not None:
+            _dedup_stats["hits"] += 1
+            _dedup_stats["saved_bytes"] += _textures_size_table.get(
+                key, surface_size_in_bytes(shared)
+            )
+            resource_registry.register_surface(owner, path, shared)
+            return shared
+    total_bytes = None
+    if compact:
+        image, result = compact_surface(image, path)
+        if result is not None:
+            total_bytes = result.compact_bytes
+    if dedup:
+        _textures_content_table[key] = image
+        _textures_size_table[key] = total_bytes or surface_size_in_bytes(image)
+    _textures_hotspot_table[image] = hotspot
+    resource_registry.register_surface(owner, path, image, total_bytes)
     return image
 
 
+def get_dedup_stats() -> dict[str, int]:
+    """
+    get how many loads were served by an already loaded surface
+    and how many bytes of pixel data that saved
+    """
+    return {"unique": len(_textures_content_table), **_dedup_stats}
+
+
 def get_surface_hotspot(surface: pygame.Surface) -> Optional[TVector2]:
     """get the hotspot of a surface"""
     return _textures_hotspot_table.get(surface)
+
+
+def set_surface_hotspot(surface: pygame.Surface, hotspot: tuple[int, int]):
+    """set the hotspot of a surface that wasn't loaded with `load_image`"""
+    _textures_hotspot_table[surface] = TVector2(hotspot)
+
+
+@lru_cache
+def placeholder_surface() -> pygame.Surface:
+    """a transparent surface to draw in place of assets that are still loading"""
+    surface = pygame.Surface((1, 1), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    return surface
@@ -13,26 +13,45 @@ from threading import Thread
 import pygame
 from game_state.errors import ExitGame, ExitState
 
+from components.slot_preview import SlotPreviews
+from core import slot_path
 from editor import Editor
-from graphics import draw_background, render_text_with_outline
+from graphics import draw_background, render_text_with_outline, scaled_textures
 from states import MainEditorStateManager, State
-from utils.constants import EDITOR_DEBUG, FPS, WINDOW_SIZE, global_event_handler
+from utils.constants import (
+    EDITOR_DEBUG,
+    FPS,
+    TRACING,
+    WINDOW_SIZE,
+    global_event_handler,
+)
+from utils.governor import frame_rate_governor
 from utils.helper import Counter
+from utils.loop import loop_driver
 from utils.resources import Textures
+from utils.streaming import asset_streamer
+from utils.tracing import tracer
 
 
 class SlotButton:
     """a simple button class."""
 
-    image = Textures.button
-    image_selected = Textures.button_selected
-
     def __init__(self, x: int, y: int, text: str = "", font_size=50):
         self.x = x
         self.y = y
         self.text = text
         self.font_size = font_size
 
+    @property
+    def image(self) -> pygame.Surface:
+        """the texture of the button"""
+        return Textures.button
+
+    @property
+    def image_selected(self) -> pygame.Surface:
+        """the texture of the button when selected"""
+        return Textures.button_selected
+
     def get_texture(self, selected: bool):
         """get the texture of the button based on if the button is selected or not"""
         return self.image_selected if selected else self.image
@@ -42,8 +61,14 @@ class SlotButton:
         self.x = x
         self.y = y
 
-    def draw(self, window: pygame.Surface, selected: bool, text: str = ""):
-        """draw the button"""
+    def draw(
+        self,
+        window: pygame.Surface,
+        selected: bool,
+        text: str = "",
+        preview: pygame.Surface = None,
+    ):
+        """draw the button, the `preview` of its slot is drawn under the text"""
         texture: pygame.Surface = self.get_texture(selected)
         rect = texture.get_rect()
         rect.x, rect.y = self.x, self.y
@@ -54,15 +79,26 @@ class SlotButton:
             text_surface = render_text_with_outline(text, font, (255, 255, 255))
             text_rect = text_surface.get_rect(
                 centerx=self.x + texture.get_width() // 2,
-                centery=self.y + texture.get_height() // 2,
+                centery=self.y + texture.get_height() // 2 - (12 if preview else 0),
             )
             window.blit(text_surface, text_rect)
+        if preview is not None:
+            window.blit(
+                preview,
+                preview.get_rect(
+                    centerx=self.x + texture.get_width() // 2,
+                    centery=self.y + texture.get_height() // 2 + 18,
+                ),
+            )
 
 
 class MainMenu(State):
     """main menu select what save to edit"""
 
-    update: bool = True
+    needs_redraw: bool = True
+    loader: Thread = None
+    load_error: str = ""
+    previews: SlotPreviews = None
     buttons = [SlotButton(100, 100), SlotButton(100, 200), SlotButton(100, 300)]
     current_selection = Counter(0, 0, len(buttons) - 1)
 
@@ -76,56 +112,125 @@ class MainMenu(State):
                 - button.get_texture(is_selected).get_width() // 2,
                 100 + index * 100,
             )
-            button.draw(window, selected=is_selected, text=f"SLOT {index+1}")
+            button.draw(
+                window,
+                selected=is_selected,
+                text=f"SLOT {index+1}",
+                preview=self.previews.previews[index],
+            )
+        if self.load_error:
+            text = render_text_with_outline(
+                self.load_error, pygame.font.Font(None, 30), (255, 90, 90)
+            )
+            window.blit(
+                text,
+                text.get_rect(centerx=window.get_rect().centerx, top=100 + 3 * 100),
+            )
 
-    def load_and_jump(self):
+    def read_save(self, path: str):
+        """read the save file, run in a thread by `load_and_jump`"""
+        try:
+            if not self.save.read(path):
+                self.load_error = f"no save file in slot {self.globals.slot+1}"
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.load_error = f"failed to load slot {self.globals.slot+1}: {error}"
 
-        # TODO: load in a thread and
-        # create a loading frame, spinning fredbear animation?
-        # sad animation when failure to load save file
+    def draw_loading(self, angle: float):
+        """draw the loading frame, a spinning freddy"""
+        draw_background(self.window, Textures.background)
+        spinner = pygame.transform.rotate(Textures.freddy, angle)
+        self.window.blit(
+            spinner, spinner.get_rect(center=self.window.get_rect().center)
+        )
+        text = render_text_with_outline(
+            "loading...", pygame.font.Font(None, 40), (255, 255, 255)
+        )
+        self.window.blit(
+            text,
+            text.get_rect(
+                centerx=self.window.get_rect().centerx,
+                bottom=self.window.get_rect().bottom - 20,
+            ),
+        )
 
-        self.save.read(
-            os.path.join(
-                os.getenv("APPDATA"),
-                "MMFApplications",
-                f"fnafwr{self.globals.slot+1}",
-            )
+    def load_and_jump(self):
+        """
+        load the save of the selected slot in a thread, the loading frame is
+        shown meanwhile and the editor is jumped to once it's loaded
+        """
+        # TODO: sad animation when failure to load save file
+        self.load_error = ""
+        self.loader = Thread(
+            target=self.read_save,
+            args=(slot_path(self.globals.slot),),
+            daemon=True,
         )
-        self.jump_to_state("Editor")
+        self.loader.start()
 
-    def run(self) -> None:
-        self.update = True
+    def start(self):
+        self.needs_redraw = True
+        if self.previews is None:
+            self.previews = SlotPreviews(
+                [slot_path(slot) for slot in range(len(self.buttons))]
+            )
+        # the slots are checked in the background, only changed saves are parsed
+        self.previews.refresh()
         if EDITOR_DEBUG:
             self.load_and_jump()
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    match (event.key):
-                        case pygame.K_DOWN:
-                            self.current_selection += 1
-                        case pygame.K_UP:
-                            self.current_selection -= 1
-                        case pygame.K_RETURN:
-                            self.globals.slot = int(self.current_selection)
-                            print(
-                                "enter been pressed for button", self.current_selection
-                            )
-                            self.load_and_jump()
-                    self.update = True
-                if event.type == pygame.VIDEORESIZE:
-                    self.update = True
-                global_event_handler(self, event)
-            if not self.update:  # avoid using cpu/gpu power when not needed
-                continue
-            draw_background(self.window, Textures.background)
-            self.draw_buttons()
-            pygame.display.flip()
-            self.clock.tick(FPS)
-            self.update = False
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and self.loader is None:
+            match (event.key):
+                case pygame.K_DOWN:
+                    self.current_selection += 1
+                case pygame.K_UP:
+                    self.current_selection -= 1
+                case pygame.K_RETURN:
+                    self.globals.slot = int(self.current_selection)
+                    print("enter been pressed for button", self.current_selection)
+                    self.load_and_jump()
+            self.needs_redraw = True
+        if event.type == pygame.VIDEORESIZE:
+            self.needs_redraw = True
+        global_event_handler(self, event)
+
+    def begin_frame(self):
+        if scaled_textures.update():
+            self.needs_redraw = True
+        asset_streamer.pump()
+        if self.previews.pump():
+            self.needs_redraw = True
+        if self.loader is None or self.loader.is_alive():
+            return
+        self.loader = None
+        self.needs_redraw = True
+        if self.load_error:
+            print(self.load_error)
+            return
+        self.jump_to_state("Editor")
+
+    def should_render(self) -> bool:
+        # avoid using cpu/gpu power when not needed, the loading frame spins
+        return self.needs_redraw or self.loader is not None
+
+    def render(self, deltatime: int):
+        if self.loader is not None:
+            self.draw_loading(-self.animation_clock.now * 0.36)  # a turn per second
+            return
+        draw_background(self.window, Textures.background)
+        self.draw_buttons()
+        self.needs_redraw = False
+
+    def frame_rate(self) -> int:
+        if self.loader is not None:
+            return FPS
+        return super().frame_rate()
 
 
 def main() -> None:
     """main function holds the main loop of the editor"""
+    asset_streamer.mark_start()
+    tracer.enabled = TRACING
     pygame.init()
     pygame.display.set_caption("FNaF World Save Editor")
     screen = pygame.display.set_mode(WINDOW_SIZE, pygame.RESIZABLE)
@@ -157,5 +262,8 @@ if __name__ == "__main__":
         main()
     except ExitGame:
         print("Game has exited successfully")
+        print("time per frame rate tier:", frame_rate_governor.summary())
+        print("main loop:", loop_driver.summary())
+        tracer.export()
     except KeyboardInterrupt:
         print("Game has been terminated")
@@ -6,14 +6,28 @@ This module contains the `MainEditorStateManager` which is a custom
 which is based on `game_state.State` and has extra functionality such as
 `jump_to_state`, `window` getter that would get the window from the manager
 
+States are kept alive between switches: a state that's switched away
+from is suspended with its components and assets kept, switching back
+resumes it. When the resources in use go over `keep_alive_budget` the
+least recently used suspended states are released, a released state is
+set up again once it's resumed.
+
 """
 
-from configparser import ConfigParser
+import time
+from typing import Optional
 
 from game_state import State as orgState
 from game_state import StateManager
 
+from core import SECTION, SaveFile
+from core.backups import BackupStore
+from graphics.registry import format_bytes, resource_registry
+from graphics.render_queue import RenderQueue, render_queue
+from utils.clock import AnimationClock, animation_clock
+from utils.governor import FrameRateGovernor, frame_rate_governor
 from utils.helper import AttrDict
+from utils.loop import LoopDriver, loop_driver
 
 
 class MainEditorStateManager(StateManager):
@@ -23,11 +37,57 @@ class MainEditorStateManager(StateManager):
     """
 
     globals: AttrDict = AttrDict(slot=0)
-    save = ConfigParser()
+    save = SaveFile()
+    backups: BackupStore = BackupStore()
+    animation_clock: AnimationClock = animation_clock
+    render_queue: RenderQueue = render_queue
+    governor: FrameRateGovernor = frame_rate_governor
+    loop: LoopDriver = loop_driver
+    keep_alive_budget: Optional[int] = 64 * 1024 * 1024
+    """ bytes of resources above which cold states are released, None keeps all """
 
     def __init__(self, window):
         super().__init__(window)
         self.window = window
+        self.suspended_at: dict[str, float] = {}
+        """ when each suspended state was switched away from """
+
+    def change_state(self, state_name: str) -> None:
+        """change the current state, suspending the previous one and resuming the new one"""
+        previous = self.get_current_state()
+        super().change_state(state_name)
+        current = self.get_current_state()
+        if previous is current:
+            return
+        if previous is not None:
+            previous.on_suspend()
+            self.suspended_at[type(previous).__name__] = time.perf_counter()
+        self.suspended_at.pop(state_name, None)
+        self.release_cold_states()
+        if current.released:
+            print(f"setting up released state {state_name}")
+            current.setup()
+            current.released = False
+        current.on_resume()
+
+    def release_cold_states(self):
+        """release the least recently used suspended states while over the budget"""
+        if self.keep_alive_budget is None:
+            return
+        states = self.get_state_map()
+        for name in sorted(self.suspended_at, key=self.suspended_at.get):
+            if resource_registry.total_bytes <= self.keep_alive_budget:
+                return
+            state = states[name]
+            if state.released:
+                continue
+            before = resource_registry.total_bytes
+            state.release()
+            state.released = True
+            print(
+                f"released cold state {name},",
+                f"freed {format_bytes(before - resource_registry.total_bytes)}",
+            )
 
 
 class State(orgState):
@@ -35,6 +95,57 @@ class State(orgState):
 
     manager: MainEditorStateManager
     focused: bool = True
+    minimized: bool = False
+    released: bool = False
+    """ whether the state dropped its components and has to be set up again """
+
+    def on_suspend(self):
+        """called when the manager switches away from the state, it stays alive"""
+
+    def on_resume(self):
+        """called when the manager switches back to the state"""
+
+    def release(self):
+        """
+        drop the components and assets the state built in `setup`, called
+        when the state is cold and the manager is over its memory budget
+        """
+
+    def run(self) -> None:
+        """run the state's phases with the manager's loop driver"""
+        self.loop.run(self)
+
+    # the phases of the loop driver, see utils.loop
+    def start(self):
+        """called once each time the state starts running"""
+
+    def handle_event(self, event):
+        """handle an event"""
+
+    def begin_frame(self):
+        """per-frame work that isn't simulation, runs once per frame"""
+
+    def fixed_update(self, step: float):
+        """advance the state by `step` milliseconds"""
+
+    def should_render(self) -> bool:
+        """whether the frame has to be rendered"""
+        return True
+
+    def render(self, deltatime: int):
+        """render the frame"""
+
+    def render_cosmetic(self):
+        """render what can be dropped when the frame runs over its budget"""
+
+    def presented(self):
+        """called after the frame was flipped onto the display"""
+
+    def frame_rate(self) -> int:
+        """the frame rate to run the next frame at"""
+        return self.governor.pick(
+            self.animation_clock.now, focused=self.focused, minimized=self.minimized
+        )
 
     @property
     def globals(self) -> AttrDict:
@@ -42,15 +153,39 @@ class State(orgState):
         return self.manager.globals
 
     @property
-    def save(self) -> ConfigParser:
+    def save(self) -> SaveFile:
         """get the save dict from manager"""
         return self.manager.save
 
+    @property
+    def animation_clock(self) -> AnimationClock:
+        """get the animation clock from manager, tick it once per frame"""
+        return self.manager.animation_clock
+
+    @property
+    def render_queue(self) -> RenderQueue:
+        """get the render queue from manager, flush it once per frame"""
+        return self.manager.render_queue
+
+    @property
+    def backups(self) -> BackupStore:
+        """get the backup store of the saves from manager"""
+        return self.manager.backups
+
+    @property
+    def governor(self) -> FrameRateGovernor:
+        """get the frame rate governor from manager"""
+        return self.manager.governor
+
+    @property
+    def loop(self) -> LoopDriver:
+        """get the loop driver from manager"""
+        return self.manager.loop
+
     @property
     def sectionid(self) -> str:
         """get the save file id"""
-        # TODO: don't hardcode the save file id
-        return "fnafw"
+        return SECTION
 
     def jump_to_state(self, name: str):
         """jump to a state"""
@@ -0,0 +1,60 @@
+"""
+Blit benchmark of the compact texture mode.
+
+Compacts every texture the editor ships (see `graphics.compact`) and
+times blitting the original and the compact surface onto a surface in
+the display format, run from src:
+
+    python -m tools.bench_compact [--blits 100]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import pygame
+
+from graphics.compact import compact_surface, get_compact_stats
+
+
+def time_blits(surface: pygame.Surface, target: pygame.Surface, blits: int) -> float:
+    """average microseconds to blit `surface` onto `target`"""
+    start = time.perf_counter()
+    for _ in range(blits):
+        target.blit(surface, (0, 0))
+    return (time.perf_counter() - start) / blits * 1e6
+
+
+def main():
+    """compact every texture and print its blit times"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--blits", type=int, default=100)
+    args = parser.parse_args()
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    original_total = compact_total = 0.0
+    for path in sorted(
+        glob.glob(os.path.join("textures", "**", "*.png"), recursive=True)
+    ):
+        surface = pygame.image.load(path)
+        compact, result = compact_surface(surface, path)
+        if result is None:
+            continue
+        target = pygame.Surface(surface.get_size()).convert()
+        original = time_blits(surface, target, args.blits)
+        compacted = time_blits(compact, target, args.blits)
+        original_total += original
+        compact_total += compacted
+        print(f"{result.mode:>8} {original:8.1f}us -> {compacted:8.1f}us  {path}")
+    stats = get_compact_stats()
+    count = stats["textures"] or 1
+    print(
+        f"{stats['textures']} textures {stats['modes']},",
+        f"saved {stats['saved_bytes'] / 1024:.1f}KiB,",
+        f"blit {original_total / count:.1f}us -> {compact_total / count:.1f}us",
+    )
+
+
+if __name__ == "__main__":
+    main()
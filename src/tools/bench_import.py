@@ -0,0 +1,63 @@
+"""
+Import time benchmark of the save library.
+
+Times importing `core` against importing the editor's states (which pulls
+in pygame) in fresh interpreters, run from src:
+
+    python -m tools.bench_import [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "core": "import core",
+    "pygame": "import pygame",
+    "states": "import states",
+}
+ENVIRONMENT = {**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"}
+""" the environment of the interpreters timed, pygame's greeting hidden """
+
+
+def time_import(statement: str) -> float:
+    """milliseconds a fresh interpreter takes to run `statement`, startup excluded"""
+    code = (
+        "import time; start = time.perf_counter();"
+        f" {statement}; print((time.perf_counter() - start) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=ENVIRONMENT,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """time every target and print the results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    for name, statement in TARGETS.items():
+        times = [time_import(statement) for _ in range(args.runs)]
+        print(
+            f"{name:>8}: median {statistics.median(times):7.2f}ms"
+            f" min {min(times):7.2f}ms over {args.runs} runs"
+        )
+        modules = subprocess.run(
+            [sys.executable, "-c", f"{statement}; import sys; print(len(sys.modules))"],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=ENVIRONMENT,
+        ).stdout.split()[-1]
+        print(f"{'':>8}  {modules} modules loaded")
+
+
+if __name__ == "__main__":
+    main()
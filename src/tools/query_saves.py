@@ -0,0 +1,71 @@
+"""
+Search a corpus of saves through a persistent index.
+
+The index is brought up to date first (only new and changed files are
+parsed), then the query is answered from it, run from src:
+
+    python -m tools.query_saves saves/ "sw3=1 and sw2=0"
+    python -m tools.query_saves saves/ "freddy.lv > 50" --count
+
+Characters can be named in queries (`freddy.lv`), their ids are read
+from the characters' json files. See `core.index` for the query language.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from core.index import QueryError, SaveIndex
+
+CHARACTERS = "textures/characters"
+
+
+def character_aliases() -> dict[str, int]:
+    """the id of every character by name"""
+    aliases = {}
+    for file in glob.glob(os.path.join(CHARACTERS, "*", "*.json")):
+        with open(file, encoding="utf-8") as data:
+            character = json.load(data)
+        aliases[character["name"]] = character["id"]
+    return aliases
+
+
+def main() -> int:
+    """update the index and print the saves matching the query"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="+", help="save files or directories")
+    parser.add_argument("query", help='e.g. "sw3=1 and sw2=0"')
+    parser.add_argument("--index", default="saves.index.sqlite3")
+    parser.add_argument("--count", action="store_true", help="only print the count")
+    args = parser.parse_args()
+
+    index = SaveIndex(args.index, aliases=character_aliases())
+    start = time.perf_counter()
+    counts = index.update(args.paths)
+    indexed = time.perf_counter()
+    for path, error in index.failures:
+        print(f"not indexing {path}: {error}", file=sys.stderr)
+    try:
+        paths = index.query(args.query)
+    except QueryError as error:
+        print(f"invalid query: {error}", file=sys.stderr)
+        return 2
+    queried = time.perf_counter()
+    if not args.count:
+        for path in paths:
+            print(path)
+    print(
+        f"{len(paths)} of {len(index)} saves match, query took"
+        f" {(queried - indexed) * 1000:.1f}ms, indexing {(indexed - start) * 1000:.0f}ms"
+        f" ({counts['added']} added, {counts['updated']} updated,"
+        f" {counts['removed']} removed, {counts['failed']} unreadable)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
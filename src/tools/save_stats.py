@@ -0,0 +1,84 @@
+"""
+Statistics over a corpus of saves.
+
+Loads the saves into columns (see `core.columns`, needs numpy) and prints
+a JSON report of the keys asked for, run from src:
+
+    python -m tools.save_stats saves/ --describe tokens 1lv --funnel sw1 sw2 sw3
+    python -m tools.save_stats saves/ --distribution 1lv --cache saves.columns
+
+With --cache the columns are kept in that directory and memory-mapped on
+the next run, they're only loaded again once a save changed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from core import find_saves
+from core.columns import SaveColumns
+
+
+def load_columns(paths: list[str], cache: str | None) -> SaveColumns:
+    """the columns of the saves in `paths`, from `cache` while it's up to date"""
+    if cache and os.path.exists(os.path.join(cache, "columns.json")):
+        columns = SaveColumns.open(cache)
+        if columns.paths == list(find_saves(paths)) and not columns.stale():
+            return columns
+    columns = SaveColumns.load(paths)
+    if cache:
+        columns.save(cache)
+    return columns
+
+
+def main() -> int:
+    """load the columns of the saves and print the statistics asked for"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="+", help="save files or directories")
+    parser.add_argument("--describe", nargs="+", default=[], metavar="KEY")
+    parser.add_argument("--distribution", nargs="+", default=[], metavar="KEY")
+    parser.add_argument(
+        "--percentiles", nargs="+", type=float, default=[50, 90, 99], metavar="P"
+    )
+    parser.add_argument("--funnel", nargs="+", default=[], metavar="FLAG")
+    parser.add_argument("--cache", help="keep the columns in this directory")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    columns = load_columns(args.paths, args.cache)
+    loaded = time.perf_counter()
+    for path, error in columns.failures:
+        print(f"not loading {path}: {error}", file=sys.stderr)
+    report = {"saves": len(columns), "describe": {}, "distribution": {}}
+    for key in args.describe:
+        if key not in columns:
+            print(f"no column {key!r}", file=sys.stderr)
+            return 2
+        report["describe"][key] = columns.describe(key)
+        report["describe"][key]["percentiles"] = dict(
+            zip(
+                (f"{percent:g}" for percent in args.percentiles),
+                columns.percentiles(key, args.percentiles),
+            )
+        )
+    for key in args.distribution:
+        if key not in columns:
+            print(f"no column {key!r}", file=sys.stderr)
+            return 2
+        report["distribution"][key] = columns.distribution(key)
+    if args.funnel:
+        report["funnel"] = dict(zip(args.funnel, columns.funnel(args.funnel)))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    print(
+        f"loading took {(loaded - start) * 1000:.0f}ms,"
+        f" statistics {(time.perf_counter() - loaded) * 1000:.1f}ms",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Bulk save validation.
+
+Checks every save given against the fnafw schema and prints a JSON report
+of the saves that aren't valid, run from src:
+
+    python -m tools.validate_saves saves/ other/fnafwr1 [--report report.json]
+
+Directories are searched recursively for files named fnafwr*, the exit
+status is 1 when a save is invalid or can't be read.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from core import ParseError, find_saves, fnafw_validator, read_save
+
+
+def check_save(path: str) -> list[dict]:
+    """the problems of the save at `path` as report entries"""
+    try:
+        save = read_save(path)
+    except (OSError, ParseError) as error:
+        return [{"key": "", "message": str(error)}]
+    return [
+        {"key": issue.key, "message": issue.message}
+        for issue in fnafw_validator.validate(save)
+    ]
+
+
+def main() -> int:
+    """check the saves and print the report, returns the exit status"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="+", help="save files or directories")
+    parser.add_argument("--report", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    checked, invalid = 0, []
+    for path in find_saves(args.paths):
+        checked += 1
+        issues = check_save(path)
+        if issues:
+            invalid.append({"path": path, "issues": issues})
+    report = {
+        "checked": checked,
+        "invalid": len(invalid),
+        "seconds": round(time.perf_counter() - start, 3),
+        "saves": invalid,
+    }
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"{checked} saves checked, {len(invalid)} invalid, see {args.report}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
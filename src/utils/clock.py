@@ -0,0 +1,42 @@
+"""
+The animation clock shared by everything animated in the editor.
+
+The state manager owns the clock, animations and blinkers read the same
+timestamp instead of keeping their own timers, so everything animated
+moves in step. The loop driver advances it by a fixed step per update,
+`tick` follows the wall clock instead.
+"""
+
+import time
+
+
+class AnimationClock:
+    """a millisecond clock that only moves when it's ticked"""
+
+    def __init__(self):
+        self.now = self._ticks()
+        """ the timestamp of the current frame in milliseconds """
+        self.frame = 0
+        """ the amount of ticks so far """
+        self._exact = float(self.now)
+
+    @staticmethod
+    def _ticks() -> int:
+        return int(time.monotonic() * 1000)
+
+    def tick(self) -> int:
+        """advance the clock to the current time, call once per frame"""
+        self.now = self._ticks()
+        self._exact = float(self.now)
+        self.frame += 1
+        return self.now
+
+    def advance(self, milliseconds: float) -> int:
+        """advance the clock by a fixed step, fractions of a millisecond add up"""
+        self._exact += milliseconds
+        self.now = int(self._exact)
+        self.frame += 1
+        return self.now
+
+
+animation_clock = AnimationClock()
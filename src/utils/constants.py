@@ -7,26 +7,45 @@ from typing import Union
 import pygame
 from game_state.errors import ExitGame
 
+from graphics.scaling import scaled_textures
 from states import State
 
 ColorLike = Union[pygame.Color, tuple[int, int, int], tuple[int, int, int, int], int]
 
-FPS = 60
+FPS = 60  # the full rate, see utils.governor for the lower tiers
 EDITOR_DEBUG = True
+TRACING = False  # F5 toggles tracing, F4 exports the trace
 # 850x530
 WINDOW_SIZE = (500, 530)
 MAX_WINDOW_SIZE = (850, 530)
 MIN_WINDOW_SIZE = (500, 530)
+SUB_INTERFACE_MAX_WIDTH = 700
+INPUT_EVENTS = (
+    pygame.KEYDOWN,
+    pygame.TEXTINPUT,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEWHEEL,
+)
+# store flat coloured UI art (buttons, locations) in a compact lossless format
+COMPACT_UI_TEXTURES = True
 
 
 def global_event_handler(state: State, event: pygame.event.Event):
     """
-    global event handler, handles pygame.QUIT and pygame.VIDEORESIZE
+    global event handler, handles pygame.QUIT and pygame.VIDEORESIZE,
+    tracks the window focus and reports input to the frame rate governor
     """
+    if event.type in INPUT_EVENTS:
+        state.governor.note_input(state.animation_clock.now)
     if event.type == pygame.WINDOWFOCUSLOST:
         state.focused = False
     elif event.type == pygame.WINDOWFOCUSGAINED:
         state.focused = True
+    elif event.type == pygame.WINDOWMINIMIZED:
+        state.minimized = True
+    elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED):
+        state.minimized = False
     elif (
         event.type == pygame.QUIT
         or event.type == pygame.KEYDOWN
@@ -38,3 +57,4 @@ def global_event_handler(state: State, event: pygame.event.Event):
         width = min(max(width, MIN_WINDOW_SIZE[0]), MAX_WINDOW_SIZE[0])
         height = min(max(height, MIN_WINDOW_SIZE[1]), MAX_WINDOW_SIZE[1])
         state.window = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+        scaled_textures.on_resize((width, height))
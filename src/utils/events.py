@@ -0,0 +1,177 @@
+"""
+Event routing for UI components.
+
+`EventDispatcher` replaces handing every event to every component. Plain
+handlers are indexed by event type, components are kept in a
+`SpatialIndex` by their rect: mouse events only reach the components
+under the cursor and key events only reach the focused component, so the
+cost of dispatching an event doesn't grow with the amount of components.
+
+The component that was hovered or focused before still gets the mouse
+event that moves away from it, so buttons can drop their hover colour
+and text boxes can lose focus the way they do on their own. The focused
+component also gets the scroll wheel wherever the cursor is.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import pygame
+
+Handler = Callable[[pygame.event.Event], Any]
+
+MOUSE_EVENTS = (
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEWHEEL,
+)
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT)
+
+
+class SpatialIndex:
+    """
+    a uniform grid of rects, finds the items at a point without
+    checking every item
+
+    :param cell_size: the size of a grid cell in pixels.
+    """
+
+    def __init__(self, cell_size: int = 64):
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], list] = defaultdict(list)
+        self._rects: dict[Any, pygame.Rect] = {}
+
+    def _cells_of(self, rect: pygame.Rect):
+        size = self.cell_size
+        for cell_x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield cell_x, cell_y
+
+    def __contains__(self, item) -> bool:
+        return item in self._rects
+
+    def __len__(self):
+        return len(self._rects)
+
+    def insert(self, item, rect):
+        """add `item` covering `rect`, an item already in the index is moved"""
+        rect = pygame.Rect(rect)
+        if self._rects.get(item) == rect:
+            return
+        self.remove(item)
+        self._rects[item] = rect
+        for cell in self._cells_of(rect):
+            self._cells[cell].append(item)
+
+    def remove(self, item):
+        """remove `item`, nothing happens if it isn't in the index"""
+        rect = self._rects.pop(item, None)
+        if rect is None:
+            return
+        for cell in self._cells_of(rect):
+            self._cells[cell].remove(item)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def at(self, position) -> list:
+        """the items whose rect contains `position`"""
+        x, y = position
+        cell = self._cells.get((int(x) // self.cell_size, int(y) // self.cell_size))
+        if not cell:
+            return []
+        return [item for item in cell if self._rects[item].collidepoint(x, y)]
+
+
+@dataclass(eq=False)
+class _Entry:
+    component: Any
+    handler: Handler
+    focusable: bool
+    order: int
+
+
+class EventDispatcher:
+    """routes events to handlers by type and to components by position and focus"""
+
+    def __init__(self, cell_size: int = 64):
+        self._handlers: dict[int, list[Handler]] = defaultdict(list)
+        self._entries: dict[int, _Entry] = {}
+        self._index = SpatialIndex(cell_size)
+        self._order = 0
+        self.focused: Optional[_Entry] = None
+        self._hovered: list[_Entry] = []
+
+    def on(self, event_type: int, handler: Handler):
+        """call `handler` with every event of `event_type`"""
+        self._handlers[event_type].append(handler)
+
+    def add(
+        self,
+        component,
+        rect=None,
+        handler: Optional[Handler] = None,
+        *,
+        focusable: bool = False,
+    ):
+        """
+        route the mouse events inside `rect` (the component's rect by
+        default) to `handler` (the component's `get_event` by default),
+        a focusable component also gets the key events once it's clicked
+        """
+        entry = _Entry(
+            component, handler or component.get_event, focusable, self._order
+        )
+        self._order += 1
+        self._entries[id(component)] = entry
+        self._index.insert(entry, component.rect if rect is None else rect)
+
+    def move(self, component, rect=None):
+        """update the rect of `component` after it moved or resized"""
+        entry = self._entries[id(component)]
+        self._index.insert(entry, component.rect if rect is None else rect)
+
+    def remove(self, component):
+        """stop routing events to `component`"""
+        entry = self._entries.pop(id(component), None)
+        if entry is None:
+            return
+        self._index.remove(entry)
+        if self.focused is entry:
+            self.focused = None
+        if entry in self._hovered:
+            self._hovered.remove(entry)
+
+    @property
+    def focused_component(self):
+        """the component key events go to"""
+        return self.focused and self.focused.component
+
+    def components_at(self, position) -> list:
+        """the components under `position`"""
+        return [entry.component for entry in self._index.at(position)]
+
+    def _dispatch_mouse(self, event: pygame.event.Event):
+        position = getattr(event, "pos", None) or pygame.mouse.get_pos()
+        hits = sorted(self._index.at(position), key=lambda entry: entry.order)
+        targets = list(hits)
+        if event.type == pygame.MOUSEMOTION:
+            targets += [entry for entry in self._hovered if entry not in hits]
+            self._hovered = hits
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL):
+            if self.focused is not None and self.focused not in hits:
+                targets.append(self.focused)
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.focused = next((entry for entry in hits if entry.focusable), None)
+        for entry in targets:
+            entry.handler(event)
+
+    def dispatch(self, event: pygame.event.Event):
+        """route `event` to its handlers and to the components it concerns"""
+        for handler in self._handlers.get(event.type, ()):
+            handler(event)
+        if event.type in MOUSE_EVENTS:
+            self._dispatch_mouse(event)
+        elif event.type in KEY_EVENTS and self.focused is not None:
+            self.focused.handler(event)
@@ -0,0 +1,86 @@
+"""
+Adaptive frame rate.
+
+`FrameRateGovernor` picks the tick rate of the main loop from what's going
+on: full rate while the user is typing or interacting and while fast
+animations play, a low rate when only slow animations are left (a low
+rate still shows every frame of them), and an idle rate that nearly
+halts the loop while the window is unfocused or minimized. It counts the
+time spent in each tier so power savings can be checked.
+"""
+
+from typing import Optional
+
+FULL = "full"
+LOW = "low"
+IDLE = "idle"
+
+
+class FrameRateGovernor:
+    """
+    picks the tick rate from the current activity
+
+    :param full: the frame rate while typing, interacting or animating fast.
+    :param low: the frame rate while only slow animations play.
+    :param idle: the frame rate while the window is unfocused or minimized.
+    :param activity_timeout: milliseconds full rate is kept after the last input.
+    """
+
+    def __init__(
+        self, full: int = 60, low: int = 20, idle: int = 2, activity_timeout=500
+    ):
+        self.rates = {FULL: full, LOW: low, IDLE: idle}
+        self.activity_timeout = activity_timeout
+        self.tier = FULL
+        self.time_in_tier: dict[str, int] = {FULL: 0, LOW: 0, IDLE: 0}
+        """ milliseconds spent in each tier """
+        self._last_input = 0
+
+    def note_input(self, now: int):
+        """note user input at the clock time `now`"""
+        self._last_input = now
+
+    # pylint: disable=too-many-arguments
+    def pick(
+        self,
+        now: int,
+        *,
+        focused: bool = True,
+        minimized: bool = False,
+        typing: bool = False,
+        animation_interval: Optional[int] = None,
+    ) -> int:
+        """
+        pick the tier for the next frame and return its frame rate
+
+        :param now: the current clock time in milliseconds.
+        :param animation_interval: milliseconds per frame of the fastest
+            animation playing, None when nothing is animating.
+        """
+        if minimized or not focused:
+            self.tier = IDLE
+        elif typing or now - self._last_input < self.activity_timeout:
+            self.tier = FULL
+        elif (
+            animation_interval is not None
+            and animation_interval < 1000 / self.rates[LOW]
+        ):
+            self.tier = FULL
+        else:
+            self.tier = LOW
+        return self.rates[self.tier]
+
+    def record(self, frame_time: int):
+        """count the time of the frame that just ended towards the current tier"""
+        self.time_in_tier[self.tier] += frame_time
+
+    def summary(self) -> str:
+        """a summary of the time spent in each tier"""
+        total = sum(self.time_in_tier.values()) or 1
+        return ", ".join(
+            f"{tier} ({self.rates[tier]}fps): {ms / 1000:.1f}s {ms / total:.0%}"
+            for tier, ms in self.time_in_tier.items()
+        )
+
+
+frame_rate_governor = FrameRateGovernor()
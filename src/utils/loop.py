@@ -0,0 +1,149 @@
+"""
+The main loop shared by every state.
+
+`LoopDriver.run` drives a state through the same phases each frame:
+
+1. events: every pending event is handed to `state.handle_event`.
+2. `state.begin_frame`: per-frame work that isn't simulation, e.g.
+   streaming assets.
+3. fixed updates: `state.fixed_update` runs once per `step` milliseconds
+   of elapsed time, the animation clock advances by exactly one step
+   each time, so animations and timers behave the same at any frame rate.
+4. render: `state.render` when `state.should_render()`, then
+   `state.render_cosmetic` only if the frame is still within its budget,
+   the render queue is flushed and the display flipped.
+
+A frame that falls behind catches up with up to `max_steps` updates and
+skips its render (at most `max_frame_skip` frames in a row), time beyond
+that is dropped so a slow machine slows the editor down instead of
+spiralling. The frame rate itself comes from `state.frame_rate()`, a
+frame of a lower tier is long on purpose: it runs the updates its period
+needs on top of the catch-up ones and isn't behind for it.
+"""
+
+import math
+import time
+
+import pygame
+
+from graphics.render_queue import render_queue
+from utils.clock import animation_clock
+from utils.governor import frame_rate_governor
+from utils.tracing import tracer
+
+
+class LoopDriver:
+    """
+    runs a state's phases with a fixed-timestep update
+
+    :param step: milliseconds simulated by each fixed update.
+    :param max_steps: the most fixed updates run in one frame at the full
+        rate, slower frames run as many more as their period needs.
+    :param max_frame_skip: the most renders skipped in a row to catch up.
+    :param budget: milliseconds a frame may take before cosmetic work is dropped.
+    """
+
+    def __init__(
+        self,
+        step: float = 1000 / 60,
+        max_steps: int = 5,
+        max_frame_skip: int = 2,
+        budget: float = 1000 / 60,
+    ):
+        self.step = step
+        self.max_steps = max_steps
+        self.max_frame_skip = max_frame_skip
+        self.budget = budget
+        self.frame_time = 0
+        """ milliseconds the last frame took, as measured by the state's clock """
+        self.stats = {
+            "frames": 0,
+            "updates": 0,
+            "renders": 0,
+            "skipped_renders": 0,
+            "skipped_cosmetic": 0,
+            "dropped_ms": 0.0,
+        }
+        self._accumulator = 0.0
+        self._skipped = 0
+
+    def _fixed_updates(self, state, period: float) -> bool:
+        """
+        run the fixed updates due in a frame meant to last `period`
+        milliseconds, returns whether the frame is behind
+        """
+        self._accumulator += self.frame_time
+        max_steps = self.max_steps - 1 + max(1, math.ceil(period / self.step))
+        steps = 0
+        while self._accumulator >= self.step and steps < max_steps:
+            animation_clock.advance(self.step)
+            with tracer.span("fixed_update"):
+                state.fixed_update(self.step)
+            self._accumulator -= self.step
+            steps += 1
+        self.stats["updates"] += steps
+        behind = self._accumulator >= self.step
+        if self._accumulator > self.step * max_steps:
+            # more than a frame's worth of catching up is left, drop it
+            dropped = self._accumulator - self.step * max_steps
+            self.stats["dropped_ms"] += dropped
+            self._accumulator -= dropped
+        return behind
+
+    def _render(self, state, frame_start: float):
+        with tracer.span("render"):
+            state.render(self.frame_time)
+        elapsed = (time.perf_counter() - frame_start) * 1000
+        if elapsed <= self.budget:
+            with tracer.span("render_cosmetic"):
+                state.render_cosmetic()
+        else:
+            self.stats["skipped_cosmetic"] += 1
+        with tracer.span("flush"):
+            render_queue.flush(state.window)
+        with tracer.span("flip"):
+            pygame.display.flip()
+        state.presented()
+        self.stats["renders"] += 1
+
+    def run(self, state):
+        """run `state` until it changes state or the game exits"""
+        self._accumulator = 0.0
+        self._skipped = 0
+        state.clock.tick()  # don't count the time spent before the loop started
+        state.start()
+        while True:
+            rate = state.frame_rate()
+            self.frame_time = state.clock.tick(rate)
+            frame_start = time.perf_counter()
+            frame_rate_governor.record(self.frame_time)
+            tracer.end_frame(state.clock.get_rawtime())  # the work, not the wait
+            self.stats["frames"] += 1
+
+            with tracer.span("events"):
+                for event in pygame.event.get():
+                    state.handle_event(event)
+            with tracer.span("begin_frame"):
+                state.begin_frame()
+            behind = self._fixed_updates(state, 1000 / rate if rate else self.step)
+
+            if behind and self._skipped < self.max_frame_skip:
+                self._skipped += 1
+                self.stats["skipped_renders"] += 1
+                continue
+            self._skipped = 0
+            if state.should_render():
+                self._render(state, frame_start)
+
+    def summary(self) -> str:
+        """a summary of the frames run, rendered and skipped"""
+        stats = self.stats
+        return (
+            f"{stats['frames']} frames, {stats['updates']} updates,"
+            f" {stats['renders']} renders, {stats['skipped_renders']} renders"
+            f" and {stats['skipped_cosmetic']} cosmetic passes skipped,"
+            f" {stats['dropped_ms'] / 1000:.1f}s dropped"
+        )
+
+
+loop_driver = LoopDriver()
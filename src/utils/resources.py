@@ -3,14 +3,23 @@
 # pylint: disable=too-few-public-methods
 import pygame
 
+from graphics.registry import resource_registry
 from graphics.textures import load_image
 
+from .constants import COMPACT_UI_TEXTURES
 from .helper import instantiate
 
 CHARACTER_TEXTURES_PATH = "textures/characters/"
 Surface = pygame.Surface
 
 
+def load_font(path: str, size: int, owner: str = "fonts") -> pygame.font.Font:
+    """load a font and report it to the resource registry"""
+    font = pygame.font.Font(path, size)
+    resource_registry.register_font(owner, f"{path}@{size}", path)
+    return font
+
+
 class LazyAttributes:
     """
     A class that loads attributes lazily when they are accessed
@@ -34,12 +43,10 @@ class LazyAttributes:
 class FontBank(LazyAttributes):
     """A class that loads fonts lazily when they are accessed"""
 
-    arialnb_font: pygame.font.Font = lambda _: pygame.font.Font(
+    arialnb_font: pygame.font.Font = lambda _: load_font(
         "textures/fonts/ARIALNB.TTF", 30
     )
-    lcd_font: pygame.font.Font = lambda _: pygame.font.Font(
-        "textures/fonts/LcdSolid.ttf", 20
-    )
+    lcd_font: pygame.font.Font = lambda _: load_font("textures/fonts/LcdSolid.ttf", 20)
 
 
 # pylint: disable=unnecessary-lambda-assignment
@@ -47,12 +54,22 @@ class FontBank(LazyAttributes):
 class Textures(LazyAttributes):
     """holds the textures used in the editor"""
 
-    button: Surface = lambda _: load_image("textures/save-button.png", hotspot="center")
+    button: Surface = lambda _: load_image(
+        "textures/save-button.png",
+        hotspot="center",
+        compact=COMPACT_UI_TEXTURES,
+        owner="textures",
+    )
     button_selected: Surface = lambda _: load_image(
-        "textures/save-button-selected.png", hotspot="center"
+        "textures/save-button-selected.png",
+        hotspot="center",
+        compact=COMPACT_UI_TEXTURES,
+        owner="textures",
     )
     # TODO: make a default texture for characters when failure to load texture happens
     freddy: Surface = lambda _: load_image(
-        "textures/characters/freddy.png", hotspot=(125, 220)
+        "textures/characters/freddy.png", hotspot=(125, 220), owner="textures"
+    )
+    background: Surface = lambda _: load_image(
+        "textures/background.png", convert=True, owner="textures"
     )
-    background: Surface = lambda _: load_image("textures/background.png", convert=True)
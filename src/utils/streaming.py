@@ -0,0 +1,113 @@
+"""
+Progressive asset loading.
+
+Critical assets are loaded right away with `AssetStreamer.load_now`,
+everything else is queued with a priority and loaded a few at a time by
+`AssetStreamer.pump`, which the states call once per frame with a time
+budget so the window stays responsive while assets stream in. Whatever
+is drawn in the meantime uses a placeholder until its asset is ready.
+"""
+
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Optional
+
+CRITICAL = 0
+HIGH = 1
+NORMAL = 2
+LOW = 3
+
+
+class AssetStreamer:
+    """
+    loads queued assets in priority order within a per-frame time budget
+
+    :param budget: milliseconds `pump` may spend loading per frame.
+    """
+
+    def __init__(self, budget: float = 4):
+        self.budget = budget
+        self._queue: list[tuple[int, int, Callable[[], Any], Callable[[Any], None]]] = (
+            []
+        )
+        self._order = itertools.count()
+        self.started_at = time.perf_counter()
+        self.metrics: dict[str, float] = {}
+        self.loaded = 0
+
+    def mark_start(self):
+        """start the clock the metrics are measured from"""
+        self.started_at = time.perf_counter()
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def mark_interactive(self):
+        """record the time to the first interactive frame, only the first call counts"""
+        if "first_interactive_frame_ms" in self.metrics:
+            return
+        self.metrics["first_interactive_frame_ms"] = self._elapsed_ms()
+        print(
+            "time to first interactive frame:",
+            f"{self.metrics['first_interactive_frame_ms']:.1f}ms",
+        )
+
+    def load_now(self, loader: Callable[[], Any]) -> Any:
+        """load a critical asset right away"""
+        self.loaded += 1
+        return loader()
+
+    def request(
+        self,
+        loader: Callable[[], Any],
+        on_ready: Callable[[Any], None],
+        priority: int = NORMAL,
+    ):
+        """
+        queue an asset, `on_ready` is called with the result of `loader`
+        once it's loaded. lower priorities are loaded first, assets with
+        the same priority load in the order they were requested
+        """
+        if priority <= CRITICAL:
+            on_ready(self.load_now(loader))
+            return
+        heapq.heappush(self._queue, (priority, next(self._order), loader, on_ready))
+
+    @property
+    def pending(self) -> int:
+        """the amount of assets still waiting to be loaded"""
+        return len(self._queue)
+
+    @property
+    def done(self) -> bool:
+        """whether everything queued has been loaded"""
+        return not self._queue
+
+    def pump(self, budget: Optional[float] = None) -> int:
+        """
+        load queued assets until the time budget (milliseconds) runs out,
+        at least one asset is loaded per call. returns how many were loaded
+        """
+        if not self._queue:
+            return 0
+        budget = self.budget if budget is None else budget
+        deadline = time.perf_counter() + budget / 1000
+        count = 0
+        while self._queue:
+            _, _, loader, on_ready = heapq.heappop(self._queue)
+            on_ready(loader())
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.loaded += count
+        if not self._queue and "fully_loaded_ms" not in self.metrics:
+            self.metrics["fully_loaded_ms"] = self._elapsed_ms()
+            print(
+                f"streamed {self.loaded} assets,",
+                f"fully loaded after {self.metrics['fully_loaded_ms']:.1f}ms",
+            )
+        return count
+
+
+asset_streamer = AssetStreamer()
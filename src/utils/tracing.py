@@ -0,0 +1,169 @@
+"""
+Per-frame tracing.
+
+`tracer.span(name)` times a block of code into a fixed-size ring buffer,
+the loop driver wraps its phases in spans and the states wrap their
+render calls. While tracing is disabled `span` returns a shared no-op
+context, so the spans cost a method call and an attribute check.
+
+The buffer can be exported as Chrome trace event JSON (open it in
+chrome://tracing or https://ui.perfetto.dev), the frame times are kept
+in a separate ring for the frame time graph.
+"""
+
+import json
+import os
+import time
+from typing import Optional
+
+import pygame
+
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class _NoSpan:
+    """the span handed out while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+class _Span:
+    __slots__ = ("owner", "name", "start")
+
+    def __init__(self, owner: "Tracer", name: str):
+        self.owner = owner
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_):
+        self.owner.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:  # pylint: disable=too-many-instance-attributes
+    """
+    records named spans into a ring buffer
+
+    :param capacity: the amount of spans kept, older ones are overwritten.
+    :param frames: the amount of frame times kept for the graph.
+    """
+
+    def __init__(self, capacity: int = 8192, frames: int = 120):
+        self.enabled = False
+        self.capacity = capacity
+        self._names: list[Optional[str]] = [None] * capacity
+        self._starts = [0] * capacity
+        self._ends = [0] * capacity
+        self._frames = [0] * capacity
+        self._next = 0
+        self._count = 0
+        self.frame = 0
+        self.frame_times = [0.0] * frames
+        """ milliseconds per frame, a ring indexed by the frame number """
+        self._origin = time.perf_counter_ns()
+        self._graph: Optional[pygame.Surface] = None
+        """ the surface the frame time graph is drawn into, reused every frame """
+
+    def span(self, name: str):
+        """a context manager that records the time spent in it as `name`"""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, start: int, end: int):
+        """record a span from `start` to `end` (perf_counter_ns)"""
+        index = self._next
+        self._names[index] = name
+        self._starts[index] = start
+        self._ends[index] = end
+        self._frames[index] = self.frame
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def end_frame(self, frame_time: float):
+        """note that a frame ended after `frame_time` milliseconds"""
+        if not self.enabled:
+            return
+        self.frame_times[self.frame % len(self.frame_times)] = frame_time
+        self.frame += 1
+
+    def toggle(self) -> bool:
+        """enable or disable tracing, returns whether it's enabled now"""
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def spans(self) -> list[tuple[str, int, int, int]]:
+        """the recorded spans, oldest first: (name, start, end, frame)"""
+        first = (self._next - self._count) % self.capacity
+        order = [(first + offset) % self.capacity for offset in range(self._count)]
+        return [
+            (self._names[i], self._starts[i], self._ends[i], self._frames[i])
+            for i in order
+        ]
+
+    def chrome_trace(self) -> dict:
+        """the recorded spans as Chrome trace events"""
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": 1,
+                "args": {"frame": frame},
+            }
+            for name, start, end, frame in self.spans()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Optional[str] = None) -> Optional[str]:
+        """write the spans as Chrome trace JSON, returns the path or None if empty"""
+        if not self._count:
+            return None
+        path = path or time.strftime("trace-%Y%m%d-%H%M%S.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+        print(f"wrote {self._count} spans to {path}")
+        return path
+
+    def draw_graph(self, size=(120, 40)) -> pygame.Surface:
+        """
+        a bar graph of the latest frame times, the line is the 60fps budget.
+        the same surface is drawn into and returned every call
+        """
+        width, height = size
+        if self._graph is None or self._graph.get_size() != size:
+            self._graph = pygame.Surface(size, pygame.SRCALPHA)
+        graph = self._graph
+        graph.fill((0, 0, 0, 160))
+        scale = height / (FRAME_BUDGET_MS * 2)  # the graph tops out at two frames
+        count = min(self.frame, len(self.frame_times), width // 2)
+        for offset in range(count):
+            frame_time = self.frame_times[
+                (self.frame - 1 - offset) % len(self.frame_times)
+            ]
+            bar_height = min(height, int(frame_time * scale) + 1)
+            color = (80, 220, 80) if frame_time <= FRAME_BUDGET_MS else (255, 80, 80)
+            graph.fill(
+                color, (width - 2 * (offset + 1), height - bar_height, 2, bar_height)
+            )
+        budget_y = height - int(FRAME_BUDGET_MS * scale)
+        graph.fill((255, 220, 80), (0, budget_y, width, 1))
+        return graph
+
+
+tracer = Tracer()
@@ -0,0 +1,38 @@
+"""the saves the tests read, shared by the test modules"""
+
+import pytest
+
+
+def _save_bytes(values: dict) -> bytes:
+    lines = ["[fnafw]"] + [f"{key}={value}" for key, value in values.items()]
+    return ("\r\n".join(lines) + "\r\n").encode("latin-1")
+
+
+@pytest.fixture
+def save_bytes():
+    """builds the content of a save holding `values`, the way the game writes it"""
+    return _save_bytes
+
+
+@pytest.fixture
+def write_save_file():
+    """writes a save holding `values` to the file `path`"""
+
+    def write(path, values: dict):
+        path.write_bytes(_save_bytes(values))
+
+    return write
+
+
+@pytest.fixture
+def corpus(request, tmp_path):
+    """
+    a directory with a save for every entry of the test module's SAVES, a
+    dict of the values by file name. bytes are written to the file as they are
+    """
+    directory = tmp_path / "saves"
+    directory.mkdir()
+    for name, values in request.module.SAVES.items():
+        content = values if isinstance(values, bytes) else _save_bytes(values)
+        (directory / name).write_bytes(content)
+    return directory
@@ -0,0 +1,94 @@
+"""the deduplicated snapshot store of the saves"""
+
+import random
+
+import pytest
+
+from core.backups import KEYFRAME_INTERVAL, BackupStore
+
+
+@pytest.fixture
+def versions(save_bytes):
+    """builds `count` successive versions of a save, each a few edits from the last"""
+
+    def build(count: int, seed: int = 0) -> list[bytes]:
+        generator = random.Random(seed)
+        values = {f"{index}lv": "1" for index in range(1, 30)}
+        values.update({f"sw{index}": "0" for index in range(1, 10)})
+        result = []
+        for _ in range(count):
+            for _ in range(generator.randint(1, 3)):
+                key = generator.choice(list(values))
+                values[key] = str(generator.randint(0, 999))
+            if generator.random() < 0.1:
+                values[f"new{generator.randint(0, 99)}"] = "1"
+            result.append(save_bytes(values))
+        return result
+
+    return build
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BackupStore(str(tmp_path / "backups.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_restores_every_version_byte_exact(store, tmp_path, versions):
+    contents = versions(KEYFRAME_INTERVAL * 2 + 5)
+    ids = [store.snapshot_bytes("fnafwr1", content) for content in contents]
+    path = tmp_path / "fnafwr1"
+    for snapshot_id, content in zip(ids, contents):
+        assert store.content(snapshot_id) == content
+        store.restore(snapshot_id, str(path))
+        assert path.read_bytes() == content
+
+
+def test_identical_content_is_recorded_once(store):
+    first = store.snapshot_bytes("fnafwr1", b"[fnafw]\r\ntokens=1\r\n")
+    again = store.snapshot_bytes("fnafwr1", b"[fnafw]\r\ntokens=1\r\n")
+    assert first == again
+    assert store.stats()["snapshots"] == 1
+
+
+def test_chunks_are_shared_between_slots(store):
+    content = b"[fnafw]\r\ntokens=1\r\n1lv=5\r\n"
+    store.snapshot_bytes("fnafwr1", content)
+    store.snapshot_bytes("fnafwr2", content)
+    stats = store.stats()
+    assert (stats["snapshots"], stats["chunks"]) == (2, 3)
+
+
+def test_snapshots_are_listed_newest_first(store, versions):
+    ids = [store.snapshot_bytes("fnafwr1", content) for content in versions(3)]
+    store.snapshot_bytes("fnafwr2", b"[fnafw]\r\n")
+    snapshots = store.snapshots("fnafwr1")
+    assert [snapshot.id for snapshot in snapshots] == ids[::-1]
+    assert {snapshot.slot for snapshot in snapshots} == {"fnafwr1"}
+    assert snapshots[0].size == len(versions(3)[-1])
+
+
+def test_reopened_store_continues_the_chain(tmp_path, versions):
+    path = str(tmp_path / "backups.sqlite3")
+    contents = versions(KEYFRAME_INTERVAL + 3, seed=1)
+    store = BackupStore(path)
+    ids = [store.snapshot_bytes("fnafwr1", content) for content in contents[:10]]
+    store.close()
+    store = BackupStore(path)
+    ids += [store.snapshot_bytes("fnafwr1", content) for content in contents[10:]]
+    assert [store.content(snapshot_id) for snapshot_id in ids] == contents
+    store.close()
+
+
+def test_snapshot_of_a_file(store, tmp_path):
+    path = tmp_path / "fnafwr1"
+    assert store.snapshot("fnafwr1", str(path)) is None
+    path.write_bytes(b"[fnafw]\r\ntokens=1\r\n")
+    snapshot_id = store.snapshot("fnafwr1", str(path))
+    assert store.content(snapshot_id) == path.read_bytes()
+
+
+def test_unknown_snapshot(store):
+    with pytest.raises(KeyError):
+        store.content(404)
@@ -0,0 +1,146 @@
+"""the columnar storage of save corpora"""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# pylint: disable=wrong-import-position
+from core import read_save
+from core.columns import FLAG, INT, SaveColumns
+from core.schema import Validator
+
+SAVES = {
+    "fnafwr1": {"tokens": "100", "sw1": "1", "sw2": "0", "1lv": "10", "big": "x"},
+    "fnafwr2": {"tokens": "5000", "sw1": "1", "sw2": "1", "1lv": "60"},
+    "fnafwr3": {"tokens": "abc", "sw1": "0", "1lv": "1", "2lv": "3"},
+}
+
+
+@pytest.fixture
+def columns(corpus):
+    return SaveColumns.load([str(corpus)])
+
+
+def test_load(columns):
+    assert len(columns) == 3
+    assert columns.keys() == ["1lv", "2lv", "sw1", "sw2", "tokens"]
+    assert columns.kind("tokens") == INT and columns.kind("sw1") == FLAG
+    assert columns.skipped == 1
+    assert columns.failures == []
+    assert columns.values("tokens").tolist() == [100, 5000, 0]
+    assert columns.present("tokens").tolist() == [True, True, False]
+    assert columns.values("1lv").dtype == np.int16
+    assert columns.flag("sw1").tolist() == [True, True, False]
+    assert columns.present("sw2").tolist() == [True, True, False]
+    assert columns.flag("missing").tolist() == [False] * 3
+    with pytest.raises(KeyError):
+        columns.values("missing")
+
+
+def test_statistics(columns):
+    assert columns.distribution("1lv") == {1: 1, 10: 1, 60: 1}
+    assert columns.describe("tokens")["count"] == 2
+    assert columns.percentiles("1lv", [50]) == [10.0]
+    assert columns.funnel(["sw1", "sw2"]) == [2, 1]
+    names = [
+        os.path.basename(path)
+        for path in columns.paths_where(columns.values("1lv") > 5)
+    ]
+    assert names == ["fnafwr1", "fnafwr2"]
+
+
+def test_patch_and_write(columns, corpus):
+    assert columns.patch("1lv", np.minimum(columns.values("1lv") + 10, 999)) == 3
+    assert columns.patch("sw2", 1, where=columns.flag("sw1")) == 1
+    assert columns.patch("sw2", 1, where=columns.flag("sw1")) == 0
+    assert columns.write() == 3
+    assert columns.write() == 0
+    assert columns.stale() == []
+
+    first = read_save(str(corpus / "fnafwr1"))["fnafw"]
+    assert first["1lv"] == "20" and first["sw2"] == "1" and first["big"] == "x"
+    third = read_save(str(corpus / "fnafwr3"))["fnafw"]
+    assert third["1lv"] == "11" and third["tokens"] == "abc" and "sw2" not in third
+    reloaded = SaveColumns.load([str(corpus)])
+    assert reloaded.values("1lv").tolist() == [20, 70, 11]
+    assert reloaded.flag("sw2").tolist() == [True, True, False]
+
+
+def test_integral_floats_are_patched(columns):
+    assert columns.patch("1lv", np.array([20.0, 70.0, 11.0])) == 3
+    assert columns.values("1lv").tolist() == [20, 70, 11]
+
+
+def test_unreadable_saves_are_left_out(corpus):
+    (corpus / "fnafwr4").write_bytes(b"garbage\r\n")
+    columns = SaveColumns.load([str(corpus)])
+    assert len(columns) == 3
+    assert [os.path.basename(path) for path, _ in columns.failures] == ["fnafwr4"]
+    assert "garbage" in columns.failures[0][1]
+
+
+def test_invalid_patches_change_nothing(columns, corpus):
+    before = (corpus / "fnafwr1").read_bytes()
+    with pytest.raises(ValueError):
+        columns.patch("1lv", 1000)
+    with pytest.raises(KeyError):
+        columns.patch("big", 1)
+    # not truncated to a valid level
+    with pytest.raises(ValueError, match="not an integer"):
+        columns.patch("1lv", 10.7)
+    with pytest.raises(ValueError, match="not an integer"):
+        columns.patch("1lv", np.array([10.0, 11.5, 12.0]))
+    with pytest.raises(ValueError, match="not an integer"):
+        columns.patch("tokens", float("nan"))
+    with pytest.raises(ValueError, match="not a number"):
+        columns.patch("tokens", "12")
+    assert columns.values("1lv").tolist() == [10, 60, 1]
+    assert columns.write() == 0
+    assert (corpus / "fnafwr1").read_bytes() == before
+
+
+def test_new_columns(columns, corpus):
+    assert columns.patch("sw3", 1, where=columns.values("tokens") > 1000) == 1
+    assert columns.patch("5lv", 7) == 3
+    assert columns.present("5lv").all()
+    assert columns.flag("sw3").tolist() == [False, True, False]
+    assert columns.present("sw3").tolist() == [False, True, False]
+    assert columns.write() == 3
+    assert read_save(str(corpus / "fnafwr2"))["fnafw"]["sw3"] == "1"
+    assert "sw3" not in read_save(str(corpus / "fnafwr1"))["fnafw"]
+
+
+def test_save_and_open(columns, corpus, tmp_path):
+    cache = str(tmp_path / "cache")
+    columns.save(cache)
+    opened = SaveColumns.open(cache)
+    assert opened.paths == columns.paths
+    assert opened.keys() == columns.keys()
+    for key in columns.keys():
+        assert opened.values(key).tolist() == columns.values(key).tolist()
+        assert opened.present(key).tolist() == columns.present(key).tolist()
+    assert opened.stale() == []
+
+    assert opened.patch("tokens", 7) == 3
+    assert opened.write() == 3
+    opened.save(cache)
+    assert SaveColumns.open(cache).values("tokens").tolist() == [7, 7, 7]
+    assert read_save(str(corpus / "fnafwr3"))["fnafw"]["tokens"] == "7"
+
+
+def test_stale(columns, corpus):
+    os.utime(corpus / "fnafwr2", (0, 12345))
+    (corpus / "fnafwr3").unlink()
+    assert [os.path.basename(path) for path in columns.stale()] == [
+        "fnafwr2",
+        "fnafwr3",
+    ]
+
+
+def test_open_rejects_another_section(columns, tmp_path):
+    cache = str(tmp_path / "cache")
+    columns.save(cache)
+    with pytest.raises(ValueError):
+        SaveColumns.open(cache, Validator("other", {}, {}, None))
@@ -0,0 +1,95 @@
+"""event routing through the dispatcher and its spatial index"""
+
+import pytest
+
+pg = pytest.importorskip("pygame")
+
+# pylint: disable=wrong-import-position
+from components.button_grid import Button, ButtonsGrid
+from utils.events import EventDispatcher, SpatialIndex
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fonts():
+    pg.font.init()
+    yield
+    pg.font.quit()
+
+
+def click(position):
+    return pg.event.Event(pg.MOUSEBUTTONDOWN, button=1, pos=position)
+
+
+class Grid(ButtonsGrid):
+    def __init__(self):
+        super().__init__(columns=3)
+        self.clicked = []
+        for index in range(9):
+            row, column = divmod(index, 3)
+            self.add(f"b{index}", Button((column * 50, row * 50), (40, 40)))
+
+    def on_button_clicked(self, name, button):
+        self.clicked.append(name)
+
+
+class Checked(Button):
+    __slots__ = ("checks",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checks = 0
+
+    def is_clicked(self, event):
+        self.checks += 1
+        return super().is_clicked(event)
+
+
+def test_spatial_index():
+    index = SpatialIndex(cell_size=32)
+    index.insert("a", (0, 0, 100, 20))
+    index.insert("b", (50, 10, 10, 10))
+    assert index.at((55, 15)) == ["a", "b"]
+    assert index.at((10, 10)) == ["a"]
+    assert index.at((200, 200)) == []
+    index.insert("a", (300, 300, 10, 10))
+    assert index.at((10, 10)) == [] and index.at((305, 305)) == ["a"]
+    index.remove("b")
+    assert "b" not in index and len(index) == 1
+
+
+def test_grid_clicks_only_check_the_button_under_them():
+    grid = Grid()
+    for name in list(grid):
+        old = grid[name]
+        grid.remove(name)
+        grid.add(name, Checked((old.x, old.y), old.rect.size))
+    grid.process_event(click((60, 60)))
+    grid.process_event(click((45, 45)))
+    assert grid.clicked == ["b4"]
+    assert grid.current_selected_button == 4
+    assert [button.checks for button in grid.values()] == [0] * 4 + [1] + [0] * 4
+
+
+def test_grid_moved_buttons():
+    grid = Grid()
+    grid["b0"].rect.topleft = (500, 500)
+    grid.move("b0")
+    grid.process_event(click((10, 10)))
+    grid.process_event(click((510, 510)))
+    assert grid.clicked == ["b0"]
+
+
+def test_grid_through_a_dispatcher():
+    grid = Grid()
+    dispatcher = EventDispatcher()
+    grid.register(dispatcher, keyboard=True)
+    dispatcher.dispatch(click((110, 110)))
+    assert grid.clicked == ["b8"]
+    dispatcher.dispatch(pg.event.Event(pg.KEYDOWN, key=pg.K_LEFT))
+    dispatcher.dispatch(pg.event.Event(pg.KEYDOWN, key=pg.K_RETURN))
+    assert grid.clicked == ["b8", "b7"]
+
+    dispatcher.dispatch(pg.event.Event(pg.MOUSEMOTION, pos=(10, 10)))
+    assert grid["b0"].current_color == grid["b0"].hover_color
+    dispatcher.dispatch(pg.event.Event(pg.MOUSEMOTION, pos=(200, 200)))
+    assert grid["b0"].current_color == grid["b0"].color
@@ -0,0 +1,57 @@
+"""the cached layout of the scrollable grid"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pg = pytest.importorskip("pygame")
+
+# pylint: disable=wrong-import-position
+from components.grid import Button, Grid
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fonts():
+    pg.font.init()
+    yield
+    pg.font.quit()
+
+
+def make_grid(count, width=360):
+    return Grid(
+        width=width,
+        height=200,
+        border_width=5,
+        border_height=5,
+        cell_width_padding=10,
+        cell_height_padding=10,
+        components=[Button((0, 0), (100, 50)) for _ in range(count)],
+    )
+
+
+@pytest.mark.parametrize("count", [1, 3, 7])
+def test_cells_are_padded_inside_the_border(count):
+    grid = make_grid(count)
+    inner = grid.rect.inflate(-2 * grid.border_width, -2 * grid.border_height)
+    for button in grid.components:
+        padded = button.rect.inflate(
+            2 * grid.cell_width_padding, 2 * grid.cell_height_padding
+        )
+        assert inner.contains(padded)
+    last = grid.components[-1].rect
+    assert grid.rect.bottom - last.bottom == grid.border_height + 10
+    assert grid.width <= grid.grid_width
+
+
+def test_columns_fit_the_view():
+    assert make_grid(3, width=360).layout[0] == 3
+    assert make_grid(3, width=349).layout[0] == 2
+
+
+def test_layout_is_rebuilt_on_add():
+    grid = make_grid(3)
+    height = grid.height
+    grid.add(Button((0, 0), (100, 50)))
+    assert grid.height == height + 60
+    assert grid.layout[0] == 3
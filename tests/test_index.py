@@ -0,0 +1,163 @@
+"""the inverted index of save corpora and its query language"""
+
+import os
+import random
+
+import pytest
+
+from core import parse_save
+from core.index import QueryError, SaveIndex
+
+SAVES = {
+    "fnafwr1": {"tokens": "100", "sw1": "1", "sw2": "0", "1lv": "10"},
+    "fnafwr2": {"tokens": "5000", "sw1": "1", "sw2": "1", "1lv": "60", "2lv": "3"},
+    "fnafwr3": {"tokens": "0", "sw1": "0", "1lv": "1"},
+}
+
+
+@pytest.fixture
+def index(tmp_path, corpus):
+    index = SaveIndex(str(tmp_path / "index.sqlite3"), aliases={"freddy": 1})
+    index.update([str(corpus)])
+    yield index
+    index.close()
+
+
+def names(paths) -> list[str]:
+    return [os.path.basename(path) for path in paths]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("sw1=1", ["fnafwr1", "fnafwr2"]),
+        ("sw1=1 and sw2=0", ["fnafwr1"]),
+        ("sw2=1 or tokens=0", ["fnafwr2", "fnafwr3"]),
+        ("not sw1=1", ["fnafwr3"]),
+        ("sw2", ["fnafwr1", "fnafwr2"]),
+        ("not 2lv", ["fnafwr1", "fnafwr3"]),
+        ("sw2 != 1", ["fnafwr1"]),
+        ("tokens >= 100", ["fnafwr1", "fnafwr2"]),
+        ("tokens > 100", ["fnafwr2"]),
+        ("tokens < 100", ["fnafwr3"]),
+        ("tokens <= 100", ["fnafwr1", "fnafwr3"]),
+        ("1lv > 5 and not (tokens < 1000 or sw2 != 1)", ["fnafwr2"]),
+        ("freddy.lv >= 10", ["fnafwr1", "fnafwr2"]),
+        ("SW1=1 AND 1lv=1", []),
+        ("sw1=1 AND 1lv=10", ["fnafwr1"]),
+        ("missing=1", []),
+    ],
+)
+def test_query(index, query, expected):
+    assert names(index.query(query)) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "sw1=",
+        "sw1=1 and",
+        "(sw1=1",
+        "sw1=1)",
+        "= 1",
+        "tokens > many",
+        "tokens > 99999999999999999999",
+        "nobody.lv > 1",
+        "and",
+        "OR = 1",
+        "sw1=1 and not",
+        "not and",
+        "sw1=1 or (or)",
+    ],
+)
+def test_invalid_queries(index, query):
+    with pytest.raises(QueryError):
+        index.query(query)
+
+
+def test_incremental_update(index, corpus, write_save_file):
+    assert index.update([str(corpus)]) == {
+        "added": 0,
+        "updated": 0,
+        "removed": 0,
+        "unchanged": 3,
+        "failed": 0,
+    }
+    write_save_file(corpus / "fnafwr1", {"tokens": "100", "sw1": "0", "sw2": "1"})
+    os.utime(corpus / "fnafwr1", (0, 12345))
+    write_save_file(corpus / "fnafwr4", {"tokens": "7"})
+    (corpus / "fnafwr3").unlink()
+    assert index.update([str(corpus)]) == {
+        "added": 1,
+        "updated": 1,
+        "removed": 1,
+        "unchanged": 1,
+        "failed": 0,
+    }
+    assert len(index) == 3
+    assert names(index.query("sw1=1")) == ["fnafwr2"]
+    assert names(index.query("sw2=1")) == ["fnafwr1", "fnafwr2"]
+    assert names(index.query("1lv")) == ["fnafwr2"]
+    assert names(index.query("tokens < 10")) == ["fnafwr4"]
+
+
+def test_files_outside_the_updated_paths_are_kept(
+    index, tmp_path, corpus, write_save_file
+):
+    other = tmp_path / "other"
+    other.mkdir()
+    write_save_file(other / "fnafwr1", {"tokens": "1"})
+    index.update([str(other)])
+    (corpus / "fnafwr3").unlink()
+    assert index.update([str(other)])["removed"] == 0
+    assert len(index) == 4
+    assert index.update([str(corpus)])["removed"] == 1
+
+
+def test_numbers_outside_of_64_bits_are_text(index, corpus, write_save_file):
+    write_save_file(corpus / "fnafwr5", {"big": "99999999999999999999", "tokens": "-1"})
+    assert index.update([str(corpus)])["added"] == 1
+    assert names(index.query("big=99999999999999999999")) == ["fnafwr5"]
+    assert names(index.query("big")) == ["fnafwr5"]
+    assert names(index.query("tokens < 0")) == ["fnafwr5"]
+
+
+def test_unreadable_files_have_no_terms(index, corpus):
+    (corpus / "fnafwr6").write_bytes(b"garbage\r\n")
+    counts = index.update([str(corpus)])
+    assert counts["added"] == 1 and counts["failed"] == 1
+    assert [os.path.basename(path) for path, _ in index.failures] == ["fnafwr6"]
+    assert names(index.query("not tokens")) == ["fnafwr6"]
+    # the failures are only those of the last update
+    assert index.update([str(corpus)])["failed"] == 0
+    assert not index.failures
+
+
+def test_matches_a_full_scan(tmp_path, write_save_file):
+    generator = random.Random(0)
+    directory = tmp_path / "saves"
+    directory.mkdir()
+    for number in range(60):
+        write_save_file(
+            directory / f"fnafwr{number}",
+            {
+                "tokens": str(generator.randint(0, 2000)),
+                **{f"sw{flag}": str(generator.randint(0, 1)) for flag in range(1, 4)},
+                "1lv": str(generator.randint(1, 99)),
+            },
+        )
+    index = SaveIndex(":memory:")
+    index.update([str(directory)])
+    query = "(sw1=1 or sw2=0) and tokens > 1000 and not 1lv <= 50"
+    expected = []
+    for path in sorted(directory.iterdir()):
+        section = parse_save(path.read_text("latin-1"))["fnafw"]
+        if (
+            (section["sw1"] == "1" or section["sw2"] == "0")
+            and int(section["tokens"]) > 1000
+            and not int(section["1lv"]) <= 50
+        ):
+            expected.append(str(path))
+    assert index.query(query) == sorted(expected)
+    index.close()
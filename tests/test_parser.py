@@ -0,0 +1,76 @@
+"""reading and writing save files"""
+
+import pytest
+
+from core import ParseError, SaveFile, dump_save, parse_save, read_save, write_save
+
+SAVE = "[fnafw]\r\nsw1=1\r\ntokens=120\r\n1lv=17\r\n1next=500\r\n"
+
+
+def test_parse():
+    save = parse_save(SAVE)
+    assert list(save) == ["fnafw"]
+    assert list(save["fnafw"].items()) == [
+        ("sw1", "1"),
+        ("tokens", "120"),
+        ("1lv", "17"),
+        ("1next", "500"),
+    ]
+    assert save["fnafw"].get_int("tokens") == 120
+    assert save["fnafw"].get_flag("sw1")
+
+
+def test_parse_tolerates_spaces_and_comments():
+    save = parse_save("; comment\n[ fnafw ]\n  tokens = 5 \n\n# more\n")
+    assert dict(save["fnafw"]) == {"tokens": "5"}
+
+
+@pytest.mark.parametrize(
+    "text, line",
+    [
+        ("[fnafw\ntokens=1\n", 1),
+        ("[fnafw]\ntokens\n", 2),
+        ("[fnafw]\n=1\n", 2),
+        ("tokens=1\n", 1),
+    ],
+)
+def test_parse_errors(text, line):
+    with pytest.raises(ParseError) as error:
+        parse_save(text)
+    assert error.value.line == line
+    # the lenient parser skips the line instead
+    parse_save(text, strict=False)
+
+
+def test_write_round_trip(tmp_path):
+    path = tmp_path / "fnafwr1"
+    path.write_bytes(SAVE.encode("latin-1"))
+    save = read_save(str(path))
+    assert save.path == str(path)
+    write_save(save, str(path))
+    assert path.read_bytes() == SAVE.encode("latin-1")
+    assert read_save(str(path)) == save
+
+
+def test_write_edit_keeps_order(tmp_path):
+    path = tmp_path / "fnafwr1"
+    save = parse_save(SAVE)
+    save["fnafw"]["tokens"] = 999
+    save.section("extra")["name"] = "é"
+    write_save(save, str(path))
+    assert path.read_bytes() == (
+        b"[fnafw]\r\nsw1=1\r\ntokens=999\r\n1lv=17\r\n1next=500\r\n"
+        b"[extra]\r\nname=\xe9\r\n"
+    )
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_dump_parse_round_trip():
+    save = parse_save(SAVE)
+    assert parse_save(dump_save(save)) == save
+
+
+def test_read_missing_file(tmp_path):
+    save = SaveFile()
+    assert save.read(str(tmp_path / "missing")) == []
+    assert save.path is None
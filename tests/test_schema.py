@@ -0,0 +1,109 @@
+"""the fnafw schema and its compiled validator"""
+
+import pytest
+
+from core import (
+    FlagField,
+    IntField,
+    SaveFile,
+    ValidationIssue,
+    compile_schema,
+    fnafw_validator,
+    parse_save,
+    validate_structure,
+)
+from core.schema import INT32_MAX
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("tokens", "0"),
+        ("tokens", str(INT32_MAX)),
+        ("1lv", "1"),
+        ("1lv", "999"),
+        ("12next", "9999999"),
+        ("sw3", "0"),
+        ("sw3", "1"),
+        ("somethingelse", "anything"),
+    ],
+)
+def test_valid_values(key, value):
+    assert fnafw_validator.check(key, value) is None
+
+
+@pytest.mark.parametrize(
+    "key, value, message",
+    [
+        ("tokens", "-1", f"-1 is outside of 0..{INT32_MAX}"),
+        ("tokens", str(INT32_MAX + 1), f"{INT32_MAX + 1} is outside of 0..{INT32_MAX}"),
+        ("1lv", "0", "0 is outside of 1..999"),
+        ("1lv", "1000", "1000 is outside of 1..999"),
+        ("5next", "10000000", "10000000 is outside of 0..9999999"),
+        ("1lv", "abc", "'abc' is not a number"),
+        ("1lv", "", "'' is not a number"),
+        ("1lv", "١٢", "'١٢' is not a number"),
+        ("sw1", "2", "'2' is not a flag (0 or 1)"),
+        ("sw1", "true", "'true' is not a flag (0 or 1)"),
+    ],
+)
+def test_invalid_values(key, value, message):
+    assert fnafw_validator.check(key, value) == ValidationIssue(key, message)
+
+
+def test_families_only_match_whole_keys():
+    assert fnafw_validator.field("1lv") is fnafw_validator.field("42lv")
+    assert fnafw_validator.field("lv") is None
+    assert fnafw_validator.field("1lvx") is None
+    assert fnafw_validator.field("sw") is None
+    assert isinstance(fnafw_validator.field("sw12"), FlagField)
+
+
+def test_validate_save():
+    save = parse_save("[fnafw]\ntokens=5\n1lv=0\nsw1=1\n")
+    assert fnafw_validator.validate(save) == [
+        ValidationIssue("1lv", "0 is outside of 1..999")
+    ]
+
+
+def test_validate_missing_section():
+    assert fnafw_validator.validate(SaveFile()) == [
+        ValidationIssue("", "missing the [fnafw] section")
+    ]
+
+
+def test_validate_other_section():
+    validator = compile_schema({"coins": IntField()}, section="shop")
+    save = parse_save("[fnafw]\ntokens=5\n")
+    assert validator.validate(save) == [
+        ValidationIssue("", "missing the [shop] section")
+    ]
+    save = parse_save("[shop]\ncoins=x\n")
+    assert validator.validate(save) == [ValidationIssue("coins", "'x' is not a number")]
+
+
+def test_structure_and_values_are_separate():
+    save = parse_save("[fnafw]\ntokens=5\n1lv=0\n")
+    save["fnafw"]["1lv"] = "0\n"
+    structure = validate_structure(save)
+    values = fnafw_validator.validate_values(save)
+    assert structure == [ValidationIssue("1lv", "value spans several lines")]
+    assert values == [ValidationIssue("1lv", "'0\\n' is not a number")]
+    assert fnafw_validator.validate(save) == structure + values
+
+
+def test_required_and_unknown_keys():
+    validator = compile_schema(
+        {"tokens": IntField(required=True), "sw{n}": FlagField()},
+        allow_unknown=False,
+    )
+    save = parse_save("[fnafw]\nsw1=1\nfoo=1\n")
+    assert validator.validate(save) == [
+        ValidationIssue("foo", "unknown key"),
+        ValidationIssue("tokens", "missing"),
+    ]
+
+
+def test_family_cant_be_required():
+    with pytest.raises(ValueError):
+        compile_schema({"{n}lv": IntField(required=True)})
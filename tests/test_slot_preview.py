@@ -0,0 +1,80 @@
+"""the main menu's previews of the save slots"""
+
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pg = pytest.importorskip("pygame")
+
+# pylint: disable=wrong-import-position
+from components.slot_preview import SlotPreviews
+
+SRC = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+SAVES = {
+    "fnafw1": {"p1": "1", "1lv": "12", "tokens": "40", "sw1": "1"},
+    "fnafw2": b"\xff\xfe not a save",
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pg.display.init()
+    pg.font.init()
+    pg.display.set_mode((1, 1))
+    yield
+    pg.display.quit()
+
+
+@pytest.fixture(autouse=True)
+def textures(monkeypatch):
+    # the character textures are found relative to src
+    monkeypatch.chdir(SRC)
+
+
+def settle(previews, timeout=5):
+    """pump the previews until the worker has nothing left to hand back"""
+    changed = False
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        if previews.pump():
+            changed = True
+        elif None not in previews.previews:
+            break
+    return changed
+
+
+@pytest.fixture
+def slots(corpus):
+    # the third slot has no save
+    return [str(corpus / name) for name in ("fnafw1", "fnafw2", "fnafw3")]
+
+
+def test_previews_are_built_in_the_background(slots):
+    previews = SlotPreviews(slots)
+    previews.refresh()
+    assert settle(previews)
+    assert all(isinstance(preview, pg.Surface) for preview in previews.previews)
+    assert previews.renders == 3
+    # the saved slot is as wide as its icon and label, the others fill the slot
+    assert previews.previews[0].get_width() <= previews.size[0]
+    assert previews.previews[2].get_size() == previews.size
+
+
+def test_only_changed_slots_are_rendered_again(slots, corpus, write_save_file):
+    previews = SlotPreviews(slots)
+    previews.refresh()
+    settle(previews)
+    first = list(previews.previews)
+    previews.refresh()
+    assert not settle(previews, timeout=0.3)
+    assert previews.renders == 3
+
+    write_save_file(corpus / "fnafw3", {"tokens": "1"})
+    previews.refresh()
+    assert settle(previews)
+    assert previews.renders == 4
+    assert previews.previews[:2] == first[:2]
+    assert previews.previews[2] is not first[2]
@@ -0,0 +1,51 @@
+"""the summaries the main menu previews of the slots show"""
+
+import pytest
+
+from core import (
+    LOCATIONS,
+    SaveFile,
+    SaveSummary,
+    parse_save,
+    summarize,
+    unlocked_locations,
+)
+
+
+def save(*lines):
+    return parse_save("\r\n".join(["[fnafw]", *lines]) + "\r\n")
+
+
+def test_summarize():
+    summary = summarize(
+        save("p1=3", "p2=0", "p3=7", "1lv=10", "2lv=5", "xlv=9", "tokens=250", "sw2=1")
+    )
+    assert summary == SaveSummary((3, 7), 15, 250, 2)
+
+
+def test_summarize_missing_section():
+    assert summarize(SaveFile()) == SaveSummary((), 0, 0, 0)
+
+
+def test_summarize_invalid_values():
+    summary = summarize(save("p1=x", "1lv=ten", "tokens=lots", "sw1=yes"))
+    assert summary == SaveSummary((), 0, 0, 1)
+
+
+@pytest.mark.parametrize(
+    "flags, mask",
+    [
+        ([], 0b1),
+        (["sw1=1"], 0b11),
+        (["sw1=1", "sw3=1", "sw4=0"], 0b1011),
+        ([f"sw{n}=1" for n in range(1, 20)], (1 << LOCATIONS) - 1),
+    ],
+)
+def test_unlocked_locations(flags, mask):
+    assert unlocked_locations(save(*flags)["fnafw"]) == mask
+
+
+def test_areas_are_bounded_by_the_locations():
+    flags = [f"sw{n}=1" for n in range(1, 20)]
+    assert summarize(save(*flags)).areas == LOCATIONS
+    assert unlocked_locations(save(*flags)["fnafw"], 3) == 0b111
@@ -0,0 +1,118 @@
+"""the incremental text layout of the text boxes"""
+
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pg = pytest.importorskip("pygame")
+
+# pylint: disable=wrong-import-position
+from components.textbox import TextBox, TextLayout
+from graphics import render_text_with_outline
+
+FONTS = os.path.join(os.path.dirname(__file__), os.pardir, "src", "textures", "fonts")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pg.display.init()
+    pg.font.init()
+    pg.display.set_mode((1, 1))
+    yield
+    pg.display.quit()
+
+
+@pytest.fixture(params=[("ARIALNB.TTF", 30), ("LcdSolid.ttf", 20)], ids=lambda p: p[0])
+def font(request):
+    name, size = request.param
+    return pg.font.Font(os.path.join(FONTS, name), size)
+
+
+@pytest.fixture(params=["plain", "outline"])
+def render(request, font):
+    if request.param == "plain":
+        return lambda text: font.render(text, True, (0, 0, 0))
+    return lambda text: render_text_with_outline(text, font, (30, 144, 255))
+
+
+def pixels(surface: pg.Surface, width: int) -> bytes:
+    """the RGBA pixels of the first `width` columns, invisible ones zeroed"""
+    area = pg.Surface((width, surface.get_height()), pg.SRCALPHA)
+    area.fill((0, 0, 0, 0))
+    area.blit(surface, (0, 0), special_flags=pg.BLEND_RGBA_MAX)
+    visible = pg.mask.from_surface(area, 0).to_surface(
+        setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0)
+    )
+    area.blit(visible, (0, 0), special_flags=pg.BLEND_RGBA_MULT)
+    return pg.image.tobytes(area, "RGBA")
+
+
+def edits(characters: str, count: int, seed: int = 0):
+    """`count` texts, each typed or deleted from the last"""
+    generator = random.Random(seed)
+    text = []
+    for _ in range(count):
+        if text and generator.random() < 0.35:
+            text.pop()
+        else:
+            text.append(generator.choice(characters))
+        yield list(text)
+
+
+def test_numbers_match_a_full_render(font, render):
+    layout = TextLayout(render, font)
+    for text in edits("0123456789", 150):
+        layout.set_text(text)
+        if not text:
+            assert layout.width == 0
+            continue
+        full = render("".join(text))
+        assert layout.width == full.get_width()
+        assert pixels(layout.surface, full.get_width()) == pixels(
+            full, full.get_width()
+        )
+
+
+@pytest.mark.parametrize("text", ["W.fVT11", "AVAWAY", "Level 12", "jfj,Tq"])
+def test_kerned_text_stays_within_a_pixel(font, render, text):
+    layout = TextLayout(render, font)
+    for length in range(1, len(text) + 1):
+        layout.set_text(list(text[:length]))
+        assert abs(layout.width - render(text[:length]).get_width()) <= 1
+    assert [layout.offset(index) for index in range(len(text))] == [
+        font.size(text[: index + 1])[0] - font.size(text[index])[0]
+        for index in range(len(text))
+    ]
+
+
+def test_overlapping_glyphs_share_a_segment(font):
+    layout = TextLayout(lambda text: render_text_with_outline(text, font), font)
+    layout.set_text(list("AVA"))
+    assert len(layout.segments) == 1
+
+
+def test_edits_only_render_the_tail(font):
+    layout = TextLayout(lambda text: font.render(text, True, (0, 0, 0)), font)
+    layout.set_text(list("1234"))
+    renders = layout.renders
+    layout.set_text(list("12345"))
+    assert layout.renders == renders + 1
+    assert layout.segments[-1].start == 4
+    layout.set_text(list("1234"))
+    layout.set_text(list("1234"))
+    assert layout.renders == renders + 1
+
+
+def test_text_box_notices_buffer_edits(font):
+    box = TextBox((0, 0, 200, 40), buffer=list("12"), font=font, active=True)
+    box.update()
+    assert box.final == "12" and not box.needs_layout()
+    box.buffer.append("3")
+    assert box.needs_layout()
+    box.update()
+    assert box.final == "123"
+    box.buffer = list("7")
+    box.update()
+    assert box.final == "7" and box.render_rect.width == font.size("7")[0]